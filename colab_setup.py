@@ -24,8 +24,11 @@ subprocess.run([sys.executable, "-m", "pip", "install", "-q", "-r", "requirement
 
 # Step 3: Verify database
 print("\n🗄️ Checking FAISS database...")
+sys.path.insert(0, "/content/pharma-navigator")
+from src.retrieval.snapshots import resolve_snapshot
+
 db_path = "/content/pharma-navigator/faiss_db"
-if os.path.exists(f"{db_path}/faiss.index"):
+if (resolve_snapshot(db_path) / "faiss.index").exists():
     print(f"✅ FAISS database found at {db_path}")
 else:
     print(f"⚠️ Database not found. Will need to ingest PDFs.")
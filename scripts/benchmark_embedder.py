@@ -0,0 +1,371 @@
+"""
+Compare embedding backends (torch / onnx / onnx-int8) for TurkishEmbedder.
+Reports cosine parity against the torch output, single-query latency and
+ingest throughput (chunks/s) on the chunked documents in data/pdfs, so a
+backend can be chosen before changing [embedding] backend in config.toml.
+
+With --token-budgets, compares ingest batching on the same chunks: fixed
+32-item batches (budget 0) vs length-bucketed token-budget batches
+([embedding] embed_token_budget), reporting throughput and padding overhead.
+
+With --memory, compares the list-based embed() path against the ndarray
+embed_array() path (peak Python heap via tracemalloc and wall time).
+
+With --concurrency N, also runs a concurrent query load test with query
+micro-batching off and on ([embedding] query_batch_size / query_batch_wait_ms).
+"""
+
+import argparse
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import tomli
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.batching import MicroBatcher
+from src.retrieval.chunker import chunk_drug_document
+from src.retrieval.embedder import (
+    EMBEDDING_BACKENDS,
+    TurkishEmbedder,
+    cosine_parity,
+    padded_tokens,
+    token_budget_batches,
+)
+
+
+QUERIES = [
+    "Arvales'in yan etkileri nelerdir?",
+    "Cipralex nasıl kullanılır?",
+    "Janumet'i kimler kullanamaz?",
+    "Augmentin hamilelikte kullanılır mı?",
+    "Coraspin kanama riskini artırır mı?",
+    "Enfluvir günde kaç kez alınmalı?",
+    "Arvales ile alkol alınabilir mi?",
+    "Cipralex kullanırken araç kullanabilir miyim?",
+]
+
+
+def load_chunks(config: dict, source_dir: Path) -> list:
+    """Kaynak dokümanları ingest ile aynı ayarlarla chunk'lar."""
+    texts = []
+    for path in sorted(source_dir.glob('*.md')):
+        chunks = chunk_drug_document(
+            str(path),
+            chunk_size=config['retrieval']['chunk_size'],
+            chunk_overlap=config['retrieval']['chunk_overlap']
+        )
+        texts.extend(chunk['text'] for chunk in chunks)
+    return texts
+
+
+def benchmark_backend(embedder: TurkishEmbedder, texts: list, queries: list, repeats: int) -> dict:
+    """Tek sorgu gecikmesi ve toplu embed hızını ölçer."""
+    embedder.embed_array(texts[:8])  # warm-up
+
+    latencies = []
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            embedder.embed_array([query])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    chunk_vectors = embedder.embed_array(texts)
+    ingest_s = time.perf_counter() - start
+
+    return {
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'chunks_per_s': len(texts) / ingest_s,
+        'chunk_vectors': chunk_vectors,
+        'query_vectors': embedder.embed_array(queries),
+    }
+
+
+def benchmark_batching(embedder: TurkishEmbedder, texts: list, budgets: list, repeats: int) -> list:
+    """Sabit 32'lik batch (budget 0) ile token bütçeli batch'leri karşılaştırır."""
+    lengths = embedder.token_lengths(texts)
+    real_tokens = int(lengths.sum())
+    rows = []
+
+    for budget in budgets:
+        embedder.embed_token_budget = budget
+        if budget > 0:
+            batches = token_budget_batches(lengths, budget)
+        else:
+            # model.encode karakter uzunluğuna göre sıralayıp 32'lik batch'ler kurar
+            order = np.argsort([-len(text) for text in texts], kind='stable')
+            batches = [order[i:i + 32] for i in range(0, len(order), 32)]
+
+        embedder.embed_array(texts[:8])  # warm-up
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            vectors = embedder.embed_array(texts)
+            timings.append(time.perf_counter() - start)
+
+        rows.append({
+            'budget': budget,
+            'batches': len(batches),
+            'padding': padded_tokens(lengths, batches) / max(real_tokens, 1) - 1.0,
+            'chunks_per_s': len(texts) / min(timings),
+            'vectors': vectors,
+        })
+
+    return rows
+
+
+def measure_memory(fn) -> dict:
+    """fn() çalışırken tracemalloc ile ölçülen en yüksek Python heap'i ve süre."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'peak_mb': peak / 1024 ** 2, 'seconds': elapsed}
+
+
+def load_test(embedder: TurkishEmbedder, concurrency: int, requests: int) -> dict:
+    """`concurrency` thread'in her biri `requests` tekil sorgu gönderir."""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(worker_id: int):
+        local = []
+        for i in range(requests):
+            query = f"{QUERIES[(worker_id + i) % len(QUERIES)]} ({worker_id}-{i})"
+            start = time.perf_counter()
+            embedder.embed_queries([query])
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'qps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark TurkishEmbedder backends (parity, latency, throughput)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # All backends on data/pdfs
+  python scripts/benchmark_embedder.py
+
+  # Only int8, fail if cosine parity drops below 0.98
+  python scripts/benchmark_embedder.py --backends onnx-int8 --min-cosine 0.98
+
+  # Fixed 32-item batches vs token budgets
+  python scripts/benchmark_embedder.py --backends torch --token-budgets 0 4096 8192 16384
+
+  # embed() lists vs embed_array() on 5000 chunks
+  python scripts/benchmark_embedder.py --backends torch --memory --memory-chunks 5000
+
+  # Concurrent query load with micro-batching off vs on
+  python scripts/benchmark_embedder.py --backends torch --concurrency 16
+        """
+    )
+
+    parser.add_argument(
+        '--backends',
+        nargs='+',
+        choices=EMBEDDING_BACKENDS,
+        default=list(EMBEDDING_BACKENDS),
+        help='Backends to compare (torch is always run as the parity reference)'
+    )
+    parser.add_argument('--source-dir', type=Path, default=None, help='Documents to chunk (default: [data] source_dir)')
+    parser.add_argument('--repeats', type=int, default=5, help='Query latency repetitions (default: 5)')
+    parser.add_argument(
+        '--token-budgets',
+        type=int,
+        nargs='+',
+        default=[],
+        help='Compare ingest batching with these token budgets (0: fixed 32-item batches)'
+    )
+    parser.add_argument('--memory', action='store_true', help='Compare embed() lists vs embed_array() memory/time')
+    parser.add_argument(
+        '--memory-chunks',
+        type=int,
+        default=0,
+        help='Repeat the chunks up to this many texts for --memory (default: chunks as-is)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=0,
+        help='Run a concurrent query load test with N threads (default: off)'
+    )
+    parser.add_argument('--requests', type=int, default=50, help='Queries per thread in the load test (default: 50)')
+    parser.add_argument(
+        '--min-cosine',
+        type=float,
+        default=0.0,
+        help='Exit with an error if any backend has a lower minimum cosine vs torch'
+    )
+
+    args = parser.parse_args()
+
+    with open('config.toml', 'rb') as f:
+        config = tomli.load(f)
+    embedding_config = config['embedding']
+    source_dir = args.source_dir or Path(config['data']['source_dir'])
+
+    texts = load_chunks(config, source_dir)
+    if not texts:
+        print(f"❌ No documents found in {source_dir}")
+        sys.exit(1)
+
+    print(f"\n{'='*78}")
+    print(f"🤖 Model: {embedding_config['model']}")
+    print(f"📚 Chunks: {len(texts)}, queries: {len(QUERIES)} x {args.repeats}")
+    print(f"{'='*78}")
+
+    backends = ['torch'] + [b for b in args.backends if b != 'torch']
+    reference = None
+    failed = False
+
+    print(f"\n{'backend':10} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'chunks/s':>9} "
+          f"{'cos mean':>9} {'cos min':>8} {'q cos min':>9}")
+    print("-" * 78)
+
+    for backend in backends:
+        start = time.perf_counter()
+        try:
+            embedder = TurkishEmbedder(
+                model_name=embedding_config['model'],
+                device=embedding_config['device'],
+                query_cache_size=0,
+                backend=backend,
+                onnx_dir=embedding_config.get('onnx_dir', './.cache/onnx'),
+                onnx_quantization=embedding_config.get('onnx_quantization', 'avx2')
+            )
+        except ImportError as e:
+            print(f"{backend:10} skipped: {e}")
+            continue
+        load_s = time.perf_counter() - start
+
+        result = benchmark_backend(embedder, texts, QUERIES, args.repeats)
+        if reference is None:
+            reference = result
+        chunks = cosine_parity(reference['chunk_vectors'], result['chunk_vectors'])
+        queries = cosine_parity(reference['query_vectors'], result['query_vectors'])
+
+        print(f"{backend:10} {load_s:7.1f} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+              f"{result['chunks_per_s']:9.1f} {chunks['mean']:9.4f} {chunks['min']:8.4f} "
+              f"{queries['min']:9.4f}")
+
+        if min(chunks['min'], queries['min']) < args.min_cosine:
+            failed = True
+
+    if args.token_budgets:
+        backend = embedding_config.get('backend', 'torch')
+        embedder = TurkishEmbedder(
+            model_name=embedding_config['model'],
+            device=embedding_config['device'],
+            query_cache_size=0,
+            backend=backend,
+            onnx_dir=embedding_config.get('onnx_dir', './.cache/onnx'),
+            onnx_quantization=embedding_config.get('onnx_quantization', 'avx2')
+        )
+        lengths = embedder.token_lengths(texts)
+
+        print(f"\n📏 Batching ({backend}): {len(texts)} chunks, tokens mean {lengths.mean():.0f}, "
+              f"max {lengths.max()} (max_seq_length {embedder.model.max_seq_length})")
+        print(f"\n{'token budget':14} {'batches':>8} {'padding':>8} {'chunks/s':>9} {'speedup':>8} {'cos min':>8}")
+        print("-" * 62)
+
+        rows = benchmark_batching(embedder, texts, args.token_budgets, args.repeats)
+        baseline = rows[0]
+        for row in rows:
+            label = str(row['budget']) if row['budget'] > 0 else "fixed 32"
+            parity = cosine_parity(baseline['vectors'], row['vectors'])
+            print(f"{label:14} {row['batches']:8d} {row['padding']:7.1%} {row['chunks_per_s']:9.1f} "
+                  f"{row['chunks_per_s'] / baseline['chunks_per_s']:7.2f}x {parity['min']:8.4f}")
+
+    if args.memory:
+        backend = embedding_config.get('backend', 'torch')
+        embedder = TurkishEmbedder(
+            model_name=embedding_config['model'],
+            device=embedding_config['device'],
+            query_cache_size=0,
+            backend=backend,
+            onnx_dir=embedding_config.get('onnx_dir', './.cache/onnx'),
+            onnx_quantization=embedding_config.get('onnx_quantization', 'avx2'),
+            embed_token_budget=embedding_config.get('embed_token_budget', 8192)
+        )
+        corpus = texts
+        if args.memory_chunks > len(texts):
+            corpus = (texts * (args.memory_chunks // len(texts) + 1))[:args.memory_chunks]
+        embedder.embed_array(corpus[:8])  # warm-up
+
+        def via_lists():
+            vectors = np.array(embedder.embed(corpus), dtype='float32')
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        results = [
+            ('embed() + np.array', measure_memory(via_lists)),
+            ('embed_array()', measure_memory(lambda: embedder.embed_array(corpus, normalize=True))),
+        ]
+        array_mb = len(corpus) * embedder.dimension * 4 / 1024 ** 2
+
+        print(f"\n🧠 Memory ({backend}): {len(corpus)} chunks x {embedder.dimension} "
+              f"(float32 result {array_mb:.1f} MB)")
+        print(f"\n{'path':20} {'peak MB':>9} {'seconds':>8}")
+        print("-" * 40)
+        for label, result in results:
+            print(f"{label:20} {result['peak_mb']:9.1f} {result['seconds']:8.2f}")
+
+    if args.concurrency > 0:
+        backend = embedding_config.get('backend', 'torch')
+        embedder = TurkishEmbedder(
+            model_name=embedding_config['model'],
+            device=embedding_config['device'],
+            query_cache_size=0,
+            backend=backend,
+            onnx_dir=embedding_config.get('onnx_dir', './.cache/onnx'),
+            onnx_quantization=embedding_config.get('onnx_quantization', 'avx2')
+        )
+        batch_size = embedding_config.get('query_batch_size', 32)
+        wait_ms = embedding_config.get('query_batch_wait_ms', 5) or 5
+
+        print(f"\n🔀 Load test ({backend}): {args.concurrency} threads x {args.requests} queries")
+        print(f"\n{'batching':24} {'queries/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'avg batch':>10}")
+        print("-" * 64)
+
+        embedder.query_batcher = None
+        result = load_test(embedder, args.concurrency, args.requests)
+        print(f"{'off':24} {result['qps']:10.1f} {result['p50_ms']:8.2f} {result['p99_ms']:8.2f} {1.0:10.1f}")
+
+        batcher = MicroBatcher(embedder.embed_array, max_batch_size=batch_size, max_wait_ms=wait_ms)
+        embedder.query_batcher = batcher
+        result = load_test(embedder, args.concurrency, args.requests)
+        batcher.close()
+        label = f"on (max {batch_size}, {wait_ms} ms)"
+        print(f"{label:24} {result['qps']:10.1f} {result['p50_ms']:8.2f} {result['p99_ms']:8.2f} "
+              f"{batcher.requests / max(batcher.batches, 1):10.1f}")
+
+    if failed:
+        print(f"\n❌ Cosine parity below {args.min_cosine}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Compare FAISS index types (flat / HNSW / IVF) and vector quantization
+(none / SQ8 / PQ) on the ingested vectors.
+Reports recall@k against brute-force search (with and without exact
+re-ranking for quantized indexes), per-query latency, index memory and build
+time for a grid of efSearch / nprobe values, so a speed/accuracy/memory
+trade-off can be chosen before changing [database] in config.toml.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.indexing import (
+    build_index,
+    evaluate_recall,
+    index_memory_bytes,
+    reconstruct_all,
+    resolve_index_config,
+    train_index,
+)
+from src.retrieval.snapshots import resolve_snapshot
+
+
+def load_vectors(db_path: Path, synthetic: int, seed: int = 0) -> np.ndarray:
+    """Aktif snapshot'ın vektörlerini okur; istenirse gürültüyle çoğaltır.
+
+    Quantized index'lerde tam vektörler (retriever'ın rerank'i gibi)
+    vectors.npy'den okunur; reconstruct sadece kayıpsız index'lerde kullanılır.
+    """
+    snapshot = resolve_snapshot(db_path)
+    if (snapshot / "vectors.npy").exists():
+        vectors = np.load(snapshot / "vectors.npy")
+    else:
+        vectors = reconstruct_all(faiss.read_index(str(snapshot / "faiss.index")))
+
+    if synthetic and synthetic > len(vectors):
+        # Gerçek vektörlerin etrafına gürültü ekleyerek büyük korpus simülasyonu
+        rng = np.random.default_rng(seed)
+        base = vectors[rng.integers(0, len(vectors), synthetic - len(vectors))]
+        noise = rng.normal(scale=0.05, size=base.shape).astype('float32')
+        vectors = np.vstack([vectors, base + noise]).astype('float32')
+        faiss.normalize_L2(vectors)
+
+    return np.ascontiguousarray(vectors)
+
+
+def benchmark(vectors: np.ndarray, k: int, n_queries: int, rerank_factor: int):
+    """Her index tipi, quantization ve arama parametresi için recall/latency/bellek yazdırır."""
+    dimension = vectors.shape[1]
+    grid = [
+        ("flat", {}, [{}]),
+        ("flat", {"quantization": "sq8"}, [{}]),
+        ("flat", {"quantization": "pq"}, [{}]),
+        ("hnsw", {}, [{"hnsw_ef_search": ef} for ef in (16, 32, 64, 128, 256)]),
+        ("hnsw", {"quantization": "sq8"}, [{"hnsw_ef_search": ef} for ef in (64, 256)]),
+        ("ivf", {}, [{"ivf_nprobe": p} for p in (1, 2, 4, 8, 16, 32)]),
+        ("ivf", {"quantization": "sq8"}, [{"ivf_nprobe": p} for p in (8, 32)]),
+        ("ivf", {"quantization": "pq"}, [{"ivf_nprobe": p} for p in (8, 32)]),
+    ]
+
+    print(f"\n{'type':10} {'params':20} {'recall@' + str(k):>10} {'+rerank':>8} "
+          f"{'ms/query':>9} {'MB':>8} {'B/vec':>6} {'build s':>8}")
+    print("-" * 86)
+
+    for index_type, build_params, search_grid in grid:
+        config = resolve_index_config({"index_type": index_type, **build_params})
+        name = index_type if config["quantization"] == "none" else f"{index_type}+{config['quantization']}"
+
+        start = time.perf_counter()
+        index = build_index(dimension, config, n_vectors=len(vectors))
+        try:
+            train_index(index, vectors)
+        except ValueError as e:
+            print(f"{name:10} skipped: {e}")
+            continue
+        index.add(vectors)
+        build_s = time.perf_counter() - start
+        memory = index_memory_bytes(index)
+
+        for search_params in search_grid:
+            run_config = {**config, **search_params}
+            result = evaluate_recall(
+                index, vectors, run_config, k=k, n_queries=n_queries,
+                rerank_factor=rerank_factor if config["quantization"] != "none" else 0
+            )
+            label = ", ".join(f"{key}={value}" for key, value in search_params.items()) or "-"
+            reranked = f"{result['rerank_recall']:8.3f}" if 'rerank_recall' in result else f"{'-':>8}"
+            print(f"{name:10} {label:20} {result['recall']:10.3f} {reranked} "
+                  f"{result['ann_ms_per_query']:9.3f} {memory / 2**20:8.2f} "
+                  f"{memory / len(vectors):6.0f} {build_s:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark FAISS index types against brute-force search",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Benchmark on the current index
+  python scripts/benchmark_index.py
+
+  # Simulate a 50k-chunk corpus (PQ needs at least 256 vectors)
+  python scripts/benchmark_index.py --synthetic 50000
+        """
+    )
+
+    parser.add_argument(
+        '--db-path',
+        type=Path,
+        default=Path('faiss_db'),
+        help='FAISS database directory (default: faiss_db)'
+    )
+
+    parser.add_argument(
+        '--synthetic',
+        type=int,
+        default=0,
+        help='Grow the vector set to N vectors with noisy copies (default: off)'
+    )
+
+    parser.add_argument('--k', type=int, default=10, help='Recall cut-off (default: 10)')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries (default: 200)')
+    parser.add_argument(
+        '--rerank-factor',
+        type=int,
+        default=4,
+        help='Candidates per result re-scored with full-precision vectors for quantized indexes (default: 4)'
+    )
+
+    args = parser.parse_args()
+
+    if not (resolve_snapshot(args.db_path) / "faiss.index").exists():
+        print(f"❌ Index not found in {args.db_path}. Run: python -m src.ingest")
+        return
+
+    vectors = load_vectors(args.db_path, args.synthetic)
+    print(f"\n{'='*86}")
+    print(f"📐 Vectors: {len(vectors)} x {vectors.shape[1]}")
+    print(f"{'='*86}")
+
+    benchmark(vectors, args.k, args.queries, args.rerank_factor)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Throughput benchmark for prospectus text cleanup.
+Compares the previous full-text implementations (separate re.sub passes over
+the whole document, per-line re.search loops with patterns looked up in the
+re cache on every call) against the line-streaming stages in
+src/retrieval/normalizer.py, on raw PDF text and on markdown, both on an
+in-memory string and file-to-file as a stream. Outputs must be identical.
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.normalizer import (
+    normalize_markdown,
+    normalize_pdf_text,
+    split_lines,
+    structure_pdf_markdown,
+    write_lines,
+)
+
+
+def legacy_clean_raw_text(text: str) -> str:
+    """Önceki clean_raw_text (scripts/pdf_to_rag_md.py)."""
+    text = re.sub(r'\n?\d+/\d+\s*\n?', '', text)
+    text = re.sub(r'KULLANMA TALİMATI\s*\n+', '', text, flags=re.IGNORECASE)
+    lines = text.split('\n')
+    cleaned_lines = []
+    i = 0
+    while i < len(lines):
+        current = lines[i].rstrip()
+        if current and i + 1 < len(lines):
+            next_line = lines[i + 1].lstrip()
+            if (not current[-1] in '.!?:;,)' and
+                    not next_line.startswith(('-', '•', '*', '1', '2', '3', '4', '5'))):
+                if current.endswith('-'):
+                    current = current[:-1] + next_line
+                else:
+                    current = current + ' ' + next_line
+                i += 2
+                cleaned_lines.append(current)
+                continue
+        cleaned_lines.append(current)
+        i += 1
+    text = '\n'.join(cleaned_lines)
+    return re.sub(r'\n{3,}', '\n\n', text)
+
+
+def legacy_create_hierarchical_structure(text: str) -> str:
+    """Önceki create_hierarchical_structure (scripts/pdf_to_rag_md.py)."""
+    processed_lines = []
+    in_side_effects = False
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            processed_lines.append('')
+            continue
+        main_section_match = re.match(r'^(\d+)\.\s+([A-ZÇĞİÖŞÜ].+)', line)
+        if main_section_match:
+            num = main_section_match.group(1)
+            title = main_section_match.group(2)
+            processed_lines.append(f"## {num}. {title}")
+            in_side_effects = 'yan etki' in title.lower()
+            continue
+        if in_side_effects:
+            if re.match(r'^(Çok\s+)?([Yy]aygın|[Ss]eyrek|[Bb]ilinmiyor)(\s+olmayan)?[:\s]*$', line, re.IGNORECASE):
+                processed_lines.append(f"### {line.rstrip(':')}")
+                continue
+            if re.match(r'^(Çok yaygın|Yaygın olmayan|Seyrek|Çok seyrek|Bilinmiyor)\s*$', line, re.IGNORECASE):
+                processed_lines.append(f"### {line}")
+                continue
+        subsection_patterns = [
+            r'KULLANMAYINIZ', r'DİKKATLİ KULLANINIZ', r'dikkat edilmesi gerekenler',
+            r'nasıl kullanılır', r'Saklanması', r'Hamilelik', r'Emzirme',
+            r'Araç ve makine kullanımı', r'Enfeksiyonlar', r'Çocuklar ve ergenler'
+        ]
+        for pattern in subsection_patterns:
+            if re.search(pattern, line, re.IGNORECASE):
+                if line.isupper() or re.match(r'^\*\*.+\*\*$', line):
+                    processed_lines.append(f"### {line.replace('*', '').strip()}")
+                    continue
+        processed_lines.append(line)
+    return '\n'.join(processed_lines)
+
+
+def legacy_pdf_markdown(text: str) -> str:
+    """Önceki process_single_pdf adımları: clean_raw_text -> numaralı H1 -> hiyerarşi."""
+    cleaned = legacy_clean_raw_text(text)
+    md_text = re.sub(r'^(\d+)\.\s+([A-ZÇĞİÖŞÜ].+)$', r'# \1. \2', cleaned, flags=re.MULTILINE)
+    return legacy_create_hierarchical_structure(md_text)
+
+
+def legacy_clean_markdown_structure(text: str) -> str:
+    """Önceki clean_markdown_structure (scripts/clean_markdown.py)."""
+    processed = []
+    in_side_effects = False
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if not stripped:
+            processed.append('')
+            continue
+        if re.match(r'^\d+/\d+\s*$', stripped):
+            continue
+        main_section = re.match(r'^#\s+\*\*(\d+)\.\s+(.+?)\*\*$', stripped)
+        if main_section:
+            processed.append(f"## {main_section.group(1)}. {main_section.group(2)}")
+            in_side_effects = 'yan etki' in main_section.group(2).lower()
+            continue
+        subsection = re.match(r'^#\s+\*\*([A-ZÇĞİÖŞÜ][^*]+)\*\*$', stripped)
+        if subsection:
+            processed.append(f"### {subsection.group(1).strip()}")
+            continue
+        if in_side_effects:
+            if re.match(r'^(Çok\s+)?(Yaygın|Seyrek|Bilinmiyor)(\s+olmayan)?[:\s]*$', stripped, re.IGNORECASE):
+                processed.append(f"### {stripped.rstrip(':')}")
+                continue
+        processed.append(line)
+    result = '\n'.join(processed)
+    result = re.sub(r'\n{3,}', '\n\n', result)
+    return re.sub(r'\s+\d+/\d+\s+', ' ', result)
+
+
+def pdf_stages(lines):
+    return structure_pdf_markdown(normalize_pdf_text(lines))
+
+
+def best_time(fn, repeats: int) -> float:
+    """fn()'in `repeats` denemedeki en kısa süresi (saniye)."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def stream_file(stages, source: Path, target: Path):
+    with open(source, 'r', encoding='utf-8') as src, open(target, 'w', encoding='utf-8') as dst:
+        write_lines(stages(split_lines(src)), dst)
+
+
+def whole_file(fn, source: Path, target: Path):
+    target.write_text(fn(source.read_text(encoding='utf-8')), encoding='utf-8')
+
+
+def peak_mb(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def load_pdf_text(pdf_dir: Path, cache_dir: Path) -> str:
+    """PDF'lerin ham metni (process_single_pdf gibi sayfalar '\\n\\n' ile birleşir)."""
+    from src.retrieval.pdf_pages import PageCache, iter_page_texts
+
+    cache = PageCache(cache_dir)
+    documents = []
+    for path in sorted(pdf_dir.glob('*.pdf')):
+        documents.append("\n\n".join(text for _, text in iter_page_texts(path, cache) if text))
+    return "\n\n".join(documents)
+
+
+def run_case(label: str, text: str, legacy, stages, repeats: int, workdir: Path):
+    n_mb = len(text.encode('utf-8')) / 2**20
+    source = workdir / f"{label}.txt"
+    source.write_text(text, encoding='utf-8')
+
+    old = legacy(text)
+    new = '\n'.join(stages(text.split('\n')))
+    stream_file(stages, source, workdir / "stream.out")
+    streamed = (workdir / "stream.out").read_text(encoding='utf-8')
+    identical = old == new == streamed
+
+    results = [
+        ('full-text (old)', best_time(lambda: legacy(text), repeats)),
+        ('line stages', best_time(lambda: list(stages(text.split('\n'))), repeats)),
+        ('file, whole (old)', best_time(lambda: whole_file(legacy, source, workdir / "old.out"), repeats)),
+        ('file, streamed', best_time(lambda: stream_file(stages, source, workdir / "stream.out"), repeats)),
+    ]
+
+    print(f"\n📄 {label}: {n_mb:.1f} MB, {text.count(chr(10)) + 1} lines, "
+          f"output identical: {'yes' if identical else 'NO'}")
+    print(f"{'method':20} {'total ms':>9} {'MB/s':>7} {'ms/MB':>7} {'speedup':>8}")
+    print("-" * 56)
+    for i, (name, seconds) in enumerate(results):
+        baseline = results[i - i % 2][1]
+        print(f"{name:20} {seconds * 1000:9.1f} {n_mb / seconds:7.1f} {seconds * 1000 / n_mb:7.1f} "
+              f"{baseline / seconds:7.2f}x")
+    old_peak = peak_mb(lambda: whole_file(legacy, source, workdir / "old.out"))
+    new_peak = peak_mb(lambda: stream_file(stages, source, workdir / "stream.out"))
+    print(f"Peak Python memory, file: {old_peak:.1f} MB whole vs {new_peak:.2f} MB streamed")
+    return identical
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark prospectus text cleanup (full-text passes vs line-streaming stages)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Raw text of data/İlaçlar PDFs and markdown of data/pdfs
+  python scripts/benchmark_normalizer.py
+
+  # Larger sample
+  python scripts/benchmark_normalizer.py --multiply 50
+        """
+    )
+
+    parser.add_argument('--pdf-dir', type=Path, default=Path('data/İlaçlar'), help='Drug PDFs')
+    parser.add_argument('--md-dir', type=Path, default=Path('data/pdfs'), help='Markdown documents')
+    parser.add_argument('--cache-dir', type=Path, default=Path('.cache/pdf_pages'),
+                        help='Extracted page text cache (default: .cache/pdf_pages)')
+    parser.add_argument('--multiply', type=int, default=20, help='Repeat each corpus N times (default: 20)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timing repetitions, best is reported (default: 3)')
+
+    args = parser.parse_args()
+
+    cases = []
+    if any(args.pdf_dir.glob('*.pdf')):
+        cases.append(('raw PDF text', load_pdf_text(args.pdf_dir, args.cache_dir), legacy_pdf_markdown, pdf_stages))
+    markdown = "\n".join(path.read_text(encoding='utf-8') for path in sorted(args.md_dir.glob('*.md')))
+    if markdown:
+        cases.append(('markdown', markdown, legacy_clean_markdown_structure, normalize_markdown))
+    if not cases:
+        print(f"❌ No documents found in {args.pdf_dir} or {args.md_dir}")
+        sys.exit(1)
+
+    print(f"\n{'='*64}")
+    print(f"🧹 Text cleanup throughput (corpus x{args.multiply})")
+    print(f"{'='*64}")
+
+    identical = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, text, legacy, stages in cases:
+            sample = "\n".join([text] * args.multiply)
+            identical &= run_case(label, sample, legacy, stages, args.repeats, Path(tmp))
+
+    if not identical:
+        print("\n❌ Outputs differ from the previous implementation")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
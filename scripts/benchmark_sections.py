@@ -0,0 +1,161 @@
+"""
+Micro-benchmark for section classification of chunks.
+Compares the previous keyword-loop detect_section (every keyword tested with
+`in` on the lowercased chunk) against the compiled single-pass matcher
+(classify_sections), per chunk and vectorized over the whole list, and lists
+the chunks whose label changed because of word-boundary matching.
+Also times whole-document chunking: the previous sliding windows labelled
+chunk by chunk with the keyword loops against the heading-aware streaming
+chunker (iter_drug_chunks), on documents grown to leaflet sizes like Parol.
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.chunker import (
+    SECTION_KEYWORDS,
+    chunk_drug_document,
+    classify_sections,
+    detect_section,
+    iter_drug_chunks,
+)
+
+
+def legacy_detect_section(text: str) -> str:
+    """Önceki uygulama: her bölümün her keyword'ü için ayrı `in` taraması."""
+    text_lower = text.lower()
+    section_scores = {}
+    for section, keywords in SECTION_KEYWORDS.items():
+        score = sum(1 for keyword in keywords if keyword in text_lower)
+        if score > 0:
+            section_scores[section] = score
+    if section_scores:
+        return max(section_scores, key=section_scores.get)
+    return "genel"
+
+
+def legacy_chunk_document(content: str, chunk_size: int, chunk_overlap: int = 200,
+                          min_chunk_chars: int = 300) -> list:
+    """Önceki chunk_drug_document: sliding window + chunk başına keyword döngüsü."""
+    chunks = []
+    start = 0
+    while start < len(content):
+        end = start + chunk_size
+        if end < len(content):
+            for i in range(end, max(start + chunk_size//2, end - 200), -1):
+                if content[i] in '.!?\n':
+                    end = i + 1
+                    break
+        chunk_text = content[start:end].strip()
+        if len(chunk_text) >= min_chunk_chars:
+            chunks.append({'text': chunk_text, 'section': legacy_detect_section(chunk_text)})
+        start = end - chunk_overlap if end < len(content) else end
+    return chunks
+
+
+def best_time(fn, repeats: int) -> float:
+    """fn()'in `repeats` denemedeki en kısa süresi (saniye)."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark chunk section classification (keyword loops vs compiled matcher)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Chunks of data/pdfs
+  python scripts/benchmark_sections.py
+
+  # Larger sample, show label differences
+  python scripts/benchmark_sections.py --multiply 20 --show-diff 10
+        """
+    )
+
+    parser.add_argument('--source-dir', type=Path, default=Path('data/pdfs'), help='Markdown documents')
+    parser.add_argument('--chunk-size', type=int, default=1800, help='Chunk size in characters (default: 1800)')
+    parser.add_argument('--multiply', type=int, default=10, help='Repeat the chunk list N times (default: 10)')
+    parser.add_argument('--repeats', type=int, default=5, help='Timing repetitions, best is reported (default: 5)')
+    parser.add_argument('--show-diff', type=int, default=5, help='Print N chunks whose label changed')
+
+    args = parser.parse_args()
+
+    texts = []
+    for path in sorted(args.source_dir.glob('*.md')):
+        texts.extend(c['text'] for c in chunk_drug_document(str(path), chunk_size=args.chunk_size))
+    if not texts:
+        print(f"❌ No documents found in {args.source_dir}")
+        sys.exit(1)
+    sample = texts * args.multiply
+    n_chars = sum(len(t) for t in sample)
+
+    print(f"\n{'='*64}")
+    print(f"📚 {len(sample)} chunks ({n_chars / 2**20:.1f} MB), {len(SECTION_KEYWORDS)} sections, "
+          f"{sum(len(k) for k in SECTION_KEYWORDS.values())} keywords")
+    print(f"{'='*64}")
+
+    results = [
+        ('keyword loops (old)', best_time(lambda: [legacy_detect_section(t) for t in sample], args.repeats)),
+        ('detect_section', best_time(lambda: [detect_section(t) for t in sample], args.repeats)),
+        ('classify_sections', best_time(lambda: classify_sections(sample), args.repeats)),
+    ]
+
+    print(f"\n{'method':22} {'total ms':>9} {'µs/chunk':>9} {'MB/s':>7} {'speedup':>8}")
+    print("-" * 60)
+    baseline = results[0][1]
+    for label, seconds in results:
+        print(f"{label:22} {seconds * 1000:9.1f} {seconds / len(sample) * 1e6:9.1f} "
+              f"{n_chars / 2**20 / seconds:7.1f} {baseline / seconds:7.2f}x")
+
+    old = [legacy_detect_section(t) for t in texts]
+    new = classify_sections(texts)
+    changed = [(o, n, t) for o, n, t in zip(old, new, texts) if o != n]
+    print(f"\n🏷️  Labels changed: {len(changed)}/{len(texts)} chunks")
+    print(f"   Old: {dict(Counter(old))}")
+    print(f"   New: {dict(Counter(new))}")
+    for o, n, t in changed[:args.show_diff]:
+        print(f"   {o} -> {n}: {' '.join(t.split())[:90]}...")
+
+    # Tüm doküman: her prospektüs --multiply kez tekrarlanarak büyük bir prospektüs olur
+    documents = [
+        (path, "\n".join([path.read_text(encoding='utf-8')] * args.multiply))
+        for path in sorted(args.source_dir.glob('*.md'))
+    ]
+    n_chars = sum(len(content) for _, content in documents)
+    results = [
+        ('windows + loops (old)', best_time(
+            lambda: [legacy_chunk_document(content, args.chunk_size) for _, content in documents],
+            args.repeats)),
+        ('windows + classify', best_time(
+            lambda: [chunk_drug_document(str(path), chunk_size=args.chunk_size, lines=[content])
+                     for path, content in documents],
+            args.repeats)),
+        ('iter_drug_chunks', best_time(
+            lambda: [list(iter_drug_chunks(str(path), chunk_size=args.chunk_size,
+                                           lines=content.splitlines(keepends=True)))
+                     for path, content in documents],
+            args.repeats)),
+    ]
+
+    print(f"\n📄 Whole-document chunking: {len(documents)} documents, "
+          f"{n_chars / len(documents) / 1024:.0f} KB each on average")
+    print(f"{'method':22} {'total ms':>9} {'ms/doc':>9} {'MB/s':>7} {'speedup':>8}")
+    print("-" * 60)
+    baseline = results[0][1]
+    for label, seconds in results:
+        print(f"{label:22} {seconds * 1000:9.1f} {seconds / len(documents) * 1000:9.2f} "
+              f"{n_chars / 2**20 / seconds:7.1f} {baseline / seconds:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
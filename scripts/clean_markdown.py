@@ -5,73 +5,23 @@ Takes manually created MD files and applies:
 - Hierarchical heading structure
 - Side effect categorization
 - Line wrapping fixes
+Rules are shared with pdf_to_rag_md.py (src/retrieval/normalizer.py).
 """
 
 import re
+import sys
 from pathlib import Path
 from typing import List
 import argparse
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.normalizer import normalize_markdown
+
 
 def clean_markdown_structure(text: str) -> str:
     """Clean and restructure markdown for RAG."""
-    
-    lines = text.split('\n')
-    processed = []
-    in_side_effects = False
-    last_main_section = None
-    
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        
-        if not stripped:
-            processed.append('')
-            continue
-        
-        # Remove page numbers
-        if re.match(r'^\d+/\d+\s*$', stripped):
-            continue
-        
-        # Detect main sections: "# **1. ARVELES nedir**" → "## 1. ARVELES nedir"
-        main_section = re.match(r'^#\s+\*\*(\d+)\.\s+(.+?)\*\*$', stripped)
-        if main_section:
-            num = main_section.group(1)
-            title = main_section.group(2)
-            processed.append(f"## {num}. {title}")
-            last_main_section = title.lower()
-            in_side_effects = 'yan etki' in last_main_section
-            continue
-        
-        # Detect subsections: "# **KULLANMAYINIZ**" → "### KULLANMAYINIZ"
-        subsection = re.match(r'^#\s+\*\*([A-ZÇĞİÖŞÜ][^*]+)\*\*$', stripped)
-        if subsection:
-            title = subsection.group(1).strip()
-            # Check if it's a frequency category in side effects
-            if in_side_effects and re.match(r'^(Çok\s+)?(Yaygın|Seyrek|Bilinmiyor)(\s+olmayan)?$', title, re.IGNORECASE):
-                processed.append(f"### {title}")
-            else:
-                processed.append(f"### {title}")
-            continue
-        
-        # Detect standalone frequency categories (not in bold/heading)
-        if in_side_effects:
-            freq_match = re.match(r'^(Çok\s+)?(Yaygın|Seyrek|Bilinmiyor)(\s+olmayan)?[:\s]*$', stripped, re.IGNORECASE)
-            if freq_match:
-                processed.append(f"### {stripped.rstrip(':')}") 
-                continue
-        
-        # Keep regular content
-        processed.append(line)
-    
-    result = '\n'.join(processed)
-    
-    # Remove excessive blank lines
-    result = re.sub(r'\n{3,}', '\n\n', result)
-    
-    # Remove page numbers inline (e.g., "text 1/10 more text")
-    result = re.sub(r'\s+\d+/\d+\s+', ' ', result)
-    
-    return result
+    return '\n'.join(normalize_markdown(text.split('\n')))
 
 
 def add_frontmatter_if_missing(text: str, filename: str) -> str:
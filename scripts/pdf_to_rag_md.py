@@ -7,16 +7,29 @@ Features:
 - Section categorization (Yan Etkiler, Endikasyonlar, etc.)
 - Page number removal (1/10, 2/10, etc.)
 - Line wrapping cleanup
+- Cleanup rules shared with clean_markdown.py and the ingest pipeline
+  (src/retrieval/normalizer.py, single pass over a line stream)
 - Frequency-based subheadings for side effects
+- Page extraction, page cache and page-by-page streaming shared with the PDF
+  ingest (src/retrieval/pdf_pages.py)
+- Process-parallel conversion (by document and by page range for long PDFs)
+- Per-page extraction cache keyed by PDF hash and page number, so re-runs
+  after changing the cleaning rules skip pdfplumber entirely
 """
 
+import multiprocessing
 import os
 import re
+import sys
+import tempfile
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import argparse
 
-import pdfplumber
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.normalizer import normalize_pdf_text, structure_pdf_markdown, structure_sections
+from src.retrieval.pdf_pages import DEFAULT_CACHE_DIR, PageCache, iter_page_texts, pdf_page_count
 
 
 def extract_drug_metadata(text: str) -> dict:
@@ -42,110 +55,18 @@ def extract_drug_metadata(text: str) -> dict:
 
 
 def clean_raw_text(text: str) -> str:
-    """Clean raw PDF text before processing."""
-    
-    # Remove page numbers (1/10, 2/10, etc.)
-    text = re.sub(r'\n?\d+/\d+\s*\n?', '', text)
-    
-    # Remove repeated KULLANMA TALİMATI headers
-    text = re.sub(r'KULLANMA TALİMATI\s*\n+', '', text, flags=re.IGNORECASE)
-    
-    # Fix broken lines (text wrapped mid-word)
-    # Join lines that don't end with punctuation
-    lines = text.split('\n')
-    cleaned_lines = []
-    i = 0
-    while i < len(lines):
-        current = lines[i].rstrip()
-        
-        # If line doesn't end with punctuation and next line doesn't start with bullet/number
-        if current and i + 1 < len(lines):
-            next_line = lines[i + 1].lstrip()
-            if (not current[-1] in '.!?:;,)' and 
-                not next_line.startswith(('-', '•', '*', '1', '2', '3', '4', '5'))):
-                # Join with next line (remove hyphenation if exists)
-                if current.endswith('-'):
-                    current = current[:-1] + next_line
-                else:
-                    current = current + ' ' + next_line
-                i += 2
-                cleaned_lines.append(current)
-                continue
-        
-        cleaned_lines.append(current)
-        i += 1
-    
-    text = '\n'.join(cleaned_lines)
-    
-    # Remove excessive blank lines
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    
-    return text
+    """Clean raw PDF text before processing (page numbers, repeated headers, broken lines)."""
+    return '\n'.join(normalize_pdf_text(text.split('\n')))
 
 
 def create_hierarchical_structure(text: str) -> str:
     """Convert flat structure to hierarchical markdown."""
-    
-    lines = text.split('\n')
-    processed_lines = []
-    current_h1_section = None
-    in_side_effects = False
-    
-    for i, line in enumerate(lines):
-        line = line.strip()
-        
-        if not line:
-            processed_lines.append('')
-            continue
-        
-        # Detect main numbered sections (1. ARVELES nedir → ## 1. ARVELES nedir)
-        main_section_match = re.match(r'^(\d+)\.\s+([A-ZÇĞİÖŞÜ].+)', line)
-        if main_section_match:
-            num = main_section_match.group(1)
-            title = main_section_match.group(2)
-            processed_lines.append(f"## {num}. {title}")
-            current_h1_section = title.lower()
-            in_side_effects = 'yan etki' in current_h1_section
-            continue
-        
-        # Detect side effect frequency categories
-        if in_side_effects:
-            # "Çok yaygın:", "Yaygın:", "Yaygın olmayan:", "Seyrek:", "Çok seyrek:"
-            freq_match = re.match(r'^(Çok\s+)?([Yy]aygın|[Ss]eyrek|[Bb]ilinmiyor)(\s+olmayan)?[:\s]*$', line, re.IGNORECASE)
-            if freq_match:
-                processed_lines.append(f"### {line.rstrip(':')}")
-                continue
-            
-            # Alternative patterns: "Yaygın olmayan" as separate line
-            if re.match(r'^(Çok yaygın|Yaygın olmayan|Seyrek|Çok seyrek|Bilinmiyor)\s*$', line, re.IGNORECASE):
-                processed_lines.append(f"### {line}")
-                continue
-        
-        # Detect other important subsections (dikkat edilmesi gerekenler, KULLANMAYINIZ, etc.)
-        subsection_patterns = [
-            r'KULLANMAYINIZ',
-            r'DİKKATLİ KULLANINIZ',
-            r'dikkat edilmesi gerekenler',
-            r'nasıl kullanılır',
-            r'Saklanması',
-            r'Hamilelik',
-            r'Emzirme',
-            r'Araç ve makine kullanımı',
-            r'Enfeksiyonlar',
-            r'Çocuklar ve ergenler'
-        ]
-        
-        for pattern in subsection_patterns:
-            if re.search(pattern, line, re.IGNORECASE):
-                # Check if it's all caps or bold-styled
-                if line.isupper() or re.match(r'^\*\*.+\*\*$', line):
-                    processed_lines.append(f"### {line.replace('*', '').strip()}")
-                    continue
-        
-        # Regular line
-        processed_lines.append(line)
-    
-    return '\n'.join(processed_lines)
+    return '\n'.join(structure_sections(text.split('\n')))
+
+
+def structure_markdown(cleaned_text: str) -> str:
+    """Convert cleaned text to hierarchical markdown (numbered sections → H1, subsections)."""
+    return '\n'.join(structure_pdf_markdown(cleaned_text.split('\n')))
 
 
 def add_yaml_frontmatter(text: str, metadata: dict) -> str:
@@ -164,8 +85,13 @@ def add_yaml_frontmatter(text: str, metadata: dict) -> str:
     return '\n'.join(frontmatter_lines) + '\n' + text
 
 
-def process_single_pdf(pdf_path: Path, output_dir: Path, use_frontmatter: bool = True) -> bool:
-    """Process a single PDF to RAG-optimized markdown."""
+def process_single_pdf(
+    pdf_path: Path,
+    output_dir: Path,
+    use_frontmatter: bool = True,
+    cache: Optional[PageCache] = None
+) -> bool:
+    """Process a single PDF to RAG-optimized markdown (page text from cache when available)."""
     
     drug_name = pdf_path.stem
     output_path = output_dir / f"{drug_name}.md"
@@ -173,26 +99,17 @@ def process_single_pdf(pdf_path: Path, output_dir: Path, use_frontmatter: bool =
     print(f"\n🔄 Processing: {drug_name}")
     
     try:
-        # Extract text with pdfplumber
-        with pdfplumber.open(pdf_path) as pdf:
-            pages = []
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    pages.append(text)
-            raw_text = "\n\n".join(pages)
+        # Extract text with pdfplumber (or read the cached pages)
+        pages = [text for _, text in iter_page_texts(pdf_path, cache) if text]
+        raw_text = "\n\n".join(pages)
         
         print(f"   ✅ Extracted {len(raw_text)} characters from {len(pages)} pages")
         
         # Clean raw text
         cleaned_text = clean_raw_text(raw_text)
         
-        # Convert to basic markdown (heading detection)
-        # Convert numbered sections to H1
-        md_text = re.sub(r'^(\d+)\.\s+([A-ZÇĞİÖŞÜ].+)$', r'# \1. \2', cleaned_text, flags=re.MULTILINE)
-        
-        # Create hierarchical structure
-        hierarchical_text = create_hierarchical_structure(md_text)
+        # Numbered sections to H1, then hierarchical structure
+        hierarchical_text = structure_markdown(cleaned_text)
         
         # Extract metadata
         metadata = extract_drug_metadata(hierarchical_text)
@@ -221,8 +138,40 @@ def process_single_pdf(pdf_path: Path, output_dir: Path, use_frontmatter: bool =
         return False
 
 
-def batch_process(input_dir: Path, output_dir: Path, use_frontmatter: bool = True):
-    """Batch process all PDFs in directory."""
+def _extract_page_range(task: Tuple[Path, int, int, Path]) -> Tuple[Path, int, Optional[str]]:
+    """Pool task: fill the page cache for one page range of a long PDF."""
+    pdf_path, start, stop, cache_dir = task
+    try:
+        for _ in iter_page_texts(pdf_path, PageCache(cache_dir), start, stop):
+            pass
+        return pdf_path, stop - start, None
+    except Exception as e:
+        return pdf_path, stop - start, str(e)
+
+
+def _process_document(task: Tuple[Path, Path, bool, Optional[Path]]) -> bool:
+    """Pool task: convert one PDF (long ones are already in the page cache)."""
+    pdf_path, output_dir, use_frontmatter, cache_dir = task
+    cache = PageCache(cache_dir) if cache_dir is not None else None
+    return process_single_pdf(pdf_path, output_dir, use_frontmatter, cache)
+
+
+def batch_process(
+    input_dir: Path,
+    output_dir: Path,
+    use_frontmatter: bool = True,
+    workers: int = 0,
+    cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+    pages_per_task: int = 8
+):
+    """Batch process all PDFs in directory.
+    
+    Documents are spread over a process pool (workers, 0 = one per CPU).
+    PDFs longer than pages_per_task are first extracted by page range in
+    parallel, so one huge leaflet does not keep a single worker busy while
+    the others idle; the document pass then reads those pages from the
+    cache. cache_dir=None uses a temporary cache for this run only.
+    """
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
@@ -232,22 +181,60 @@ def batch_process(input_dir: Path, output_dir: Path, use_frontmatter: bool = Tru
         print(f"⚠️  No PDF files found in {input_dir}")
         return
     
+    workers = workers or os.cpu_count() or 1
+    
     print(f"\n{'='*70}")
     print(f"📚 RAG-Optimized PDF → Markdown Converter")
     print(f"📥 Input:  {input_dir}")
     print(f"📤 Output: {output_dir}")
     print(f"📝 Frontmatter: {'Yes' if use_frontmatter else 'No'}")
     print(f"📄 Files: {len(pdf_files)}")
+    print(f"⚙️  Workers: {workers}")
+    print(f"🗂️  Page cache: {cache_dir if cache_dir is not None else 'off'}")
     print(f"{'='*70}")
     
-    successful = 0
-    failed = 0
-    
-    for pdf_path in pdf_files:
-        if process_single_pdf(pdf_path, output_dir, use_frontmatter):
-            successful += 1
+    with tempfile.TemporaryDirectory() as tmp:
+        run_cache_dir = Path(cache_dir) if cache_dir is not None else Path(tmp)
+        cache = PageCache(run_cache_dir)
+        
+        # Long PDFs: page-range tasks, largest documents first
+        page_counts = {}
+        for pdf_path in pdf_files:
+            try:
+                page_counts[pdf_path] = pdf_page_count(pdf_path, cache)
+            except Exception:
+                page_counts[pdf_path] = 0  # error is reported by the document pass
+        pdf_files.sort(key=lambda path: page_counts[path], reverse=True)
+        
+        range_tasks = [
+            (pdf_path, start, min(start + pages_per_task, count), run_cache_dir)
+            for pdf_path, count in page_counts.items()
+            if workers > 1 and pages_per_task > 0 and count > pages_per_task
+            for start in range(0, count, pages_per_task)
+        ]
+        # Short PDFs only use the cache when it persists beyond this run
+        doc_tasks = [
+            (
+                pdf_path, output_dir, use_frontmatter,
+                run_cache_dir if cache_dir is not None or page_counts[pdf_path] > pages_per_task else None
+            )
+            for pdf_path in pdf_files
+        ]
+        
+        if workers > 1:
+            # spawn: pdfplumber/pdfminer state is not shared through fork
+            with multiprocessing.get_context('spawn').Pool(workers) as pool:
+                if range_tasks:
+                    print(f"\n📑 Extracting {len(range_tasks)} page ranges of long PDFs")
+                    for pdf_path, n_pages, error in pool.imap_unordered(_extract_page_range, range_tasks):
+                        if error:
+                            print(f"   ⚠️  {pdf_path.name}: {error}")
+                results = pool.map(_process_document, doc_tasks, chunksize=1)
         else:
-            failed += 1
+            results = [_process_document(task) for task in doc_tasks]
+    
+    successful = sum(results)
+    failed = len(results) - successful
     
     print(f"\n{'='*70}")
     print(f"✅ Successful: {successful}")
@@ -270,6 +257,9 @@ Examples:
   
   # Without YAML frontmatter
   python scripts/pdf_to_rag_md.py --no-frontmatter
+  
+  # 4 processes, no persistent page cache
+  python scripts/pdf_to_rag_md.py --workers 4 --no-cache
         """
     )
     
@@ -293,13 +283,47 @@ Examples:
         help='Disable YAML frontmatter generation'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help='Worker processes (default: 0 = one per CPU, 1 = sequential)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f'Extracted page text cache (default: {DEFAULT_CACHE_DIR})'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not keep extracted page text between runs'
+    )
+    
+    parser.add_argument(
+        '--pages-per-task',
+        type=int,
+        default=8,
+        help='Longer PDFs are extracted in page ranges of this size (default: 8, 0 = off)'
+    )
+    
     args = parser.parse_args()
     
     if not args.input_dir.exists():
         print(f"❌ Input directory not found: {args.input_dir}")
         return
     
-    batch_process(args.input_dir, args.output_dir, use_frontmatter=not args.no_frontmatter)
+    batch_process(
+        args.input_dir,
+        args.output_dir,
+        use_frontmatter=not args.no_frontmatter,
+        workers=args.workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        pages_per_task=args.pages_per_task
+    )
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 """Gradio tabanlı Pharma Navigator (RAG) uygulaması."""
 
 import os
+import threading
+import time
 from typing import Dict, List, Optional
 
 import dspy
@@ -9,6 +11,8 @@ import tomli
 
 from src.models.intent import classify_intent
 from src.models.qa import generate_answer
+from src.retrieval.drug_lexicon import DrugLexicon
+from src.retrieval.embedder import get_embedder
 from src.retrieval.retriever import DrugRetriever
 
 # Silence litellm noisy logging/cache issues on Python 3.14
@@ -51,9 +55,24 @@ def init_dspy_lm() -> dspy.LM:
 
 def init_retriever() -> DrugRetriever:
     """DrugRetriever'ı initialize eder."""
+    # Embedder singleton'ı query cache ayarlarıyla önceden oluştur
+    embedding_config = CONFIG["embedding"]
+    get_embedder(
+        model_name=embedding_config["model"],
+        device=embedding_config["device"],
+        query_cache_size=embedding_config.get("query_cache_size", 1024),
+        query_cache_path=embedding_config.get("query_cache_path") or None,
+        backend=embedding_config.get("backend", "torch"),
+        onnx_dir=embedding_config.get("onnx_dir", "./.cache/onnx"),
+        onnx_quantization=embedding_config.get("onnx_quantization", "avx2"),
+        query_batch_size=embedding_config.get("query_batch_size", 32),
+        query_batch_wait_ms=embedding_config.get("query_batch_wait_ms", 0),
+    )
     return DrugRetriever(
         db_path=CONFIG["database"]["path"],
         embedding_model=CONFIG["embedding"]["model"],
+        index_config=CONFIG["database"],
+        retrieval_config=CONFIG["retrieval"],
     )
 
 
@@ -61,17 +80,76 @@ LM: Optional[dspy.LM] = None
 RETRIEVER: Optional[DrugRetriever] = None
 STATS: Optional[Dict] = None
 
+# Index snapshot hot reload
+RELOAD_LOCK = threading.Lock()
+_WATCHER: Optional[threading.Thread] = None
+
+
+def reload_retriever_if_updated() -> bool:
+    """Yeni bir index snapshot'ı yayınlandıysa RETRIEVER'ı yenisiyle değiştirir.
+
+    Yeni retriever tamamen yüklendikten sonra global referans tek atamayla
+    değiştirilir; devam eden istekler ellerindeki eski retriever'la biter.
+    Embedder singleton olduğu için model yeniden yüklenmez.
+    """
+    global RETRIEVER, STATS
+
+    current = RETRIEVER
+    if current is None or not current.has_newer_snapshot():
+        return False
+
+    with RELOAD_LOCK:
+        if RETRIEVER is not current:
+            return False
+        fresh = init_retriever()
+        STATS = fresh.get_collection_stats()
+        RETRIEVER = fresh
+
+    print(f"🔄 Index snapshot reloaded: {fresh.snapshot_version} ({STATS['total_chunks']} chunks)")
+    return True
+
+
+def _watch_snapshots(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            reload_retriever_if_updated()
+        except Exception as e:
+            print(f"⚠️  Index reload failed: {e}")
+
 
-def detect_drugs_from_query(query: str, stats: Dict) -> List[str]:
-    """Kullanıcı sorgusundan ilaç isimlerini case-insensitive yakala."""
+def start_snapshot_watcher():
+    """CURRENT pointer'ını arka planda izleyen daemon thread'i başlatır."""
+    global _WATCHER
+
+    interval = CONFIG["database"].get("reload_interval", 5)
+    if _WATCHER is not None or interval <= 0:
+        return
+
+    _WATCHER = threading.Thread(
+        target=_watch_snapshots, args=(interval,), name="index-reloader", daemon=True
+    )
+    _WATCHER.start()
+
+
+def detect_drugs_from_query(query: str, lexicon: DrugLexicon) -> List[str]:
+    """Kullanıcı sorgusundan ilaç isimlerini yakalar (Türkçe case folding + fuzzy)."""
     if not query:
         return []
-    q = query.lower()
-    detected = []
-    for drug in stats.get("unique_drugs", []):
-        if drug.lower() in q:
-            detected.append(drug)
-    return detected
+    return lexicon.find(query)
+
+
+def canonicalize_drug_names(names: List[str], lexicon: DrugLexicon) -> List[str]:
+    """Intent modelinin döndürdüğü isimleri index'teki yazımlarına çevirir.
+
+    Index'te karşılığı olmayan isimler olduğu gibi bırakılır.
+    """
+    canonical = []
+    for name in names:
+        resolved = lexicon.resolve(name) or name
+        if resolved not in canonical:
+            canonical.append(resolved)
+    return canonical
 
 
 def ensure_components_ready() -> Dict:
@@ -83,6 +161,7 @@ def ensure_components_ready() -> Dict:
         dspy.configure(lm=LM)
         RETRIEVER = init_retriever()
         STATS = RETRIEVER.get_collection_stats()
+        start_snapshot_watcher()
 
     if STATS is None:
         STATS = RETRIEVER.get_collection_stats()
@@ -111,19 +190,22 @@ def build_description(stats: Dict) -> str:
 
 def handle_chat(message: str, history: Optional[List[Dict]] = None) -> str:
     """Gradio chat handler."""
-    stats = ensure_components_ready()
+    ensure_components_ready()
     user_query = (message or "").strip()
 
     if not user_query:
         return "Lütfen bir soru yazın."
 
+    # İstek boyunca aynı retriever kullanılır (hot reload ortasında değişse bile)
+    retriever = RETRIEVER
+
     intent_result = classify_intent(user_query, LM)
     if not intent_result["is_drug_related"]:
         return intent_result["refusal_message"]
 
-    drug_names = intent_result["drug_names"]
+    drug_names = canonicalize_drug_names(intent_result["drug_names"], retriever.lexicon)
     if not drug_names:
-        drug_names = detect_drugs_from_query(user_query, stats)
+        drug_names = detect_drugs_from_query(user_query, retriever.lexicon)
     
     # Section filter: eğer intent modeli belirli bir bölüm tahmin ettiyse kullan
     section_filter = None
@@ -131,7 +213,7 @@ def handle_chat(message: str, history: Optional[List[Dict]] = None) -> str:
         if intent_result["section_confidence"] in ["yüksek", "orta"]:
             section_filter = intent_result["inferred_section"]
     
-    retrieval_result = RETRIEVER.retrieve(
+    retrieval_result = retriever.retrieve(
         query=user_query,
         drug_names=drug_names if drug_names else None,
         top_k=CONFIG["retrieval"]["top_k"],
@@ -146,7 +228,7 @@ def handle_chat(message: str, history: Optional[List[Dict]] = None) -> str:
             "Lütfen sorunuzu farklı kelimelerle ifade etmeyi deneyin veya daha spesifik bir ilaç adı belirtin."
         )
 
-    context = RETRIEVER.format_context(chunks)
+    context = retriever.format_context(chunks)
     
     # Debug: Show retrieved chunks for inspection
     chunks_debug = "**[Retrieval Debug - Raw Chunks]**\n"
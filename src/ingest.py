@@ -4,18 +4,32 @@ Bu script, data/pdfs/ klasöründeki ilaç prospektüslerini okur,
 chunk'lara böler, embedlingleri oluşturur ve ChromaDB'ye kaydeder.
 
 Usage:
-    python -m src.ingest
+    python -m src.ingest            # artımlı (sadece değişen dosyalar)
+    python -m src.ingest --full     # index'i baştan kur
+    python -m src.ingest --workers 4  # chunk'ları 4 süreçte embed et
+    python -m src.ingest --chunk-workers 2  # dosyaları 2 süreçte chunk'la
+    python -m src.ingest --resume   # yarıda kalan ingest'e checkpoint'ten devam et
+    python -m src.ingest --pdf      # PDF'leri .md yazmadan doğrudan index'le
 """
 
+import argparse
 import sys
 from pathlib import Path
 from typing import List
 import tomli
-from tqdm import tqdm
 
-from src.retrieval.chunker import chunk_drug_document, get_chunk_metadata
+from src.retrieval.checkpoint import CHECKPOINT_DIR, IngestCheckpoint
 from src.retrieval.embedder import get_embedder
+from src.retrieval.embedding_pool import EmbeddingPool
+from src.retrieval.indexing import index_memory_bytes, resolve_index_config
+from src.retrieval.ingest_pipeline import IngestPipeline
+from src.retrieval.manifest import empty_manifest, load_manifest, plan_changes
 from src.retrieval.retriever import DrugRetriever
+from src.retrieval.snapshots import current_version, resolve_snapshot
+
+
+# "sections": başlık bazlı (bölüm sınırını aşmayan) chunk'lar, "window": karakter penceresi
+CHUNKING_MODES = ("sections", "window")
 
 
 def load_config(config_path: str = "config.toml") -> dict:
@@ -43,20 +57,76 @@ def find_drug_files(source_dir: str, extensions: List[str]) -> List[Path]:
     return sorted(files)
 
 
-def ingest_documents(config: dict) -> None:
-    """İlaç dokümanlarını ChromaDB'ye yükler."""
+def ingest_documents(
+    config: dict,
+    full: bool = False,
+    workers: int = None,
+    chunk_workers: int = None,
+    resume: bool = False,
+    pdf: bool = False
+) -> None:
+    """İlaç dokümanlarını FAISS index'ine yükler.
+    
+    Varsayılan olarak artımlıdır: db_path/manifest.json'daki dosya hash'leri
+    ile karşılaştırılır, sadece eklenen/değişen dosyalar chunk'lanıp
+    embed edilir, değişen/silinen dosyaların chunk'ları index'ten çıkarılır.
+    Chunk/embedding/index ayarları değişmişse veya full=True ise index
+    baştan kurulur.
+    
+    Dosyalar IngestPipeline ile işlenir: chunk'lama (chunk_workers > 1 ise
+    süreç havuzunda), dosyalar arası batch'lerle embedding ve index'e yazma
+    sınırlı kuyruklarla örtüşerek çalışır. workers > 1 ise (varsayılan:
+    [embedding] ingest_workers) embedding çok süreçli bir EmbeddingPool'da
+    yapılır.
+    
+    Yazılan chunk'lar ingest_checkpoint_interval saniyede bir
+    db_path/checkpoint'e kaydedilir; resume=True ise yarıda kalan çalışma
+    oradan devam eder (biten dosyalar yeniden chunk'lanıp embed edilmez).
+    
+    pdf=True ise [data] pdf_dir'deki PDF'ler ara markdown dosyası yazılmadan
+    sayfa sayfa çevrilip doğrudan chunk'lanır.
+    """
     
     print("🔧 Pharma Navigator - Document Ingestion")
     print("=" * 50)
     
     # Config
-    source_dir = config['data']['source_dir']
-    extensions = config['data']['supported_formats']
+    if pdf:
+        source_dir = config['data'].get('pdf_dir', './data/İlaçlar')
+        extensions = ['.pdf']
+    else:
+        source_dir = config['data']['source_dir']
+        extensions = config['data']['supported_formats']
     chunk_size = config['retrieval']['chunk_size']
     chunk_overlap = config['retrieval']['chunk_overlap']
+    chunking = config['retrieval'].get('chunking', 'window')
+    if chunking not in CHUNKING_MODES:
+        raise ValueError(f"Unknown chunking '{chunking}'. Supported: {', '.join(CHUNKING_MODES)}")
+    chunk_tokens = config['retrieval'].get('chunk_tokens', 0)
+    chunk_token_overlap = config['retrieval'].get('chunk_token_overlap', 32)
+    small_to_big = config['retrieval'].get('small_to_big', False)
+    child_max_chars = config['retrieval'].get('child_max_chars', 400)
     db_path = config['database']['path']
     collection_name = config['database']['collection_name']
     embedding_model = config['embedding']['model']
+    embedding_backend = config['embedding'].get('backend', 'torch')
+    
+    # Bu ayarlardan biri değişirse eski chunk'lar/vektörler geçersizdir
+    index_config = resolve_index_config(config['database'])
+    settings = {
+        'embedding_model': embedding_model,
+        'embedding_backend': embedding_backend,
+        'chunk_size': chunk_size,
+        'chunk_overlap': chunk_overlap,
+        'chunking': chunking,
+        'chunk_tokens': chunk_tokens,
+        'chunk_token_overlap': chunk_token_overlap,
+        'small_to_big': small_to_big,
+        'child_max_chars': child_max_chars,
+        'index_type': index_config['index_type'],
+        'quantization': index_config['quantization'],
+        'pq_m': index_config['pq_m'],
+    }
     
     # Find drug files
     print(f"\n📁 Scanning {source_dir} for drug documents...")
@@ -71,53 +141,193 @@ def ingest_documents(config: dict) -> None:
     for f in drug_files:
         print(f"   - {f.name}")
     
+    # Manifest ile karşılaştır (model yüklenmeden önce: değişiklik yoksa hemen çık)
+    manifest = load_manifest(resolve_snapshot(db_path))
+    plan = plan_changes(manifest, drug_files)
+    rebuild = full or not manifest or manifest.get('settings') != settings
+    
+    # Yarıda kalan çalışma: aynı ayarlarla ve aynı snapshot üzerine ise devam edilir
+    base_version = current_version(db_path)
+    checkpoint = IngestCheckpoint(Path(db_path) / CHECKPOINT_DIR)
+    resumed = checkpoint.resume(settings, base_version, plan['hashes']) if resume else None
+    if resume and resumed is None:
+        print("   No resumable checkpoint (missing, settings changed or a newer snapshot "
+              "was published); starting from scratch")
+    elif resumed is not None:
+        rebuild = resumed['rebuild']
+        print(f"   Resuming checkpoint: {len(resumed['files'])} file(s), "
+              f"{resumed['chunks']} chunks already embedded")
+    
+    if not rebuild and resumed is None:
+        print(f"   Added: {len(plan['added'])}, changed: {len(plan['changed'])}, "
+              f"removed: {len(plan['removed'])}, unchanged: {len(plan['unchanged'])}")
+        if not (plan['added'] or plan['changed'] or plan['removed']):
+            print(f"\n✅ Index is up to date: {db_path}")
+            return
+    
     # Initialize embedder
     print(f"\n🤖 Loading embedding model: {embedding_model}")
     embedder = get_embedder(
         model_name=embedding_model,
-        device=config['embedding']['device']
+        device=config['embedding']['device'],
+        backend=embedding_backend,
+        onnx_dir=config['embedding'].get('onnx_dir', './.cache/onnx'),
+        onnx_quantization=config['embedding'].get('onnx_quantization', 'avx2'),
+        embed_token_budget=config['embedding'].get('embed_token_budget', 8192)
     )
-    print(f"✅ Model loaded (dimension: {embedder.dimension})")
+    print(f"✅ Model loaded (dimension: {embedder.dimension}, backend: {embedder.backend})")
     
     # Initialize retriever (FAISS-based)
     print(f"\n💾 Initializing FAISS index at {db_path}...")
     retriever = DrugRetriever(
         db_path=db_path,
-        embedding_model=embedding_model
+        embedding_model=embedding_model,
+        index_config=config['database'],
+        retrieval_config=config['retrieval'],
+        embedding_cache_path=config['embedding'].get('document_cache_path') or None
     )
     
-    # Clear existing index (fresh start)
-    print(f"🗑️  Clearing existing index...")
-    retriever.clear()
+    if rebuild:
+        # Clear existing index (fresh start)
+        print(f"🗑️  Clearing existing index (full rebuild)...")
+        retriever.clear()
+        manifest = empty_manifest(settings)
+        to_ingest = drug_files
+    else:
+        stale = [f.name for f in plan['changed']] + plan['removed']
+        removed = retriever.delete_documents(stale)
+        for name in plan['removed']:
+            manifest['files'].pop(name, None)
+        print(f"🗑️  Removed {removed} chunks from {len(stale)} changed/removed file(s)")
+        to_ingest = plan['added'] + plan['changed']
     
-    # Process each drug file
-    print(f"\n📚 Processing documents...")
-    total_chunks = 0
+    segments = []
+    if resumed is not None:
+        # Checkpoint'ten sonra değişen/silinen dosyalar yeniden işlenir
+        done = checkpoint.done_files()
+        segments = checkpoint.load_segments(
+            name for name, sha in done.items() if plan['hashes'].get(name) != sha
+        )
+        to_ingest = [f for f in to_ingest if done.get(f.name) != plan['hashes'][f.name]]
+    checkpoint_interval = config['embedding'].get('ingest_checkpoint_interval', 60)
+    if checkpoint_interval <= 0:
+        checkpoint.clear()
+        checkpoint = None
+    elif resumed is None:
+        if checkpoint.exists():
+            print("   Discarding previous checkpoint (use --resume to continue it)")
+        checkpoint.begin(settings, rebuild, base_version, plan['hashes'])
     
-    for drug_file in tqdm(drug_files, desc="Ingesting"):
-        # Chunk document
-        chunks = chunk_drug_document(
-            str(drug_file),
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
+    # Chunk -> embed -> index aşamaları örtüşerek çalışır
+    print(f"\n📚 Processing {len(to_ingest)} document(s)...")
+    chunk_options = {
+        'chunk_size': chunk_size,
+        'chunk_overlap': chunk_overlap,
+        'chunking': chunking,
+        'child_max_chars': child_max_chars if small_to_big else 0,
+    }
+    if pdf:
+        chunk_options['pdf_cache_dir'] = config['data'].get('pdf_cache_dir', '')
+    if chunk_tokens > 0 and not small_to_big:
+        # Bütçe modelin max_seq_length'ini aşarsa chunk sonu yine kırpılırdı
+        max_tokens = min(chunk_tokens, embedder.max_seq_length)
+        chunk_options.update(
+            tokenizer=embedder.model.tokenizer,
+            max_tokens=max_tokens,
+            token_overlap=chunk_token_overlap,
         )
-        
-        if not chunks:
-            print(f"⚠️  No chunks created for {drug_file.name}")
-            continue
-        
-        # Prepare for FAISS
-        texts = [chunk['text'] for chunk in chunks]
-        metadatas = [get_chunk_metadata(chunk) for chunk in chunks]
-        
-        # Add to index
-        retriever.add_documents(texts, metadatas)
-        
-        total_chunks += len(chunks)
+        print(f"   Token-budget chunking: {max_tokens} tokens, {chunk_token_overlap} overlap")
     
-    # Save index
-    print(f"\n💾 Saving index...")
-    retriever.save()
+    index_type = index_config['index_type']
+    quantization = index_config['quantization']
+    print(f"   Target: '{index_type}' index (quantization: {quantization})")
+    if workers is None:
+        workers = config['embedding'].get('ingest_workers', 0)
+    if chunk_workers is None:
+        chunk_workers = config['embedding'].get('ingest_chunk_workers', 0)
+    pool = None
+    if workers > 1:
+        pool = EmbeddingPool(
+            workers,
+            threads_per_worker=config['embedding'].get('ingest_threads_per_worker', 0),
+            model_name=embedding_model,
+            device=config['embedding']['device'],
+            backend=embedding_backend,
+            onnx_dir=config['embedding'].get('onnx_dir', './.cache/onnx'),
+            onnx_quantization=config['embedding'].get('onnx_quantization', 'avx2'),
+            embed_token_budget=config['embedding'].get('embed_token_budget', 8192)
+        )
+        print(f"   Embedding pool: {pool.workers} workers x {pool.threads_per_worker} threads")
+    
+    pipeline = IngestPipeline(
+        retriever,
+        embedder=pool,
+        chunk_options=chunk_options,
+        chunk_workers=chunk_workers,
+        # İki embed thread'i: biri sonuçları toplarken havuz diğer batch'le dolu kalır
+        embed_stages=2 if pool is not None else 1,
+        batch_chunks=config['embedding'].get('ingest_batch_chunks', 1024),
+        queue_size=config['embedding'].get('ingest_queue_size', 4),
+        checkpoint=checkpoint,
+        checkpoint_interval=checkpoint_interval
+    )
+    try:
+        counts = pipeline.run(to_ingest, resumed=segments)
+    finally:
+        if pool is not None:
+            pool.close()
+    
+    for name, n_chunks in counts.items():
+        if not n_chunks:
+            print(f"⚠️  No chunks created for {name}")
+    if small_to_big:
+        print(f"   Small-to-big: {pipeline.parents} parent sections -> "
+              f"{pipeline.stats['write'].chunks} child passages (≤{child_max_chars} chars)")
+    truncation = pipeline.truncation
+    if truncation['chunks']:
+        mean_truncated = truncation['truncated_tokens'] / max(truncation['truncated_chunks'], 1)
+        print(f"   Truncation (max_seq_length {embedder.max_seq_length}): "
+              f"{truncation['truncated_chunks']}/{truncation['chunks']} chunks, "
+              f"{truncation['truncated_tokens']}/{truncation['total_tokens']} tokens dropped "
+              f"({mean_truncated:.0f} per truncated chunk)")
+    print(f"\n⏱️  Pipeline stages (chunk workers: {max(chunk_workers, 1)}, "
+          f"batch: {pipeline.batch_chunks} chunks):")
+    for line in pipeline.format_stats():
+        print(f"   {line}")
+    if pipeline.resumed_chunks:
+        print(f"   Restored from checkpoint: {pipeline.resumed_chunks} chunks")
+    if checkpoint is not None:
+        print(f"   Checkpoints written: {pipeline.checkpoints} (every ≥{checkpoint_interval}s)")
+    if retriever.embedding_cache is not None:
+        cache_stats = retriever.embedding_cache.stats()
+        print(f"   Embedding cache: {cache_stats['hits']} reused, {cache_stats['misses']} computed")
+    
+    if (index_type != "flat" or quantization != "none") and rebuild:
+        recall = retriever.evaluate_recall(k=10)
+        print(f"\n🎯 Recall@{recall['k']} vs flat: {recall['recall']:.3f} "
+              f"({recall['ann_ms_per_query']:.3f} ms/query vs "
+              f"{recall['flat_ms_per_query']:.3f} ms/query flat)")
+        if 'rerank_recall' in recall:
+            print(f"   With exact re-ranking (x{index_config['rerank_factor']}): "
+                  f"{recall['rerank_recall']:.3f} ({recall['rerank_ms_per_query']:.3f} ms/query)")
+    
+    for name, n_chunks in counts.items():
+        manifest['files'][name] = {'sha256': plan['hashes'][name], 'chunks': n_chunks}
+    retriever.manifest = manifest
+    
+    # Save index (FAISS + metadata + BM25 inverted index + manifest)
+    print(f"\n💾 Saving index snapshot...")
+    version = retriever.save()
+    print(f"   Published snapshot: {version}")
+    if checkpoint is not None:
+        checkpoint.clear()
+    print(f"   BM25 vocabulary: {len(retriever.bm25.vocab)} terms, "
+          f"{len(retriever.bm25.doc_ids)} postings")
+    n_vectors = max(retriever.index.ntotal, 1)
+    index_bytes = index_memory_bytes(retriever.index)
+    print(f"   FAISS index: {index_bytes / 2**20:.2f} MB ({index_bytes / n_vectors:.0f} bytes/chunk)")
+    if retriever.vectors is not None:
+        print(f"   Full-precision vectors on disk (mmap): {retriever.vectors.nbytes / 2**20:.2f} MB")
     
     # Stats
     print(f"\n📊 Ingestion Complete!")
@@ -130,9 +340,31 @@ def ingest_documents(config: dict) -> None:
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Ingest drug documents into the FAISS index")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore the manifest and rebuild the index from scratch")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Embedding worker processes (default: [embedding] ingest_workers, "
+                             "0/1: single process)")
+    parser.add_argument("--chunk-workers", type=int, default=None,
+                        help="Chunking worker processes (default: [embedding] ingest_chunk_workers, "
+                             "0/1: pipeline thread)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted ingest from its last checkpoint")
+    parser.add_argument("--pdf", action="store_true",
+                        help="Ingest the PDFs in [data] pdf_dir directly (no intermediate markdown)")
+    args = parser.parse_args()
+    
     try:
         config = load_config()
-        ingest_documents(config)
+        ingest_documents(
+            config,
+            full=args.full,
+            workers=args.workers,
+            chunk_workers=args.chunk_workers,
+            resume=args.resume,
+            pdf=args.pdf
+        )
     except FileNotFoundError:
         print("❌ Error: config.toml not found")
         print("   Make sure you're running from the project root directory")
@@ -0,0 +1,112 @@
+"""Micro-batching queue that merges concurrent embedding requests."""
+
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+
+class _Request:
+    __slots__ = ('texts', 'done', 'result', 'error')
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """Eşzamanlı çağrıları tek bir model çağrısında birleştirir.
+
+    Her submit() isteği kuyruğa girer; tek bir worker thread ilk isteği
+    aldıktan sonra en fazla `max_wait_ms` boyunca (veya `max_batch_size`
+    metne ulaşana kadar) gelen diğer istekleri toplar, hepsini tek
+    `encode_fn` çağrısıyla işler ve sonuçları çağıranlara dağıtır.
+
+    Modeli sadece worker thread çalıştırdığından torch thread'leri için
+    istekler arası çekişme olmaz.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Args:
+            encode_fn: Metin listesini (n, d) diziye çeviren fonksiyon
+            max_batch_size: Bir model çağrısındaki en fazla metin sayısı
+            max_wait_ms: İlk istekten sonra yeni istek beklenecek süre
+        """
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.requests = 0
+
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, texts: List[str]) -> np.ndarray:
+        """Metinleri kuyruğa ekler ve vektörleri hazır olunca döndürür (bloklar)."""
+        if not self._worker.is_alive():
+            raise RuntimeError("MicroBatcher is closed")
+        request = _Request(list(texts))
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def close(self):
+        """Worker'ı durdurur (kuyruktaki istekler önce işlenir)."""
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        """İlk istekle birlikte deadline'a kadar gelen istekleri toplar."""
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)  # close() sinyalini bir sonraki tura bırak
+                break
+            batch.append(request)
+            size += len(request.texts)
+
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect(first)
+            texts = [text for request in batch for text in request.texts]
+            try:
+                vectors = np.asarray(self.encode_fn(texts), dtype='float32')
+                offset = 0
+                for request in batch:
+                    request.result = vectors[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+            except BaseException as e:  # hata tüm bekleyen çağıranlara iletilir
+                for request in batch:
+                    request.error = e
+
+            self.batches += 1
+            self.requests += len(batch)
+            for request in batch:
+                request.done.set()
@@ -0,0 +1,187 @@
+"""Compact, memory-mappable BM25 inverted index with Turkish-aware tokenization."""
+
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .metadata_store import atomic_save_npy, atomic_write_bytes
+from .turkish import turkish_lower
+
+
+_TOKEN_RE = re.compile(r"\d+(?:[.,]\d+)?|[^\W\d_]+")
+
+# Prefix-5 kırpma: Türkçe gibi eklemeli dillerde basit ama etkili "stemming"
+STEM_PREFIX = 5
+
+# Sayı + birim birleşik token'ı için birimler ("50 mg" -> "50mg")
+_UNITS = {"mg", "g", "mcg", "µg", "ml", "iu", "ü"}
+
+_STOPWORDS = {
+    "ve", "veya", "ile", "bir", "bu", "şu", "o", "da", "de", "ki", "mi", "mı",
+    "mu", "mü", "için", "gibi", "daha", "çok", "en", "ne", "her", "ya", "ama",
+    "olan", "olarak", "ise", "kadar", "sonra", "önce", "size", "sizin", "siz",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """BM25 için token listesi üretir.
+
+    Türkçe küçük harf, stopword eleme, alfabetik token'larda prefix-5
+    kırpma; sayılar olduğu gibi tutulur ve ardından gelen birimle ek bir
+    birleşik token oluşturur ("50 mg" -> ["50", "mg", "50mg"]).
+    """
+    raw = _TOKEN_RE.findall(turkish_lower(text))
+    tokens = []
+    for i, token in enumerate(raw):
+        if token[0].isdigit():
+            tokens.append(token)
+            if i + 1 < len(raw) and raw[i + 1] in _UNITS:
+                tokens.append(token + raw[i + 1])
+        elif token not in _STOPWORDS:
+            tokens.append(token[:STEM_PREFIX])
+    return tokens
+
+
+class BM25Index:
+    """CSR formatında BM25 inverted index.
+
+    Term t'nin posting'leri doc_ids[offsets[t]:offsets[t+1]] ve aynı
+    aralıktaki tfs dizisindedir. Diziler np.load(mmap_mode='r') ile açılır;
+    sorgu sadece sorgu terimlerinin posting dilimlerine dokunur.
+    """
+
+    def __init__(
+        self,
+        vocab: List[str],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_len: np.ndarray,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        self.vocab = vocab
+        self.term_ids = {term: i for i, term in enumerate(vocab)}
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(doc_len)
+        self.avgdl = float(doc_len.mean()) if self.n_docs else 0.0
+
+        # Doküman başına BM25 uzunluk normalizasyonu (sorgu anında tekrar hesaplanmaz)
+        if self.n_docs:
+            self._norm = (k1 * (1 - b + b * doc_len / max(self.avgdl, 1e-9))).astype('float32')
+        else:
+            self._norm = np.empty(0, dtype='float32')
+
+    @classmethod
+    def build(cls, texts: Iterable[str], k1: float = 1.2, b: float = 0.75) -> 'BM25Index':
+        """Metinlerden index kurar (doküman ID = metnin sırası)."""
+        postings = {}
+        doc_len = []
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        vocab = sorted(postings)
+        offsets = np.zeros(len(vocab) + 1, dtype='int64')
+        doc_ids, tfs = [], []
+        for i, term in enumerate(vocab):
+            entries = postings[term]
+            offsets[i + 1] = offsets[i] + len(entries)
+            doc_ids.extend(d for d, _ in entries)
+            tfs.extend(min(tf, 65535) for _, tf in entries)
+
+        return cls(
+            vocab,
+            offsets,
+            np.array(doc_ids, dtype='int32'),
+            np.array(tfs, dtype='uint16'),
+            np.array(doc_len, dtype='int32'),
+            k1=k1,
+            b=b
+        )
+
+    def save(self, directory: Path):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        atomic_save_npy(directory / 'offsets.npy', np.asarray(self.offsets))
+        atomic_save_npy(directory / 'doc_ids.npy', np.asarray(self.doc_ids))
+        atomic_save_npy(directory / 'tfs.npy', np.asarray(self.tfs))
+        atomic_save_npy(directory / 'doc_len.npy', np.asarray(self.doc_len))
+
+        atomic_write_bytes(
+            directory / 'bm25.json',
+            json.dumps({'k1': self.k1, 'b': self.b, 'vocab': self.vocab}, ensure_ascii=False).encode('utf-8')
+        )
+
+    @classmethod
+    def load(cls, directory: Path) -> 'BM25Index':
+        directory = Path(directory)
+        with open(directory / 'bm25.json', 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        return cls(
+            info['vocab'],
+            np.load(directory / 'offsets.npy', mmap_mode='r'),
+            np.load(directory / 'doc_ids.npy', mmap_mode='r'),
+            np.load(directory / 'tfs.npy', mmap_mode='r'),
+            np.load(directory / 'doc_len.npy', mmap_mode='r'),
+            k1=info['k1'],
+            b=info['b']
+        )
+
+    @classmethod
+    def exists(cls, directory: Path) -> bool:
+        return (Path(directory) / 'bm25.json').exists()
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        eligible: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """BM25 ile en iyi k dokümanı döndürür.
+
+        Args:
+            query: Sorgu metni
+            k: Kaç doküman
+            eligible: Sadece bu doküman ID'leri (None: hepsi)
+
+        Returns:
+            (doc_ids, scores) skora göre azalan sırada; eşleşme yoksa boş
+        """
+        term_ids = {self.term_ids[t] for t in tokenize(query) if t in self.term_ids}
+        if not term_ids or self.n_docs == 0:
+            return np.empty(0, dtype='int64'), np.empty(0, dtype='float32')
+
+        scores = np.zeros(self.n_docs, dtype='float32')
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.tfs[start:end].astype('float32')
+            df = end - start
+            idf = math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + self._norm[docs])
+
+        if eligible is not None:
+            mask = np.zeros(self.n_docs, dtype=bool)
+            mask[eligible] = True
+            scores[~mask] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            top = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[top]
+        order = np.argsort(-scores[candidates], kind='stable')
+        candidates = candidates[order]
+        return candidates.astype('int64'), scores[candidates]
@@ -0,0 +1,217 @@
+"""Embedding caches."""
+
+import atexit
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .metadata_store import atomic_open
+from .turkish import normalize_text
+
+
+class QueryEmbeddingCache:
+    """Sorgu embedding'leri için sınırlı boyutlu LRU cache.
+
+    Anahtar: model adı + Türkçe normalize edilmiş sorgu metni; böylece
+    "Arvales'in yan etkileri nelerdir?" ve "arvales'in yan etkileri nelerdir"
+    aynı vektörü paylaşır. Thread-safe'tir (Gradio handler'ları paralel çalışır).
+
+    spill_path verilirse cache başlangıçta bu dosyadan yüklenir ve process
+    kapanırken (veya save() ile) diske yazılır.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_size: int = 1024,
+        spill_path: Optional[str] = None
+    ):
+        """
+        Args:
+            model_name: Embedding model adı (anahtarın parçası)
+            max_size: Cache'te tutulacak en fazla sorgu sayısı
+            spill_path: Kalıcı cache dosyası (.npz); None ise sadece bellekte
+        """
+        self.model_name = model_name
+        self.max_size = max_size
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.spill_path is not None:
+            self.load()
+            atexit.register(self.save)
+
+    def key(self, text: str) -> str:
+        return f"{self.model_name}\x00{normalize_text(text)}"
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Cache'teki vektörü döndürür (yoksa None) ve hit/miss sayar."""
+        key = self.key(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, text: str, vector: np.ndarray):
+        """Vektörü ekler; boyut aşılırsa en eski kullanılanı çıkarır."""
+        if self.max_size <= 0:
+            return
+        key = self.key(text)
+        with self._lock:
+            self._entries[key] = np.array(vector, dtype='float32')
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def save(self):
+        """Cache'i LRU sırasıyla spill dosyasına yazar."""
+        if self.spill_path is None:
+            return
+        with self._lock:
+            keys = list(self._entries.keys())
+            vectors = list(self._entries.values())
+
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        # Aynı spill dosyasını paylaşan süreçler (ör. Gradio worker'ları) birbirinin
+        # geçici dosyasını ezmez (atomic_open süreç başına benzersiz geçici dosya açar)
+        with atomic_open(self.spill_path) as f:
+            np.savez(
+                f,
+                keys=np.array(keys, dtype=str),
+                vectors=np.stack(vectors) if vectors else np.empty((0, 0), dtype='float32')
+            )
+
+    def load(self):
+        """Spill dosyasındaki girdileri yükler (farklı model anahtarları yok sayılır)."""
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        try:
+            with np.load(self.spill_path) as data:
+                keys, vectors = data['keys'], data['vectors']
+        except (OSError, ValueError, KeyError):
+            return  # Bozuk cache dosyası: boş cache ile devam
+
+        prefix = f"{self.model_name}\x00"
+        with self._lock:
+            for key, vector in zip(keys.tolist(), vectors):
+                if key.startswith(prefix):
+                    self._entries[key] = vector
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class EmbeddingStore:
+    """Chunk embedding'leri için kalıcı, içerik adresli (content-addressed) cache.
+
+    Anahtar: sha256(model adı + normalize edilmiş chunk metni). Normalizasyon
+    sadece Unicode NFC ve boşluk sadeleştirmedir (tokenizer'ın zaten yok
+    saydığı farklar); büyük/küçük harf ve noktalama korunur. Vektörler
+    SQLite'ta ham float32 blob olarak saklanır, böylece index tipi, eşik veya
+    metadata değişikliklerinden sonraki ingest'ler embedding hesaplamaz.
+    """
+
+    _BATCH = 500  # SQLite IN (...) sorgusu başına anahtar sayısı
+
+    def __init__(self, path: str, model_name: str):
+        """
+        Args:
+            path: SQLite dosyası
+            model_name: Embedding model adı/namespace'i (anahtarın parçası)
+        """
+        self.path = Path(path)
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def key(self, text: str) -> bytes:
+        normalized = " ".join(unicodedata.normalize('NFC', text).split())
+        return hashlib.sha256(f"{self.model_name}\x00{normalized}".encode('utf-8')).digest()
+
+    def get_many(self, texts: List[str], dimension: int) -> List[Optional[np.ndarray]]:
+        """Her metin için cache'teki vektörü (yoksa None) döndürür."""
+        keys = [self.key(text) for text in texts]
+        found: Dict[bytes, np.ndarray] = {}
+
+        with self._lock:
+            for start in range(0, len(keys), self._BATCH):
+                batch = list(set(keys[start:start + self._BATCH]))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for key, blob in rows:
+                    if len(blob) == dimension * 4:
+                        found[key] = np.frombuffer(blob, dtype='float32')
+
+        result = [found.get(key) for key in keys]
+        hits = sum(1 for vector in result if vector is not None)
+        self.hits += hits
+        self.misses += len(result) - hits
+        return result
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Vektörleri tek transaction'da yazar."""
+        rows = [
+            (self.key(text), np.asarray(vector, dtype='float32').tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
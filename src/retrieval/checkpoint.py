@@ -0,0 +1,149 @@
+"""Append-only ingest checkpoints so an interrupted ingest can be resumed.
+
+Layout:
+    faiss_db/checkpoint/
+        state.json               # ayarlar, başlangıç sürümü, segment sayısı, biten dosyalar
+        segment-00000.npy        # segmentteki chunk vektörleri (L2-normalize)
+        segment-00000.json       # metinler, metadata, parent'lar, dosya -> chunk sayısı
+
+Ingest pipeline'ı yazdığı batch'leri periyodik olarak yeni bir segment
+olarak ekler; önce segment dosyaları, en son state.json atomik yazılır.
+Yarıda kalan bir yazma state.json'da sayılmayan bir segment bırakır ve
+yok sayılır. --resume segmentleri geri yükler, sadece bitmemiş dosyaları
+işler; başarılı save() sonrası dizin silinir.
+"""
+
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .metadata_store import atomic_save_npy, atomic_write_bytes
+
+
+CHECKPOINT_DIR = "checkpoint"
+STATE_FILE = "state.json"
+
+
+class IngestCheckpoint:
+    """Bir ingest çalışmasının yazılmış batch'lerini diskte biriktirir."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.state: Dict = {}
+        self.hashes: Dict[str, str] = {}
+
+    def exists(self) -> bool:
+        return (self.directory / STATE_FILE).exists()
+
+    def _segment_path(self, index: int, suffix: str) -> Path:
+        return self.directory / f"segment-{index:05d}{suffix}"
+
+    def _write_state(self):
+        atomic_write_bytes(
+            self.directory / STATE_FILE,
+            json.dumps(self.state, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+        )
+
+    def begin(self, settings: Dict, rebuild: bool, base_version: Optional[str], hashes: Dict[str, str]):
+        """Önceki checkpoint'i silip yeni bir çalışma başlatır.
+
+        Args:
+            settings: Manifest ayarları (değişirse checkpoint geçersizdir)
+            rebuild: Çalışma index'i baştan mı kuruyor
+            base_version: Artımlı çalışmada üzerine eklenen snapshot sürümü
+            hashes: Dosya adı -> sha256 (biten dosyalar bu hash'le kaydedilir)
+        """
+        self.clear()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.state = {
+            'settings': dict(settings),
+            'rebuild': rebuild,
+            'base_version': base_version,
+            'segments': 0,
+            'chunks': 0,
+            'files': {},
+        }
+        self.hashes = dict(hashes)
+        self._write_state()
+
+    def resume(self, settings: Dict, base_version: Optional[str], hashes: Dict[str, str]) -> Optional[Dict]:
+        """Uyumlu bir checkpoint varsa state'ini döndürür (yoksa None).
+
+        Ayarlar değişmişse veya artımlı bir çalışmanın üzerine eklendiği
+        snapshot artık aktif değilse checkpoint kullanılamaz.
+        """
+        if not self.exists():
+            return None
+        with open(self.directory / STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('settings') != settings:
+            return None
+        if not state.get('rebuild') and state.get('base_version') != base_version:
+            return None
+        self.state = state
+        self.hashes = dict(hashes)
+        return state
+
+    def append(self, segment: Dict):
+        """Bir segmenti (dosya sırasıyla birleştirilmiş batch'ler) kaydeder.
+
+        segment: {'files': [(ad, chunk sayısı)], 'texts', 'metadatas',
+                  'parent_texts', 'parent_metadatas', 'vectors'}
+        """
+        index = self.state['segments']
+        atomic_save_npy(self._segment_path(index, '.npy'), segment['vectors'])
+        record = {key: segment[key] for key in ('files', 'texts', 'metadatas', 'parent_texts', 'parent_metadatas')}
+        atomic_write_bytes(
+            self._segment_path(index, '.json'),
+            json.dumps(record, ensure_ascii=False).encode('utf-8')
+        )
+
+        # state.json en son: sayılmayan segment yarım kalmış demektir
+        self.state['segments'] = index + 1
+        self.state['chunks'] += len(segment['texts'])
+        for name, n_chunks in segment['files']:
+            self.state['files'][name] = {'sha256': self.hashes.get(name), 'chunks': n_chunks}
+        self._write_state()
+
+    def load_segments(self, skip_files: Iterable[str] = ()) -> List[Dict]:
+        """Kayıtlı segmentleri append() formatında yükler.
+
+        skip_files'taki dosyaların (checkpoint'ten sonra değişmiş/silinmiş)
+        satırları çıkarılır; bu dosyalar yeniden işlenir.
+        """
+        skip = set(skip_files)
+        segments = []
+        for index in range(self.state.get('segments', 0)):
+            vectors = np.load(self._segment_path(index, '.npy'))
+            with open(self._segment_path(index, '.json'), 'r', encoding='utf-8') as f:
+                segment = json.load(f)
+            segment['files'] = [tuple(item) for item in segment['files']]
+            segment['vectors'] = vectors
+
+            if skip:
+                keep = [i for i, meta in enumerate(segment['metadatas']) if meta.get('source_file') not in skip]
+                segment['texts'] = [segment['texts'][i] for i in keep]
+                segment['metadatas'] = [segment['metadatas'][i] for i in keep]
+                segment['vectors'] = vectors[keep]
+                parents = [
+                    (text, meta)
+                    for text, meta in zip(segment['parent_texts'], segment['parent_metadatas'])
+                    if meta.get('source_file') not in skip
+                ]
+                segment['parent_texts'] = [text for text, _ in parents]
+                segment['parent_metadatas'] = [meta for _, meta in parents]
+                segment['files'] = [(name, n) for name, n in segment['files'] if name not in skip]
+            segments.append(segment)
+        return segments
+
+    def done_files(self) -> Dict[str, str]:
+        """Checkpoint'te biten dosyalar: ad -> kaydedildiği andaki sha256."""
+        return {name: info['sha256'] for name, info in self.state.get('files', {}).items()}
+
+    def clear(self):
+        """Checkpoint dizinini siler."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.state = {}
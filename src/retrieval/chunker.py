@@ -1,9 +1,18 @@
 """Document chunking for drug prospectuses."""
 
+import contextlib
 import re
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+from .turkish import turkish_lower
+
+
+# Markdown başlık satırı, tüm seviyeler (prospektüslerde "#### 4. ..." de olur)
+_HEADING_PATTERN = re.compile(r"#{1,6}\s+\S")
+# Numaralı prospektüs bölümü ("1. ARVELES nedir ...", "**2. ...")
+_NUMBERED_HEADING = re.compile(r"^[*_\s]*\d+\.")
+
 
 def extract_drug_name(file_path: str) -> str:
     """Dosya adından ilaç ismini çıkarır.
@@ -17,6 +26,158 @@ def extract_drug_name(file_path: str) -> str:
     return Path(file_path).stem
 
 
+# Bölüm -> keyword'ler (sıra, eşit skorda önceliği belirler)
+SECTION_KEYWORDS = {
+    "yan etkiler": [
+        "yan etki", "olası yan", "istenmeyen etki", "adverse", 
+        "side effect", "yan tesir", "olumsuz etki"
+    ],
+    "kullanım": [
+        "nasıl kullan", "kullanım şekli", "doz", "dozaj", "uygulama", 
+        "alınır", "verilir", "enjekte", "tablet", "mg", "günde", 
+        "sabah", "akşam", "aç", "tok", "yemek"
+    ],
+    "bileşim": [
+        "bileşim", "etkin madde", "içindekiler", "yardımcı madde", 
+        "aktif madde", "formül", "mg", "içerir", "eşdeğer"
+    ],
+    "uyarılar": [
+        "uyar", "dikkat", "kullanmadan önce", "kullanmayınız", 
+        "kontrendik", "yasak", "tehlike", "risk", "sakın"
+    ],
+    "etkileşimler": [
+        "etkileşim", "diğer ilaçlar", "birlikte kullan", "beraber", 
+        "kombinasyon", "ilaç ilaç", "alkol", "gıda"
+    ],
+    "doz aşımı": [
+        "doz aşımı", "fazla kullan", "aşırı doz", "overdoz", 
+        "zehirlenme", "intoksikasyon"
+    ],
+    "saklama": [
+        "saklama", "muhafaza", "son kullanma", "depolama", 
+        "sıcaklık", "ışık", "nem", "çocuk"
+    ],
+    "endikasyonlar": [
+        "ne için kullan", "nedir", "endikasyon", "tedavi", 
+        "hastalık", "semptom", "belirti", "şikayet"
+    ]
+}
+
+# Başka kelimelerin içinde sık geçen kısa keyword'ler sadece tam kelime olarak
+# eşleşir ("aç" -> "açık", "tok" -> "toksik", "mg" -> "mgl" eşleşmez); diğerleri
+# kelime başında eşleşir ve Türkçe ekleri kabul eder ("doz" -> "dozu")
+_WHOLE_WORD_KEYWORDS = {"mg", "aç", "tok", "nem"}
+
+# Metinler arası ayraç (hiçbir keyword'ü içermez, kelime sınırıdır)
+_TEXT_SEPARATOR = "\n\x00\n"
+
+
+def _trie_pattern(keywords) -> str:
+    """Keyword'lerden ortak önekleri paylaşan (trie) bir regex üretir.
+    
+    re modülü alternatifleri sırayla denediğinden, trie biçimi her kelime
+    başında karakter başına tek dal denemesine iner. Daha uzun devam
+    önce denenir, yani aynı konumda en uzun keyword yakalanır.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = keyword
+    
+    def emit(node: dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if "" not in node:
+            return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Keyword burada bitebilir; tam kelime olması gerekenler sağ sınır ister
+        end = r"(?!\w)" if node[""] in _WHOLE_WORD_KEYWORDS else ""
+        if not branches:
+            return end
+        return "(?:" + "|".join(branches + [end]) + ")"
+    
+    return emit(trie)
+
+
+def _compile_section_matcher():
+    """Tüm keyword'leri tek bir regex'te birleştirir.
+    
+    Desen her kelime başında lookahead ile denenir; böylece iç içe geçen
+    keyword'ler ("aşırı doz" ve "doz") ayrı ayrı bulunur. Aynı konumda
+    başlayan kısa keyword'ler (örn. "dozaj" içindeki "doz") `implied`
+    ile eklenir.
+    """
+    keyword_sections: Dict[str, List[int]] = {}
+    for index, keywords in enumerate(SECTION_KEYWORDS.values()):
+        for keyword in keywords:
+            keyword_sections.setdefault(keyword, []).append(index)
+    
+    pattern = re.compile(r"\b(?=(" + _trie_pattern(keyword_sections) + "))")
+    
+    implied = {}
+    for keyword in keyword_sections:
+        implied[keyword] = [
+            other for other in keyword_sections
+            if keyword.startswith(other) and (
+                other not in _WHOLE_WORD_KEYWORDS
+                or not keyword[len(other):len(other) + 1].isalnum()
+            )
+        ]
+    
+    return pattern, keyword_sections, implied
+
+
+_SECTION_PATTERN, _KEYWORD_SECTIONS, _IMPLIED_KEYWORDS = _compile_section_matcher()
+_SECTION_NAMES = list(SECTION_KEYWORDS)
+
+
+def classify_sections(texts: List[str]) -> List[str]:
+    """Metin listesinin bölümlerini tek regex taramasıyla tespit eder.
+    
+    Metinler Türkçe küçük harfe çevrilip birleştirilir ve derlenmiş desen
+    tek seferde taranır. Her bölümün skoru, metinde geçen farklı
+    keyword sayısıdır; en yüksek skorlu bölüm (eşitlikte SECTION_KEYWORDS
+    sırası) seçilir, eşleşme yoksa "genel".
+    
+    Args:
+        texts: Prospektüs metin parçaları
+        
+    Returns:
+        Her metin için bölüm adı
+    """
+    if not texts:
+        return []
+    
+    joined = _TEXT_SEPARATOR.join(turkish_lower(text) for text in texts)
+    matched: List[set] = [set() for _ in texts]
+    
+    # Metin sınırları: eşleşme konumundan metin indeksine
+    ends = []
+    position = -len(_TEXT_SEPARATOR)
+    for text in texts:
+        position += len(_TEXT_SEPARATOR) + len(text)
+        ends.append(position)
+    
+    current = 0
+    for match in _SECTION_PATTERN.finditer(joined):
+        while match.start() > ends[current]:
+            current += 1
+        matched[current].update(_IMPLIED_KEYWORDS[match.group(1)])
+    
+    sections = []
+    for keywords in matched:
+        if not keywords:
+            sections.append("genel")
+            continue
+        scores = [0] * len(_SECTION_NAMES)
+        for keyword in keywords:
+            for index in _KEYWORD_SECTIONS[keyword]:
+                scores[index] += 1
+        sections.append(_SECTION_NAMES[scores.index(max(scores))])
+    
+    return sections
+
+
 def detect_section(text: str) -> str:
     """Metin parçasının hangi bölümden geldiğini tespit eder.
     
@@ -26,57 +187,7 @@ def detect_section(text: str) -> str:
     Returns:
         Bölüm adı (örn: "yan etkiler", "kullanım", "uyarılar")
     """
-    text_lower = text.lower()
-    
-    # Daha güçlü pattern matching
-    section_patterns = {
-        "yan etkiler": [
-            "yan etki", "olası yan", "istenmeyen etki", "adverse", 
-            "side effect", "yan tesir", "olumsuz etki"
-        ],
-        "kullanım": [
-            "nasıl kullan", "kullanım şekli", "doz", "dozaj", "uygulama", 
-            "alınır", "verilir", "enjekte", "tablet", "mg", "günde", 
-            "sabah", "akşam", "aç", "tok", "yemek"
-        ],
-        "bileşim": [
-            "bileşim", "etkin madde", "içindekiler", "yardımcı madde", 
-            "aktif madde", "formül", "mg", "içerir", "eşdeğer"
-        ],
-        "uyarılar": [
-            "uyar", "dikkat", "kullanmadan önce", "kullanmayınız", 
-            "kontrendik", "yasak", "tehlike", "risk", "sakın"
-        ],
-        "etkileşimler": [
-            "etkileşim", "diğer ilaçlar", "birlikte kullan", "beraber", 
-            "kombinasyon", "ilaç ilaç", "alkol", "gıda"
-        ],
-        "doz aşımı": [
-            "doz aşımı", "fazla kullan", "aşırı doz", "overdoz", 
-            "zehirlenme", "intoksikasyon"
-        ],
-        "saklama": [
-            "saklama", "muhafaza", "son kullanma", "depolama", 
-            "sıcaklık", "ışık", "nem", "çocuk"
-        ],
-        "endikasyonlar": [
-            "ne için kullan", "nedir", "endikasyon", "tedavi", 
-            "hastalık", "semptom", "belirti", "şikayet"
-        ]
-    }
-    
-    # Skorlama sistemi - birden fazla keyword eşleşirse daha güvenilir
-    section_scores = {}
-    for section, keywords in section_patterns.items():
-        score = sum(1 for keyword in keywords if keyword in text_lower)
-        if score > 0:
-            section_scores[section] = score
-    
-    if section_scores:
-        # En yüksek skoru alan bölümü döndür
-        return max(section_scores, key=section_scores.get)
-    
-    return "genel"
+    return classify_sections([text])[0]
 
 
 def detect_section_from_heading(heading: str) -> str:
@@ -104,76 +215,300 @@ def detect_section_from_heading(heading: str) -> str:
     return "genel"
 
 
-def _split_markdown_sections(content: str) -> List[Dict[str, str]]:
-    """Başlığı ve gövdesiyle birlikte markdown bölümlerini döndürür."""
-    pattern = re.compile(r"(^#{1,3}\s+.+$)", re.MULTILINE)
-    matches = list(pattern.finditer(content))
-    sections: List[Dict[str, str]] = []
-
-    if not matches:
-        text = content.strip()
-        if text:
-            sections.append({"heading": None, "text": text})
-        return sections
+def _char_windows(content: str, chunk_size: int, chunk_overlap: int):
+    """Karakter bazlı sliding window; (start, end) aralıkları üretir."""
+    start = 0
+    
+    while start < len(content):
+        end = start + chunk_size
+        
+        # Cümle sonunda kes
+        if end < len(content):
+            for i in range(end, max(start + chunk_size//2, end - 200), -1):
+                if content[i] in '.!?\n':
+                    end = i + 1
+                    break
+        
+        yield start, end
+        
+        start = end - chunk_overlap if end < len(content) else end
 
-    for idx, match in enumerate(matches):
-        heading_line = match.group(1).strip()
-        heading_text = heading_line.lstrip('#').strip()
-        start = match.end()
-        end = matches[idx + 1].start() if idx + 1 < len(matches) else len(content)
-        body = content[start:end].strip()
-        combined = heading_line + "\n" + body if body else heading_line
-        sections.append({"heading": heading_text, "text": combined.strip()})
 
-    return sections
+def _token_windows(content: str, tokenizer, max_tokens: int, token_overlap: int):
+    """Embedding tokenizer'ıyla sayılan, max_tokens'a sığan (start, end) aralıkları.
+    
+    Doküman bir kez tokenize edilir; pencere sınırları token offset'lerinden
+    karaktere çevrilir. Pencere, ikinci yarısındaki son cümle sonunda kesilir.
+    """
+    encoding = tokenizer(
+        content,
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        verbose=False
+    )
+    offsets = encoding['offset_mapping']
+    budget = max(1, max_tokens - tokenizer.num_special_tokens_to_add())
+    n_tokens = len(offsets)
+    start = 0
+    
+    while start < n_tokens:
+        end = min(start + budget, n_tokens)
+        
+        # Cümle sonunda kes (iki token arasındaki metinde . ! ? veya satır sonu)
+        if end < n_tokens:
+            for i in range(end, start + budget // 2, -1):
+                gap = content[offsets[i - 1][1] - 1:offsets[i][0]]
+                if any(c in '.!?\n' for c in gap):
+                    end = i
+                    break
+        
+        yield offsets[start][0], offsets[end - 1][1]
+        
+        start = max(end - token_overlap, start + 1) if end < n_tokens else end
 
 
 def chunk_drug_document(
     file_path: str,
     chunk_size: int = 1800,
     chunk_overlap: int = 200,
-    min_chunk_chars: int = 300
+    min_chunk_chars: int = 300,
+    tokenizer=None,
+    max_tokens: int = 0,
+    token_overlap: int = 32,
+    lines: Optional[Iterable[str]] = None
 ) -> List[Dict[str, str]]:
-    """İlaç prospektüsünü basit ve etkili şekilde chunk'lara böler."""
+    """İlaç prospektüsünü basit ve etkili şekilde chunk'lara böler.
+    
+    lines verilirse metin dosyadan okunmaz, bu satırlardan gelir (file_path
+    sadece ilaç adı ve source_file için kullanılır). Başlık bazlı chunk'lama
+    için iter_drug_chunks kullanılır.
+    
+    tokenizer ve max_tokens verilirse pencereler karakter yerine embedding
+    modelinin token'larıyla ölçülür (chunk_size/chunk_overlap yerine
+    max_tokens/token_overlap); böylece chunk'lar modelin max_seq_length'inde
+    kırpılmaz.
+    """
     drug_name = extract_drug_name(file_path)
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    if lines is not None:
+        content = "".join(lines)
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    
+    if tokenizer is not None and max_tokens > 0:
+        windows = _token_windows(content, tokenizer, max_tokens, token_overlap)
+    else:
+        # Basit sliding window chunking
+        windows = _char_windows(content, chunk_size, chunk_overlap)
     
-    # Basit sliding window chunking
     chunks = []
     chunk_id = 0
-    start = 0
     
-    while start < len(content):
-        end = start + chunk_size
-        
-        # Cümle sonunda kes
-        if end < len(content):
-            for i in range(end, max(start + chunk_size//2, end - 200), -1):
-                if content[i] in '.!?\n':
-                    end = i + 1
-                    break
-        
+    for start, end in windows:
         chunk_text = content[start:end].strip()
         
         if len(chunk_text) >= min_chunk_chars:
-            section = detect_section(chunk_text)
-            
             chunks.append({
                 'text': chunk_text,
                 'drug_name': drug_name,
-                'section': section,
                 'chunk_id': chunk_id,
                 'source_file': str(Path(file_path).name)
             })
             chunk_id += 1
-        
-        start = end - chunk_overlap if end < len(content) else end
+    
+    # Bölümler tüm chunk'lar için tek taramada
+    for chunk, section in zip(chunks, classify_sections([c['text'] for c in chunks])):
+        chunk['section'] = section
     
     return chunks
 
 
+def _heading_rank(line: str) -> Tuple[int, str]:
+    """Başlık satırının hiyerarşideki sırası (küçük = üst) ve temiz metni.
+    
+    Numaralı prospektüs bölümleri ("4. Olası yan etkiler nelerdir?") hangi
+    '#' seviyesinde yazılmış olursa olsun en üst sıradadır (0) ve başlık
+    yolunu sıfırlar; numarasız başlıklar seviyelerine göre altına girer.
+    """
+    text = line.lstrip('#').strip().strip('*_').strip()
+    if _NUMBERED_HEADING.match(text) is not None:
+        return 0, text
+    level = len(line) - len(line.lstrip('#'))
+    return level * 2, text
+
+
+def _section_label(path: List[Tuple[int, str]], body: str) -> str:
+    """Bölüm etiketi: en yakın başlık, yoksa içindeki numaralı bölüm başlığı.
+    
+    Aradaki numarasız başlıklar (örn. prospektüs başındaki "... dikkatlice
+    okuyunuz" banner'ı) etiket vermez; hiçbiri etiket vermezse bölüm metni
+    bir kez keyword'lerle taranır.
+    """
+    candidates = path[-1:] + [(rank, heading) for rank, heading in path[:-1] if rank == 0]
+    for _, heading in candidates:
+        section = detect_section_from_heading(heading)
+        if section != "genel":
+            return section
+    return detect_section(body)
+
+
+def _iter_markdown_sections(lines) -> Iterator[Tuple[List[Tuple[int, str]], str]]:
+    """Satır akışından (başlık yolu, bölüm metni) çiftleri üretir.
+    
+    Bellekte sadece o anki bölümün satırları tutulur.
+    """
+    path: List[Tuple[int, str]] = []
+    buffer: List[str] = []
+    
+    for line in lines:
+        if _HEADING_PATTERN.match(line):
+            text = "".join(buffer).strip()
+            if text:
+                yield list(path), text
+            buffer = []
+            
+            rank, heading = _heading_rank(line.strip())
+            while path and path[-1][0] >= rank:
+                path.pop()
+            path.append((rank, heading))
+        buffer.append(line)
+    
+    text = "".join(buffer).strip()
+    if text:
+        yield list(path), text
+
+
+def iter_drug_chunks(
+    file_path: str,
+    chunk_size: int = 1800,
+    chunk_overlap: int = 200,
+    min_chunk_chars: int = 300,
+    tokenizer=None,
+    max_tokens: int = 0,
+    token_overlap: int = 32,
+    lines: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, str]]:
+    """Prospektüsü başlıklara göre bölüp chunk'ları tek tek üretir (generator).
+    
+    Dosya (veya verilmişse `lines` satır akışı, örn. sayfa sayfa çevrilen
+    bir PDF) satır satır okunur; her markdown bölümü kendi içinde (karakter
+    veya token penceresiyle) bölünür, yani chunk'lar bölüm sınırını aşmaz.
+    Bölüm etiketi chunk başına keyword taraması yerine başlık yolundan
+    (örn. "2. ... kullanmadan önce" > "KULLANMAYINIZ") gelir.
+    min_chunk_chars'tan kısa bölümler bir sonraki bölümle birleştirilir ve
+    (sadece başlıktan ibaret değillerse) geldikleri bölümün başlığını /
+    etiketini korur; dosya sonunda kalan kısa bölüm ayrı bir chunk olur.
+    """
+    drug_name = extract_drug_name(file_path)
+    source_file = str(Path(file_path).name)
+    chunk_id = 0
+    pending = ""
+    pending_path: Optional[List[Tuple[int, str]]] = None
+    last_path: List[Tuple[int, str]] = []
+    
+    def section_chunks(path, text):
+        nonlocal chunk_id
+        section = _section_label(path, text)
+        heading = " > ".join(heading for _, heading in path)
+        
+        if tokenizer is not None and max_tokens > 0:
+            windows = _token_windows(text, tokenizer, max_tokens, token_overlap)
+        else:
+            windows = _char_windows(text, chunk_size, chunk_overlap)
+        
+        for start, end in windows:
+            chunk_text = text[start:end].strip()
+            if not chunk_text:
+                continue
+            yield {
+                'text': chunk_text,
+                'drug_name': drug_name,
+                'section': section,
+                'heading': heading,
+                'chunk_id': chunk_id,
+                'source_file': source_file
+            }
+            chunk_id += 1
+    
+    with contextlib.ExitStack() as stack:
+        if lines is None:
+            lines = stack.enter_context(open(file_path, 'r', encoding='utf-8'))
+        for path, text in _iter_markdown_sections(lines):
+            # Sadece başlıktan oluşan bölüm (başlık sayfası, içi alt başlıklarla başlayan bölüm)
+            heading_only = "\n" not in text and _HEADING_PATTERN.match(text) is not None
+            if pending:
+                text = pending + "\n\n" + text
+                pending = ""
+            if pending_path is None and not heading_only:
+                pending_path = path
+            if len(text) < min_chunk_chars:
+                pending = text
+                last_path = path
+                continue
+            # Birleşen metin, içeriği olan ilk kısa bölümün başlık yolunu (ve etiketini) taşır
+            yield from section_chunks(pending_path or path, text)
+            pending_path = None
+    
+    if pending:
+        yield from section_chunks(pending_path or last_path, pending)
+
+
+# Madde işaretli satır (-, *, •, "1.", "a)")
+_BULLET_LINE = re.compile(r"^\s*(?:[-*•·]|\d+[.)]|[a-zçğıöşü][.)])\s+")
+# Cümle sonu: . ! ? ardından boşluk (ondalık sayılar "2.5" bölünmez)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _passage_units(text: str) -> List[Tuple[str, bool]]:
+    """Metni küçük birimlere ayırır: madde satırları ve cümleler.
+    
+    (birim, madde_mi) çiftleri döner; başlık satırları atlanır.
+    """
+    units: List[Tuple[str, bool]] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or _HEADING_PATTERN.match(line):
+            continue
+        if _BULLET_LINE.match(line):
+            units.append((line, True))
+        else:
+            units.extend((s, False) for s in _SENTENCE_END.split(line) if s)
+    return units
+
+
+def split_child_passages(text: str, max_chars: int = 400) -> List[str]:
+    """Parent chunk'ı (bölüm) embed edilecek küçük child pasajlara böler.
+    
+    Cümleler ve madde satırları sırayla max_chars'ı aşmayacak şekilde
+    birleştirilir (maddeler satır satır kalır, böylece "Eğer," gibi giriş
+    cümleleri ilk maddelerle aynı pasaja düşer). Tek başına max_chars'tan
+    uzun bir birim kendi pasajı olur.
+    
+    Args:
+        text: Parent chunk metni
+        max_chars: Child pasaj başına hedef en fazla karakter
+        
+    Returns:
+        Child pasaj metinleri (sırayla)
+    """
+    passages: List[str] = []
+    current = ""
+    
+    for unit, is_bullet in _passage_units(text):
+        if current and len(current) + 1 + len(unit) > max_chars:
+            passages.append(current)
+            current = unit
+        elif current:
+            current += ("\n" if is_bullet else " ") + unit
+        else:
+            current = unit
+    if current:
+        passages.append(current)
+    
+    return passages
+
+
 def get_chunk_metadata(chunk: Dict[str, str]) -> Dict[str, str]:
     """Chunk'ın metadata'sını döndürür (ChromaDB için).
     
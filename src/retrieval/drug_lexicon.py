@@ -0,0 +1,170 @@
+"""Drug-name lexicon: exact token automaton + symmetric-delete fuzzy index."""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from .turkish import turkish_lower
+
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_TERMINAL = "$"
+
+# Kesme işaretsiz Türkçe ekler için ("arvalesin", "cipralexi") izin verilen ek uzunluğu
+_MAX_SUFFIX_CHARS = 4
+_MIN_SUFFIX_STEM_CHARS = 4
+
+# Fuzzy eşleşme için minimum token uzunluğu (kısa kelimelerde yanlış pozitif çok)
+_MIN_FUZZY_CHARS = 5
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(turkish_lower(text))
+
+
+def _max_distance(token: str) -> int:
+    """difflib cutoff=0.8 ile yaklaşık aynı tolerans: kısa isimlerde 1, uzunlarda 2 hata."""
+    return 1 if len(token) < 10 else 2
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """word'den en fazla `distance` karakter silinerek elde edilen tüm varyantlar."""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        next_frontier = set()
+        for w in frontier:
+            for i in range(len(w)):
+                next_frontier.add(w[:i] + w[i + 1:])
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+def _edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) mesafesi, erken çıkışlı."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    prev_prev = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(prev[j] + 1, current[j - 1] + 1, prev[j - 1] + cost)
+            if (prev_prev is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], prev_prev[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, current
+    return prev[-1]
+
+
+class DrugLexicon:
+    """Sorgulardaki ilaç isimlerini bulan, index yüklenirken bir kez kurulan sözlük.
+
+    - Exact: Türkçe küçük harfe çevrilmiş isim token'larından oluşan bir trie
+      (çok kelimeli isimler desteklenir). Sorgu token'ları üzerinde tek geçişte
+      en uzun eşleşme aranır; kesme işaretsiz kısa ekler tolere edilir.
+    - Fuzzy: Tek kelimelik isimler için symmetric-delete index; aday sayısı
+      ilaç sayısından bağımsız, sadece sorgu token'ına bağlıdır.
+
+    Arama maliyeti chunk sayısından bağımsızdır.
+    """
+
+    def __init__(self, drug_names: Iterable[str]):
+        """
+        Args:
+            drug_names: Index'teki (kanonik) ilaç isimleri
+        """
+        self.drug_names = sorted(set(drug_names))
+        self._trie: Dict = {}
+        self._deletes: Dict[str, Set[str]] = {}
+        self._single_token: Dict[str, str] = {}
+
+        for name in self.drug_names:
+            tokens = _tokenize(name)
+            if not tokens:
+                continue
+
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_TERMINAL] = name
+
+            if len(tokens) == 1:
+                token = tokens[0]
+                self._single_token[token] = name
+                for variant in _deletes(token, _max_distance(token)):
+                    self._deletes.setdefault(variant, set()).add(token)
+
+    def __len__(self) -> int:
+        return len(self.drug_names)
+
+    def _step(self, node: Dict, token: str) -> Optional[Dict]:
+        """Trie'de token ile ilerler; gerekirse kısa bir Türkçe eki atar."""
+        child = node.get(token)
+        if child is not None:
+            return child
+        for cut in range(1, _MAX_SUFFIX_CHARS + 1):
+            stem = token[:-cut]
+            if len(stem) < _MIN_SUFFIX_STEM_CHARS:
+                break
+            child = node.get(stem)
+            if child is not None:
+                return child
+        return None
+
+    def _fuzzy(self, token: str) -> Optional[str]:
+        """Token'a en yakın tek kelimelik ilaç ismini döndürür."""
+        if len(token) < _MIN_FUZZY_CHARS:
+            return None
+
+        max_distance = _max_distance(token)
+        best, best_distance = None, max_distance + 1
+        candidates = set()
+        for variant in _deletes(token, max_distance):
+            candidates |= self._deletes.get(variant, set())
+
+        for candidate in sorted(candidates):
+            limit = min(max_distance, _max_distance(candidate))
+            distance = _edit_distance(token, candidate, limit)
+            if distance <= limit and distance < best_distance:
+                best, best_distance = candidate, distance
+
+        return self._single_token[best] if best is not None else None
+
+    def find(self, query: str) -> List[str]:
+        """Sorguda geçen ilaç isimlerini (geçiş sırasıyla, tekrarsız) döndürür.
+
+        Örn: "arvales ile Cipralexi birlikte alabilir miyim" -> ["Arvales", "Cipralex"]
+        """
+        tokens = _tokenize(query)
+        found: List[str] = []
+
+        i = 0
+        while i < len(tokens):
+            # Exact: bu pozisyondan başlayan en uzun isim
+            node, match, match_end = self._trie, None, i
+            for j in range(i, len(tokens)):
+                node = self._step(node, tokens[j])
+                if node is None:
+                    break
+                if _TERMINAL in node:
+                    match, match_end = node[_TERMINAL], j + 1
+
+            if match is None:
+                match = self._fuzzy(tokens[i])
+                match_end = i + 1
+
+            if match is not None and match not in found:
+                found.append(match)
+            i = max(match_end, i + 1)
+
+        return found
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Tek bir ismi kanonik ilaç ismine çevirir (örn: "arveles" -> "Arvales")."""
+        matches = self.find(name)
+        return matches[0] if matches else None
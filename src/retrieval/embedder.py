@@ -1,9 +1,159 @@
 """Embedding model for Turkish text."""
 
 from sentence_transformers import SentenceTransformer
-from typing import List, Optional
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
 import torch
 
+from .batching import MicroBatcher
+from .cache import QueryEmbeddingCache
+
+
+# "torch": PyTorch, "onnx": ONNX Runtime (fp32), "onnx-int8": dinamik int8 quantize ONNX
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Token bütçesi ne olursa olsun tek forward pass'e girecek en fazla metin
+MAX_BATCH_ITEMS = 256
+
+
+def _export_dir(onnx_dir: str, model_name: str) -> Path:
+    return Path(onnx_dir) / model_name.strip('/').replace('/', '__')
+
+
+def _onnx_int8_file(export_dir: Path, quantization: str) -> Optional[str]:
+    """Export edilmiş int8 dosyasının model dizinine göre yolu (yoksa None).
+
+    sentence-transformers dosyayı ağırlık tipine göre adlandırır
+    (avx2 -> model_quint8_avx2.onnx, avx512_vnni -> model_qint8_avx512_vnni.onnx).
+    """
+    matches = sorted((export_dir / "onnx").glob(f"model_*int8_{quantization}.onnx"))
+    return f"onnx/{matches[0].name}" if matches else None
+
+
+def load_sentence_model(
+    model_name: str,
+    device: str = "cpu",
+    backend: str = "torch",
+    onnx_dir: str = "./.cache/onnx",
+    onnx_quantization: str = "avx2",
+    num_threads: int = 0
+) -> SentenceTransformer:
+    """SentenceTransformer modelini seçilen backend ile yükler.
+    
+    ONNX backend'lerinde model ilk kullanımda onnx_dir altına export edilir
+    (int8 için ayrıca dinamik quantize edilir); sonraki yüklemeler bu
+    dosyaları doğrudan kullanır. optimum[onnxruntime] gerektirir.
+    
+    num_threads > 0 ise CPU thread sayısı sınırlanır (torch için süreç
+    genelinde, ONNX Runtime için session bazında).
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend '{backend}'. Supported: {', '.join(EMBEDDING_BACKENDS)}"
+        )
+    if backend == "torch":
+        if num_threads > 0:
+            torch.set_num_threads(num_threads)
+        return SentenceTransformer(model_name, device=device)
+    
+    try:
+        import onnxruntime
+        from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+    except ImportError:
+        raise ImportError(
+            f"Embedding backend '{backend}' requires ONNX Runtime. "
+            "Install it with: pip install 'sentence-transformers[onnx]'"
+        )
+    
+    session_kwargs = {}
+    if num_threads > 0:
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = num_threads
+        session_options.inter_op_num_threads = 1
+        session_kwargs["session_options"] = session_options
+    
+    export_dir = _export_dir(onnx_dir, model_name)
+    fp32_file = "onnx/model.onnx"
+    if not (export_dir / fp32_file).exists():
+        model = SentenceTransformer(model_name, device=device, backend="onnx")
+        model.save_pretrained(str(export_dir))
+    
+    if backend == "onnx":
+        return SentenceTransformer(
+            str(export_dir), device=device, backend="onnx",
+            model_kwargs={"file_name": fp32_file, **session_kwargs}
+        )
+    
+    int8_file = _onnx_int8_file(export_dir, onnx_quantization)
+    if int8_file is None:
+        model = SentenceTransformer(
+            str(export_dir), device=device, backend="onnx", model_kwargs={"file_name": fp32_file}
+        )
+        export_dynamic_quantized_onnx_model(model, onnx_quantization, str(export_dir))
+        int8_file = _onnx_int8_file(export_dir, onnx_quantization)
+    
+    return SentenceTransformer(
+        str(export_dir), device=device, backend="onnx",
+        model_kwargs={"file_name": int8_file, **session_kwargs}
+    )
+
+
+def token_budget_batches(
+    lengths: np.ndarray,
+    token_budget: int,
+    max_items: int = MAX_BATCH_ITEMS
+) -> List[np.ndarray]:
+    """Metinleri token uzunluğuna göre sıralayıp padding dahil bütçeye sığan batch'lere böler.
+    
+    Uzunlar önce gelir; böylece bir batch'in genişliği ilk elemanının
+    uzunluğudur ve maliyeti genişlik x eleman sayısı <= token_budget olur.
+    Bütçeden uzun tek bir metin yine de kendi batch'inde işlenir.
+    
+    Args:
+        lengths: Her metnin (truncate edilmiş) token sayısı
+        token_budget: Batch başına padding dahil en fazla token
+        max_items: Batch başına en fazla metin
+        
+    Returns:
+        Orijinal indekslerden oluşan batch listesi
+    """
+    order = np.argsort(-np.asarray(lengths), kind='stable')
+    batches = []
+    start = 0
+    while start < len(order):
+        width = max(int(lengths[order[start]]), 1)
+        size = max(1, min(max_items, token_budget // width))
+        batches.append(order[start:start + size])
+        start += size
+    return batches
+
+
+def padded_tokens(lengths: np.ndarray, batches: List[np.ndarray]) -> int:
+    """Verilen batch'lerin padding dahil toplam token sayısı."""
+    return int(sum(int(lengths[batch].max()) * len(batch) for batch in batches))
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Satırları yerinde L2-normalize eder (sıfır vektörler olduğu gibi kalır)."""
+    # einsum (n, d) boyutunda ara dizi (v * v) oluşturmaz
+    norms = np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+    np.maximum(norms, 1e-12, out=norms)
+    vectors /= norms[:, None]
+    return vectors
+
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """İki backend'in aynı metinler için ürettiği vektörlerin cosine benzerliği.
+    
+    Returns:
+        {'mean': float, 'min': float}
+    """
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosine = (reference * candidate).sum(axis=1)
+    return {'mean': float(cosine.mean()), 'min': float(cosine.min())}
+
 
 class TurkishEmbedder:
     """Türkçe metinler için embedding modeli.
@@ -15,19 +165,165 @@ class TurkishEmbedder:
     def __init__(
         self,
         model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
-        device: str = "cpu"
+        device: str = "cpu",
+        query_cache_size: int = 1024,
+        query_cache_path: Optional[str] = None,
+        backend: str = "torch",
+        onnx_dir: str = "./.cache/onnx",
+        onnx_quantization: str = "avx2",
+        query_batch_size: int = 32,
+        query_batch_wait_ms: float = 0.0,
+        embed_token_budget: int = 8192,
+        num_threads: int = 0
     ):
         """
         Args:
             model_name: HuggingFace model adı
             device: 'cpu' veya 'cuda'
+            query_cache_size: Sorgu embedding cache'inin boyutu (0: kapalı)
+            query_cache_path: Cache'in restart'lar arası saklanacağı dosya
+            backend: "torch", "onnx" veya "onnx-int8"
+            onnx_dir: Export edilen ONNX modellerinin dizini
+            onnx_quantization: int8 için hedef CPU (arm64, avx2, avx512, avx512_vnni)
+            query_batch_size: Micro-batch başına en fazla sorgu
+            query_batch_wait_ms: Eşzamanlı sorguları birleştirmek için bekleme
+                süresi (0: micro-batching kapalı)
+            embed_token_budget: embed() batch'i başına padding dahil en fazla
+                token (0: sabit 32'lik batch'ler)
+            num_threads: Model başına CPU thread sayısı (0: kütüphane varsayılanı)
         """
+        self.model_name = model_name
+        self.backend = backend
         self.device = device if torch.cuda.is_available() else "cpu"
-        self.model = SentenceTransformer(model_name, device=self.device)
+        self.model = load_sentence_model(
+            model_name,
+            device=self.device,
+            backend=backend,
+            onnx_dir=onnx_dir,
+            onnx_quantization=onnx_quantization,
+            num_threads=num_threads
+        )
         self.dimension = self.model.get_sentence_embedding_dimension()
+        self.embed_token_budget = embed_token_budget
+        
+        # Backend'ler arası küçük sayısal farklar cache'lerde karışmasın
+        self.cache_namespace = model_name if backend == "torch" else f"{model_name}@{backend}"
+        self.query_cache = QueryEmbeddingCache(
+            self.cache_namespace,
+            max_size=query_cache_size,
+            spill_path=query_cache_path
+        )
+        
+        # Eşzamanlı sorgular (Gradio handler'ları) tek forward pass'te birleşir
+        self.query_batcher: Optional[MicroBatcher] = None
+        if query_batch_wait_ms > 0:
+            self.query_batcher = MicroBatcher(
+                self._encode,
+                max_batch_size=query_batch_size,
+                max_wait_ms=query_batch_wait_ms
+            )
+    
+    def _tokenize(self, texts: List[str]) -> Dict:
+        # sentence-transformers 5+ `preprocess`, öncekiler `tokenize` kullanır
+        preprocess = getattr(self.model, 'preprocess', None) or self.model.tokenize
+        return preprocess(texts)
+    
+    def token_lengths(self, texts: List[str]) -> np.ndarray:
+        """Metinlerin max_seq_length'e truncate edilmiş token sayıları."""
+        return self._tokenize(texts)['attention_mask'].sum(dim=1).numpy()
+    
+    @property
+    def max_seq_length(self) -> int:
+        """Modelin encode ettiği en fazla token (fazlası kırpılır)."""
+        return self.model.max_seq_length
+    
+    def truncation_stats(self, texts: List[str]) -> Dict[str, float]:
+        """Metinlerin max_seq_length'i aşan (encode edilmeden atılan) token'ları.
+        
+        Returns:
+            {'chunks', 'truncated_chunks', 'total_tokens', 'truncated_tokens',
+             'mean_truncated'} (mean: kırpılan chunk başına)
+        """
+        lengths = np.array(
+            [len(ids) for ids in self.model.tokenizer(list(texts), verbose=False)['input_ids']],
+            dtype='int64'
+        )
+        over = np.maximum(lengths - self.max_seq_length, 0)
+        truncated = int((over > 0).sum())
+        return {
+            'chunks': len(texts),
+            'truncated_chunks': truncated,
+            'total_tokens': int(lengths.sum()),
+            'truncated_tokens': int(over.sum()),
+            'mean_truncated': float(over.sum() / truncated) if truncated else 0.0,
+        }
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Metinleri token bütçeli, uzunluğa göre gruplanmış batch'lerle encode eder.
+        
+        Metinler tek seferde tokenize edilir; her batch sadece kendi en uzun
+        metnine kadar kırpılır, böylece kısa chunk'lar uzunların padding'ini
+        taşımaz. Sonuçlar orijinal sırayla döner.
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype='float32')
+        if self.embed_token_budget <= 0:
+            return np.ascontiguousarray(self.model.encode(
+                texts,
+                batch_size=32,
+                show_progress_bar=False,
+                convert_to_numpy=True
+            ), dtype='float32')
+        
+        features = self._tokenize(texts)
+        lengths = features['attention_mask'].sum(dim=1).numpy()
+        left_padded = getattr(self.model.tokenizer, 'padding_side', 'right') == 'left'
+        device = self.model.device
+        
+        vectors = np.empty((len(texts), self.dimension), dtype='float32')
+        for batch in token_budget_batches(lengths, self.embed_token_budget):
+            width = int(lengths[batch].max())
+            columns = slice(-width, None) if left_padded else slice(0, width)
+            rows = torch.from_numpy(batch)
+            batch_features = {}
+            for name, value in features.items():
+                if torch.is_tensor(value) and value.dim() == 2:
+                    value = value[rows][:, columns].to(device)
+                elif torch.is_tensor(value):
+                    value = value[rows].to(device)
+                batch_features[name] = value
+            with torch.inference_mode():
+                embeddings = self.model.forward(batch_features)['sentence_embedding']
+            vectors[batch] = embeddings.float().cpu().numpy()
+        
+        return vectors
+    
+    def _encode_queries(self, texts: List[str]) -> np.ndarray:
+        """Sorguları (varsa) micro-batcher üzerinden encode eder."""
+        if self.query_batcher is not None:
+            return self.query_batcher.submit(texts)
+        return self._encode(texts)
+    
+    def embed_array(self, texts: List[str], normalize: bool = False) -> np.ndarray:
+        """Metinleri doğrudan float32 diziye dönüştürür (Python listesi kopyası yok).
+        
+        Args:
+            texts: Vektörlenecek metin listesi
+            normalize: True ise satırlar yerinde L2-normalize edilir
+            
+        Returns:
+            (len(texts), self.dimension) C-contiguous float32 dizi
+        """
+        vectors = self._encode(texts)
+        if normalize:
+            normalize_rows(vectors)
+        return vectors
     
     def embed(self, texts: List[str]) -> List[List[float]]:
-        """Metinleri vektörlere dönüştürür.
+        """Metinleri vektörlere dönüştürür (liste döndüren eski API).
+        
+        Büyük batch'ler için embed_array tercih edilmeli; .tolist() her
+        değer için bir Python float'ı oluşturur.
         
         Args:
             texts: Vektörlenecek metin listesi
@@ -38,15 +334,7 @@ class TurkishEmbedder:
         if not texts:
             return []
         
-        # Batch encoding
-        embeddings = self.model.encode(
-            texts,
-            batch_size=32,
-            show_progress_bar=False,
-            convert_to_numpy=True
-        )
-        
-        return embeddings.tolist()
+        return self._encode(texts).tolist()
     
     def embed_single(self, text: str) -> List[float]:
         """Tek bir metni vektörleştirir.
@@ -57,7 +345,42 @@ class TurkishEmbedder:
         Returns:
             Embedding vektörü
         """
-        return self.embed([text])[0]
+        return self._encode_queries([text])[0].tolist()
+    
+    def embed_queries(self, queries: List[str], normalize: bool = False) -> np.ndarray:
+        """Sorguları query cache üzerinden vektörleştirir.
+        
+        Cache'te olmayan (ve tekrar etmeyen) sorgular tek batch'te encode edilir;
+        micro-batching açıksa diğer thread'lerin sorgularıyla birleştirilir.
+        
+        Args:
+            queries: Kullanıcı sorguları
+            normalize: True ise satırlar yerinde L2-normalize edilir
+                (cache normalize edilmemiş vektörleri tutar)
+            
+        Returns:
+            (len(queries), self.dimension) float32 dizi
+        """
+        vectors = np.empty((len(queries), self.dimension), dtype='float32')
+        missing = {}
+        
+        for i, query in enumerate(queries):
+            cached = self.query_cache.get(query)
+            if cached is not None:
+                vectors[i] = cached
+            else:
+                missing.setdefault(self.query_cache.key(query), []).append(i)
+        
+        if missing:
+            positions = list(missing.values())
+            embeddings = self._encode_queries([queries[group[0]] for group in positions])
+            for group, embedding in zip(positions, embeddings):
+                vectors[group] = embedding
+                self.query_cache.put(queries[group[0]], vectors[group[0]])
+        
+        if normalize:
+            normalize_rows(vectors)
+        return vectors
 
 
 # Global instance (lazy loading)
@@ -66,13 +389,29 @@ _embedder: Optional[TurkishEmbedder] = None
 
 def get_embedder(
     model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
-    device: str = "cpu"
+    device: str = "cpu",
+    query_cache_size: int = 1024,
+    query_cache_path: Optional[str] = None,
+    backend: str = "torch",
+    onnx_dir: str = "./.cache/onnx",
+    onnx_quantization: str = "avx2",
+    query_batch_size: int = 32,
+    query_batch_wait_ms: float = 0.0,
+    embed_token_budget: int = 8192
 ) -> TurkishEmbedder:
     """Global embedder instance'ını döndürür (singleton pattern).
     
     Args:
         model_name: HuggingFace model adı
         device: 'cpu' veya 'cuda'
+        query_cache_size: Sorgu embedding cache'inin boyutu (0: kapalı)
+        query_cache_path: Cache'in restart'lar arası saklanacağı dosya
+        backend: "torch", "onnx" veya "onnx-int8"
+        onnx_dir: Export edilen ONNX modellerinin dizini
+        onnx_quantization: int8 için hedef CPU (arm64, avx2, avx512, avx512_vnni)
+        query_batch_size: Micro-batch başına en fazla sorgu
+        query_batch_wait_ms: Sorgu micro-batching bekleme süresi (0: kapalı)
+        embed_token_budget: embed() batch'i başına padding dahil en fazla token
         
     Returns:
         TurkishEmbedder instance
@@ -80,6 +419,17 @@ def get_embedder(
     global _embedder
     
     if _embedder is None:
-        _embedder = TurkishEmbedder(model_name=model_name, device=device)
+        _embedder = TurkishEmbedder(
+            model_name=model_name,
+            device=device,
+            query_cache_size=query_cache_size,
+            query_cache_path=query_cache_path,
+            backend=backend,
+            onnx_dir=onnx_dir,
+            onnx_quantization=onnx_quantization,
+            query_batch_size=query_batch_size,
+            query_batch_wait_ms=query_batch_wait_ms,
+            embed_token_budget=embed_token_budget
+        )
     
     return _embedder
@@ -0,0 +1,97 @@
+"""Multi-process embedding pool for large ingest batches."""
+
+import multiprocessing
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from .embedder import TurkishEmbedder, normalize_rows
+
+
+# Worker sürecindeki model (initializer'da bir kez yüklenir)
+_worker_embedder = None
+
+
+def _init_worker(embedder_kwargs: dict):
+    global _worker_embedder
+    _worker_embedder = TurkishEmbedder(query_cache_size=0, **embedder_kwargs)
+
+
+def _embed_slice(texts: List[str]) -> np.ndarray:
+    return _worker_embedder.embed_array(texts)
+
+
+def default_threads_per_worker(workers: int) -> int:
+    """Çekirdekleri worker'lar arasında bölüştürür (en az 1 thread)."""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+class EmbeddingPool:
+    """Chunk embedding'lerini birden fazla süreçte hesaplar.
+
+    Her worker modeli bir kez yükler ve `threads_per_worker` CPU thread'i
+    ile sınırlanır; böylece N worker çekirdek sayısından fazla thread
+    açmaz. Metinler sabit boyutlu dilimlere bölünüp worker'lara dağıtılır,
+    sonuçlar dilim sırasıyla birleştirilir (çıktı sırası girişle aynıdır).
+
+    TurkishEmbedder.embed_array ile aynı arayüzü sunar, bu yüzden
+    DrugRetriever.add_documents'a embedder olarak verilebilir.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        threads_per_worker: int = 0,
+        slice_size: int = 256,
+        **embedder_kwargs
+    ):
+        """
+        Args:
+            workers: Worker süreç sayısı
+            threads_per_worker: Worker başına CPU thread'i (0: çekirdek / workers)
+            slice_size: Bir worker görevindeki metin sayısı
+            **embedder_kwargs: TurkishEmbedder argümanları (model_name, backend, ...)
+        """
+        self.workers = max(1, workers)
+        self.threads_per_worker = threads_per_worker or default_threads_per_worker(self.workers)
+        self.slice_size = max(1, slice_size)
+        self.dimension: Optional[int] = None
+
+        # fork, ana süreçte başlamış torch/OpenMP thread'leriyle güvenli değil
+        context = multiprocessing.get_context("spawn")
+        self._pool = context.Pool(
+            self.workers,
+            initializer=_init_worker,
+            initargs=({**embedder_kwargs, 'num_threads': self.threads_per_worker},)
+        )
+
+    def embed_array(self, texts: List[str], normalize: bool = False) -> np.ndarray:
+        """Metinleri worker'larda encode eder; (len(texts), d) float32 dizi döndürür."""
+        slices = [texts[i:i + self.slice_size] for i in range(0, len(texts), self.slice_size)]
+        vectors = None
+        offset = 0
+        # imap sırayı korur; her dilim geldikçe önceden ayrılmış diziye yazılır
+        for part in self._pool.imap(_embed_slice, slices):
+            if vectors is None:
+                self.dimension = part.shape[1]
+                vectors = np.empty((len(texts), self.dimension), dtype='float32')
+            vectors[offset:offset + len(part)] = part
+            offset += len(part)
+
+        if vectors is None:
+            return np.empty((0, self.dimension or 0), dtype='float32')
+        if normalize:
+            normalize_rows(vectors)
+        return vectors
+
+    def close(self):
+        """Worker'ları kapatır."""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
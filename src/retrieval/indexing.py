@@ -0,0 +1,325 @@
+"""FAISS index construction, search parameters and recall evaluation."""
+
+import math
+import time
+from typing import Dict, Optional
+
+import faiss
+import numpy as np
+
+
+INDEX_TYPES = ("flat", "hnsw", "ivf")
+QUANTIZATION_TYPES = ("none", "sq8", "pq")
+
+DEFAULT_INDEX_CONFIG = {
+    "index_type": "flat",
+    "hnsw_m": 32,
+    "hnsw_ef_construction": 200,
+    "hnsw_ef_search": 64,
+    "ivf_nlist": 0,        # 0: eğitim verisine göre otomatik (~4*sqrt(N))
+    "ivf_nprobe": 8,
+    "filter_exact_max": 4096,
+    "quantization": "none",  # "sq8": 1 byte/boyut, "pq": pq_m byte/vektör
+    "pq_m": 48,
+    "rerank_factor": 4,      # quantized index'te top_k*factor aday exact skorlanır (0: kapalı)
+    "keep_snapshots": 2,     # save() sonrası diskte tutulan index sürümü sayısı
+}
+
+
+def resolve_index_config(config: Optional[Dict] = None) -> Dict:
+    """[database] tablosunu varsayılanlarla birleştirir."""
+    resolved = dict(DEFAULT_INDEX_CONFIG)
+    if config:
+        resolved.update({k: v for k, v in config.items() if k in DEFAULT_INDEX_CONFIG})
+
+    if resolved["index_type"] not in INDEX_TYPES:
+        raise ValueError(
+            f"Unknown index_type '{resolved['index_type']}'. "
+            f"Supported: {', '.join(INDEX_TYPES)}"
+        )
+    if resolved["quantization"] not in QUANTIZATION_TYPES:
+        raise ValueError(
+            f"Unknown quantization '{resolved['quantization']}'. "
+            f"Supported: {', '.join(QUANTIZATION_TYPES)}"
+        )
+    return resolved
+
+
+def default_nlist(n_vectors: int) -> int:
+    """IVF için küme sayısı: ~4*sqrt(N), her kümeye en az ~39 vektör düşecek şekilde."""
+    nlist = int(4 * math.sqrt(max(n_vectors, 1)))
+    return max(1, min(nlist, n_vectors // 39 or 1))
+
+
+def _storage_spec(dimension: int, config: Dict) -> str:
+    """Vektörlerin index içinde nasıl saklanacağı (index_factory kodu)."""
+    quantization = config["quantization"]
+    if quantization == "sq8":
+        return "SQ8"
+    if quantization == "pq":
+        if dimension % config["pq_m"]:
+            raise ValueError(f"pq_m={config['pq_m']} must divide the embedding dimension {dimension}")
+        return f"PQ{config['pq_m']}"
+    return "Flat"
+
+
+def build_index(dimension: int, config: Optional[Dict] = None, n_vectors: int = 0) -> faiss.Index:
+    """Config'e göre boş bir inner-product index oluşturur.
+
+    Args:
+        dimension: Vektör boyutu
+        config: [database] ayarları (index_type, hnsw_m, ivf_nlist, quantization, ...)
+        n_vectors: Eğitimde kullanılacak vektör sayısı (IVF nlist için)
+    """
+    config = resolve_index_config(config)
+    index_type = config["index_type"]
+    storage = _storage_spec(dimension, config)
+
+    if index_type == "flat":
+        if storage == "Flat":
+            return faiss.IndexFlatIP(dimension)
+        return faiss.index_factory(dimension, storage, faiss.METRIC_INNER_PRODUCT)
+
+    if index_type == "hnsw":
+        index = faiss.index_factory(dimension, f"HNSW{config['hnsw_m']},{storage}", faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = config["hnsw_ef_construction"]
+        return index
+
+    nlist = config["ivf_nlist"] or default_nlist(n_vectors)
+    return faiss.index_factory(dimension, f"IVF{nlist},{storage}", faiss.METRIC_INNER_PRODUCT)
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """Yüklenmiş bir index'in tipini döndürür."""
+    if faiss.try_extract_index_ivf(index) is not None:
+        return "ivf"
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    return "flat"
+
+
+def _codes_index(index: faiss.Index) -> faiss.Index:
+    """Vektör kodlarını tutan alt index (HNSW'de storage, IVF'te kendisi)."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        # try_extract_index_ivf düz IndexIVF döndürür; IVFFlat/IVFPQ ayrımı için downcast
+        return faiss.downcast_index(ivf)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.downcast_index(index.storage)
+    return index
+
+
+def is_quantized(index: faiss.Index) -> bool:
+    """Index vektörleri kayıplı (SQ/PQ) saklıyor mu?"""
+    codes = _codes_index(index)
+    return not isinstance(codes, (faiss.IndexFlat, faiss.IndexIVFFlat))
+
+
+def supports_selector(index: faiss.Index) -> bool:
+    """Flat PQ index'i (IndexPQ) arama sırasında ID selector kabul etmez."""
+    return not isinstance(index, faiss.IndexPQ)
+
+
+def index_memory_bytes(index: faiss.Index) -> int:
+    """Index'in serileştirilmiş boyutu (yüklendiğinde RAM'de kapladığı yere yakın)."""
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def prepare_index(index: faiss.Index):
+    """Index'i sorguya hazırlar (IVF için reconstruct'a izin veren direct map)."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and ivf.direct_map.type == faiss.DirectMap.NoMap:
+        ivf.make_direct_map()
+
+
+def train_index(index: faiss.Index, vectors: np.ndarray):
+    """Eğitim gerektiren index'leri (IVF) verilen vektörlerle eğitir."""
+    if index.is_trained:
+        return
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and len(vectors) < ivf.nlist:
+        raise ValueError(
+            f"IVF index needs at least nlist={ivf.nlist} training vectors, got {len(vectors)}"
+        )
+    pq = getattr(_codes_index(index), "pq", None)
+    if pq is not None and len(vectors) < pq.ksub:
+        raise ValueError(
+            f"PQ quantization needs at least {pq.ksub} training vectors, got {len(vectors)}; "
+            f"use quantization = \"sq8\" for small corpora"
+        )
+    index.train(vectors)
+    prepare_index(index)
+
+
+def search_parameters(
+    index: faiss.Index,
+    config: Dict,
+    selector: Optional[faiss.IDSelector] = None,
+    selectivity: float = 1.0
+) -> faiss.SearchParameters:
+    """Index tipine uygun SearchParameters oluşturur.
+
+    Filtreli aramalarda (selectivity < 1) nprobe / efSearch, uygun vektör
+    oranıyla ters orantılı büyütülür; aksi halde ANN aday listesi filtreden
+    sonra top_k'yı dolduramayabilir.
+    """
+    boost = 1.0 / max(selectivity, 1e-6)
+    index_type = index_type_of(index)
+
+    if index_type == "ivf":
+        nlist = faiss.extract_index_ivf(index).nlist
+        params = faiss.SearchParametersIVF()
+        params.nprobe = int(min(nlist, math.ceil(config["ivf_nprobe"] * boost)))
+    elif index_type == "hnsw":
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = int(min(max(index.ntotal, 1), math.ceil(config["hnsw_ef_search"] * boost)))
+    elif isinstance(index, faiss.IndexPQ):
+        params = faiss.SearchParametersPQ()
+    else:
+        params = faiss.SearchParameters()
+
+    if selector is not None:
+        params.sel = selector
+    return params
+
+
+def remove_rows(
+    index: faiss.Index,
+    rows: np.ndarray,
+    vectors: Optional[np.ndarray] = None
+) -> faiss.Index:
+    """Verilen ID'leri index'ten siler; kalan vektörler 0..n-1 olarak yeniden numaralanır.
+
+    Flat index'te remove_ids bunu doğrudan yapar. HNSW remove desteklemez,
+    IVF ise ID'leri yeniden numaralandırmaz; bu tiplerde kalan vektörler
+    eğitilmiş bir kopyaya (clone + reset) yeniden eklenir, yeniden eğitim gerekmez.
+    Quantized index'lerde tam hassasiyetli `vectors` verilirse yeniden
+    ekleme decode edilmiş kodlar yerine bunlarla yapılır.
+    """
+    rows = np.asarray(rows, dtype='int64')
+    if len(rows) == 0:
+        return index
+
+    if index_type_of(index) == "flat":
+        index.remove_ids(faiss.IDSelectorBatch(rows))
+        return index
+
+    keep = np.ones(index.ntotal, dtype=bool)
+    keep[rows] = False
+    source = reconstruct_all(index) if vectors is None else vectors
+    vectors = np.ascontiguousarray(source[keep], dtype='float32')
+
+    rebuilt = faiss.clone_index(index)
+    rebuilt.reset()
+    if len(vectors):
+        rebuilt.add(vectors)
+    prepare_index(rebuilt)
+    return rebuilt
+
+
+def reconstruct_all(index: faiss.Index) -> np.ndarray:
+    """Index'teki tüm vektörleri (ID sırasıyla) geri okur."""
+    prepare_index(index)
+    if index.ntotal == 0:
+        return np.empty((0, index.d), dtype='float32')
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def rerank(
+    queries: np.ndarray,
+    ids: np.ndarray,
+    vectors: np.ndarray,
+    k: int
+):
+    """ANN adaylarını tam hassasiyetli vektörlerle exact skorlayıp ilk k'yı döndürür.
+
+    Args:
+        queries: (n, d) normalize sorgu vektörleri
+        ids: (n, m) aday ID'leri (-1: boş)
+        vectors: Tüm chunk'ların tam hassasiyetli vektörleri (mmap olabilir)
+        k: Sonuç sayısı
+
+    Returns:
+        (scores, ids) FAISS search formatında; eksik yerler -1 / -inf
+    """
+    out_scores = np.full((len(queries), k), -np.inf, dtype='float32')
+    out_ids = np.full((len(queries), k), -1, dtype='int64')
+    for row, (query, candidates) in enumerate(zip(queries, ids)):
+        candidates = candidates[candidates >= 0]
+        if len(candidates) == 0:
+            continue
+        # mmap'ten sıralı okuma
+        candidates = np.sort(candidates)
+        exact = np.asarray(vectors[candidates]) @ query
+        top = np.argsort(-exact, kind='stable')[:k]
+        out_scores[row, :len(top)] = exact[top]
+        out_ids[row, :len(top)] = candidates[top]
+    return out_scores, out_ids
+
+
+def evaluate_recall(
+    index: faiss.Index,
+    vectors: np.ndarray,
+    config: Dict,
+    k: int = 10,
+    n_queries: int = 200,
+    seed: int = 0,
+    rerank_factor: int = 0
+) -> Dict:
+    """ANN / quantized index'in recall@k değerini brute-force (flat) aramaya göre ölçer.
+
+    Sorgu olarak korpustan rastgele vektörler seçilir; her sorgunun kendisi
+    hem referans hem de ANN sonuçlarından çıkarılır. `vectors` tam
+    hassasiyetli vektörlerdir; rerank_factor > 0 ise k*factor aday bu
+    vektörlerle yeniden skorlanarak ikinci bir recall ölçülür.
+
+    Returns:
+        {'recall': float, 'k': int, 'n_queries': int,
+         'ann_ms_per_query': float, 'flat_ms_per_query': float,
+         'rerank_recall': float, 'rerank_ms_per_query': float}  # rerank alanları sadece rerank_factor > 0 ise
+    """
+    n = len(vectors)
+    k = min(k, n - 1)
+    if k < 1:
+        return {'recall': 1.0, 'k': 0, 'n_queries': 0,
+                'ann_ms_per_query': 0.0, 'flat_ms_per_query': 0.0}
+
+    rng = np.random.default_rng(seed)
+    query_ids = rng.choice(n, size=min(n_queries, n), replace=False)
+    queries = np.ascontiguousarray(vectors[query_ids])
+
+    flat = faiss.IndexFlatIP(vectors.shape[1])
+    flat.add(np.ascontiguousarray(vectors))
+
+    start = time.perf_counter()
+    _, truth = flat.search(queries, k + 1)
+    flat_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    _, found = index.search(queries, k + 1, params=search_parameters(index, config))
+    ann_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    def recall_of(found_ids: np.ndarray) -> float:
+        hits = 0
+        for qid, t_row, f_row in zip(query_ids, truth, found_ids):
+            expected = [i for i in t_row if i != qid][:k]
+            got = set([i for i in f_row if i != qid and i != -1][:k])
+            hits += sum(1 for i in expected if i in got)
+        return hits / (k * len(queries))
+
+    result = {
+        'recall': recall_of(found),
+        'k': k,
+        'n_queries': len(queries),
+        'ann_ms_per_query': ann_ms,
+        'flat_ms_per_query': flat_ms,
+    }
+
+    if rerank_factor > 0:
+        start = time.perf_counter()
+        _, candidates = index.search(queries, (k + 1) * rerank_factor, params=search_parameters(index, config))
+        _, reranked = rerank(queries, candidates, vectors, k + 1)
+        result['rerank_ms_per_query'] = (time.perf_counter() - start) * 1000 / len(queries)
+        result['rerank_recall'] = recall_of(reranked)
+
+    return result
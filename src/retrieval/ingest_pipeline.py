@@ -0,0 +1,505 @@
+"""Staged streaming ingest: parallel chunking -> cross-file embedding -> index writer."""
+
+import copy
+import multiprocessing
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from .checkpoint import IngestCheckpoint
+from .chunker import chunk_drug_document, get_chunk_metadata, iter_drug_chunks, split_child_passages
+
+
+# Worker sürecindeki chunk ayarları (initializer'da bir kez alınır)
+_worker_options: Optional[dict] = None
+
+
+def chunk_file(
+    path: Path,
+    chunk_size: int,
+    chunk_overlap: int,
+    chunking: str = "window",
+    child_max_chars: int = 0,
+    pdf_cache_dir: Optional[str] = None,
+    **token_options
+) -> Dict:
+    """Tek bir dosyayı chunk'lar.
+
+    chunking "sections" ise başlık bazlı iter_drug_chunks, "window" ise
+    karakter/token penceresi kullanılır. .pdf dosyaları pdfplumber ile
+    sayfa sayfa markdown'a çevrilerek okunur; "sections" modunda bellekte
+    sadece o anki sayfa ve bölüm tutulur. child_max_chars > 0 ise
+    (small-to-big) chunk'lar parent olarak döner ve index'e girecek
+    metinler onların child pasajlarıdır. pdf_cache_dir verilirse PDF
+    sayfalarının çıkarılmış metni orada (PDF hash'i + sayfa no) saklanır.
+
+    Returns:
+        {'name', 'chunks' (chunker'ın ürettiği chunk sayısı), 'texts',
+         'metadatas', 'parent_texts', 'parent_metadatas'}
+    """
+    chunk_fn = iter_drug_chunks if chunking == "sections" else chunk_drug_document
+    lines = None
+    if Path(path).suffix.lower() == ".pdf":
+        # PDF sayfa sayfa markdown'a çevrilip doğrudan chunker'a akar (ara .md yok)
+        from .pdf_pages import PageCache, iter_pdf_markdown
+        cache = PageCache(Path(pdf_cache_dir)) if pdf_cache_dir else None
+        lines = iter_pdf_markdown(Path(path), cache)
+
+    texts = []
+    metadatas = []
+    for chunk in chunk_fn(
+        str(path), chunk_size=chunk_size, chunk_overlap=chunk_overlap, lines=lines, **token_options
+    ):
+        texts.append(chunk['text'])
+        metadatas.append(get_chunk_metadata(chunk))
+
+    result = {'name': Path(path).name, 'chunks': len(texts), 'parent_texts': [], 'parent_metadatas': []}
+    if child_max_chars > 0:
+        # Child'lar parent'ın metadata'sını (source_file + chunk_id) paylaşır
+        result['parent_texts'], result['parent_metadatas'] = texts, metadatas
+        children = [
+            (child, meta)
+            for text, meta in zip(texts, metadatas)
+            for child in split_child_passages(text, child_max_chars)
+        ]
+        texts = [child for child, _ in children]
+        metadatas = [meta for _, meta in children]
+    result['texts'], result['metadatas'] = texts, metadatas
+    return result
+
+
+def _init_chunk_worker(options: dict):
+    global _worker_options
+    _worker_options = options
+
+
+def _chunk_task(path: Path) -> Tuple[Dict, float]:
+    start = time.perf_counter()
+    result = chunk_file(path, **_worker_options)
+    return result, time.perf_counter() - start
+
+
+class StageStats:
+    """Bir pipeline aşamasının sayaçları.
+
+    busy: işte geçen süre, idle: girdi beklerken geçen süre, blocked:
+    çıktı kuyruğu doluyken (backpressure) geçen süre. Darboğaz aşama
+    idle'ı en düşük olandır; diğerleri onu bekler.
+    """
+
+    __slots__ = ('name', 'items', 'chunks', 'busy', 'idle', 'blocked')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.chunks = 0
+        self.busy = 0.0
+        self.idle = 0.0
+        self.blocked = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Aşamanın kendi kapasitesi (chunk / busy saniye)."""
+        return self.chunks / self.busy if self.busy > 0 else 0.0
+
+
+class _Batch:
+    __slots__ = ('seq', 'files', 'texts', 'metadatas', 'parent_texts', 'parent_metadatas', 'vectors')
+
+    def __init__(self, seq: int):
+        self.seq = seq
+        self.files: List[Tuple[str, int]] = []
+        self.texts: List[str] = []
+        self.metadatas: List[Dict] = []
+        self.parent_texts: List[str] = []
+        self.parent_metadatas: List[Dict] = []
+        self.vectors: Optional[np.ndarray] = None
+
+    def add(self, result: Dict):
+        self.files.append((result['name'], result['chunks']))
+        self.texts.extend(result['texts'])
+        self.metadatas.extend(result['metadatas'])
+        self.parent_texts.extend(result['parent_texts'])
+        self.parent_metadatas.extend(result['parent_metadatas'])
+
+    @classmethod
+    def from_segment(cls, segment: Dict) -> '_Batch':
+        """Checkpoint segmentinden (yeniden embed edilmeyecek) batch kurar."""
+        batch = cls(-1)
+        batch.files = list(segment['files'])
+        batch.texts = segment['texts']
+        batch.metadatas = segment['metadatas']
+        batch.parent_texts = segment['parent_texts']
+        batch.parent_metadatas = segment['parent_metadatas']
+        batch.vectors = segment['vectors']
+        return batch
+
+
+class _Stopped(Exception):
+    """Başka bir aşama hata verdiğinde kuyruk beklemelerini sonlandırır."""
+
+
+class IngestPipeline:
+    """Dosyaları aşamalı ve örtüşen bir pipeline ile index'e yükler.
+
+    1. chunk: dosyalar (chunk_workers > 1 ise süreç havuzunda) chunk'lanır
+       ve dosyalar arası `batch_chunks` büyüklüğünde batch'lere toplanır
+    2. embed: `embed_stages` thread'i batch'leri embedding cache üzerinden
+       encode eder (EmbeddingPool ile birden fazla stage worker'ları dolu tutar)
+    3. write: ana thread batch'leri dosya sırasıyla retriever'a ekler;
+       index eğitim gerektiriyorsa (IVF, SQ8/PQ) vektörler sona kadar tutulur
+
+    Aşamalar arası kuyruklar `queue_size` batch ile sınırlıdır; yavaş aşama
+    öncekileri bloklar, böylece bellek korpus boyutundan bağımsız kalır ve
+    toplam süre en yavaş aşama (normalde encoder) ile sınırlanır.
+
+    checkpoint verilirse yazılan batch'ler en geç `checkpoint_interval`
+    saniyede bir (ve sonda) checkpoint'e segment olarak eklenir.
+    """
+
+    def __init__(
+        self,
+        retriever,
+        embedder=None,
+        chunk_options: Optional[dict] = None,
+        chunk_workers: int = 0,
+        embed_stages: int = 1,
+        batch_chunks: int = 1024,
+        queue_size: int = 4,
+        checkpoint: Optional[IngestCheckpoint] = None,
+        checkpoint_interval: float = 60.0
+    ):
+        """
+        Args:
+            retriever: Hedef DrugRetriever
+            embedder: embed_array arayüzlü nesne (None: retriever.embedder)
+            chunk_options: chunk_file argümanları (chunk_size, chunking, tokenizer, ...)
+            chunk_workers: Chunk'lama süreç sayısı (0/1: pipeline thread'inde)
+            embed_stages: Paralel embed thread'i sayısı (süreç içi model ile 1)
+            batch_chunks: Embed batch'i başına en az chunk sayısı
+            queue_size: Aşamalar arası kuyruktaki en fazla batch sayısı
+            checkpoint: Yazılan batch'lerin kaydedileceği checkpoint (None: kapalı)
+            checkpoint_interval: İki checkpoint arasındaki en az süre (saniye)
+        """
+        self.retriever = retriever
+        self.embedder = embedder or retriever.embedder
+        self.chunk_options = dict(chunk_options or {})
+        self.chunk_workers = max(0, chunk_workers)
+        self.embed_stages = max(1, embed_stages)
+        self.batch_chunks = max(1, batch_chunks)
+        self.queue_size = max(1, queue_size)
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+
+        self.stats = {name: StageStats(name) for name in ("chunk", "embed", "write")}
+        self.truncation = {'chunks': 0, 'truncated_chunks': 0, 'total_tokens': 0, 'truncated_tokens': 0}
+        self.parents = 0
+        self.resumed_chunks = 0
+        self.checkpoints = 0
+        self.wall = 0.0
+
+        # Süreç içi tokenizer/model aynı anda iki thread'den çağrılamaz
+        # (HF fast tokenizer truncation ayarını çağrı başına değiştirir)
+        self._model_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    # ------------------------------------------------------------------ #
+    # Kuyruk yardımcıları
+    # ------------------------------------------------------------------ #
+    def _put(self, q: queue.Queue, item, stats: StageStats):
+        start = time.perf_counter()
+        try:
+            while True:
+                if self._stop.is_set():
+                    raise _Stopped()
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        finally:
+            stats.blocked += time.perf_counter() - start
+
+    def _get(self, q: queue.Queue, stats: StageStats):
+        start = time.perf_counter()
+        try:
+            while True:
+                if self._stop.is_set():
+                    raise _Stopped()
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+        finally:
+            stats.idle += time.perf_counter() - start
+
+    def _run_stage(self, target, downstream: queue.Queue, sentinels: int, stats: StageStats):
+        """Aşamayı çalıştırır; bitince (veya hata olunca) sonraki aşamaya sentinel gönderir."""
+        try:
+            target()
+        except _Stopped:
+            return
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+            return
+        for _ in range(sentinels):
+            try:
+                self._put(downstream, None, stats)
+            except _Stopped:
+                return
+
+    # ------------------------------------------------------------------ #
+    # Aşamalar
+    # ------------------------------------------------------------------ #
+    def _chunk_results(self, files: List[Path]) -> Iterator[Tuple[Dict, float]]:
+        """(chunk_file sonucu, chunk'lama süresi) çiftlerini dosya sırasıyla üretir."""
+        options = dict(self.chunk_options)
+        if options.get('tokenizer') is not None:
+            # Embed aşaması ana tokenizer'ı kullanırken chunker kendi kopyasıyla çalışır
+            options['tokenizer'] = copy.deepcopy(options['tokenizer'])
+
+        if self.chunk_workers <= 1:
+            for path in files:
+                start = time.perf_counter()
+                result = chunk_file(path, **options)
+                yield result, time.perf_counter() - start
+            return
+
+        # imap girdiyi kendi thread'inde okur; semaphore işlenmeyi bekleyen
+        # dosya sayısını sınırlar (havuz kuyruk dolduğunda durur)
+        slots = threading.Semaphore(self.queue_size + self.chunk_workers)
+
+        def gated():
+            for path in files:
+                while not slots.acquire(timeout=0.1):
+                    if self._stop.is_set():
+                        return
+                yield path
+
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(self.chunk_workers, initializer=_init_chunk_worker, initargs=(options,)) as pool:
+            for item in pool.imap(_chunk_task, gated()):
+                slots.release()
+                yield item
+
+    def _chunk_stage(self, files: List[Path]):
+        stats = self.stats["chunk"]
+        batch = _Batch(0)
+        # busy: chunk'lama süresi (havuzda worker'ların toplam süresi)
+        for result, seconds in self._chunk_results(files):
+            stats.busy += seconds
+            stats.items += 1
+            stats.chunks += len(result['texts'])
+            batch.add(result)
+            if len(batch.texts) >= self.batch_chunks:
+                self._put(self._embed_queue, batch, stats)
+                batch = _Batch(batch.seq + 1)
+        if batch.files:
+            self._put(self._embed_queue, batch, stats)
+
+    def _embed_stage(self):
+        stats = self.stats["embed"]
+        in_process = self.embedder is self.retriever.embedder
+        # Kırpma istatistiği ek bir tokenizasyon geçişidir: EmbeddingPool'un paralel
+        # encode'unu ana süreçte seri tokenizasyonla yavaşlatmamak için sadece süreç
+        # içi modelde, token bütçeli chunk'lamada (chunk'lar zaten max_seq_length
+        # içinde) hiç ölçülmez
+        measure = in_process and not self.chunk_options.get('max_tokens')
+        while True:
+            batch = self._get(self._embed_queue, stats)
+            if batch is None:
+                return
+
+            start = time.perf_counter()
+            if batch.texts:
+                if in_process:
+                    with self._model_lock:
+                        if measure:
+                            truncation = self.retriever.embedder.truncation_stats(batch.texts)
+                        batch.vectors = self.retriever.embed_documents(batch.texts, self.embedder)
+                else:
+                    batch.vectors = self.retriever.embed_documents(batch.texts, self.embedder)
+                if measure:
+                    for key in self.truncation:
+                        self.truncation[key] += truncation[key]
+            stats.busy += time.perf_counter() - start
+            stats.items += 1
+            stats.chunks += len(batch.texts)
+
+            self._put(self._write_queue, batch, stats)
+
+    def _write(self, batches: List[_Batch], build_filters: bool):
+        """Batch'leri tek add_embeddings çağrısıyla retriever'a ekler."""
+        texts = [text for batch in batches for text in batch.texts]
+        metadatas = [meta for batch in batches for meta in batch.metadatas]
+        vectors = [batch.vectors for batch in batches if batch.vectors is not None]
+        parent_texts = [text for batch in batches for text in batch.parent_texts]
+        if parent_texts:
+            self.retriever.add_parents(
+                parent_texts, [meta for batch in batches for meta in batch.parent_metadatas]
+            )
+            self.parents += len(parent_texts)
+        embeddings = (vectors[0] if len(vectors) == 1 else np.concatenate(vectors)) if vectors else None
+        self.retriever.add_embeddings(texts, metadatas, embeddings, build_filters=build_filters)
+
+    def _accept(self, batch: _Batch, journal: bool = True):
+        """Sıradaki batch'i yazma kuyruğuna alır; gerekirse yazar ve checkpoint'ler."""
+        self._counts.update(batch.files)
+        self._pending.append(batch)
+        if self._appendable and len(self._pending) > 1:
+            self._write(self._pending[:-1], build_filters=False)
+            self._pending = self._pending[-1:]
+
+        if journal and self.checkpoint is not None:
+            self._unsaved.append(batch)
+            if time.perf_counter() - self._last_checkpoint >= self.checkpoint_interval:
+                self._save_checkpoint()
+
+    def _accept_ready(self, ready: Dict[int, _Batch]) -> int:
+        """Sırası gelen hazır batch'leri dosya sırasıyla kabul eder; dosya sayısını döndürür."""
+        stats = self.stats["write"]
+        files = 0
+        while self._next_seq in ready:
+            batch = ready.pop(self._next_seq)
+            self._next_seq += 1
+            self._accept(batch)
+            stats.items += 1
+            stats.chunks += len(batch.texts)
+            files += len(batch.files)
+        return files
+
+    def _drain(self, ready: Dict[int, _Batch]):
+        """Hata sonrası yazma kuyruğunda kalan (embed edilmiş) batch'leri kabul eder."""
+        while True:
+            try:
+                batch = self._write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if batch is not None:
+                ready[batch.seq] = batch
+        self._accept_ready(ready)
+
+    def _save_checkpoint(self):
+        """Son checkpoint'ten beri gelen batch'leri tek segment olarak kaydeder."""
+        if not self._unsaved:
+            return
+        batches, self._unsaved = self._unsaved, []
+        vectors = [batch.vectors for batch in batches if batch.vectors is not None]
+        self.checkpoint.append({
+            'files': [item for batch in batches for item in batch.files],
+            'texts': [text for batch in batches for text in batch.texts],
+            'metadatas': [meta for batch in batches for meta in batch.metadatas],
+            'parent_texts': [text for batch in batches for text in batch.parent_texts],
+            'parent_metadatas': [meta for batch in batches for meta in batch.parent_metadatas],
+            'vectors': np.concatenate(vectors) if vectors
+            else np.empty((0, self.retriever.embedder.dimension), dtype='float32'),
+        })
+        self.checkpoints += 1
+        self._last_checkpoint = time.perf_counter()
+
+    # ------------------------------------------------------------------ #
+    # Çalıştırma
+    # ------------------------------------------------------------------ #
+    def run(self, files: List[Path], resumed: Iterable[Dict] = ()) -> Dict[str, int]:
+        """Dosyaları chunk'layıp embed eder ve retriever'a ekler.
+
+        Index'e eklenme sırası dosya sırasıdır (aşamalar paralel olsa da).
+        Herhangi bir aşamadaki hata diğerlerini durdurur ve burada yükseltilir;
+        öncesinde embed edilmiş batch'ler checkpoint'e kaydedilir.
+
+        Args:
+            files: İşlenecek dosyalar
+            resumed: Checkpoint segmentleri (IngestCheckpoint.load_segments);
+                yeni dosyalardan önce, yeniden embed edilmeden yazılır
+
+        Returns:
+            Dosya adı -> chunk sayısı (manifest için, segmentlerdekiler dahil)
+        """
+        self._embed_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._write_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stats = self.stats["write"]
+        started = time.perf_counter()
+
+        # Eğitim gerektiren index'ler tüm korpusla tek seferde eklenir; diğerlerinde
+        # son batch hariç hepsi geldikçe yazılır (filtre index'i en sonda bir kez kurulur)
+        self._appendable = self.retriever.appendable
+        self._counts: Dict[str, int] = {}
+        self._pending: List[_Batch] = []
+        self._unsaved: List[_Batch] = []
+        self._last_checkpoint = time.perf_counter()
+        for segment in resumed:
+            self.resumed_chunks += len(segment['texts'])
+            self._accept(_Batch.from_segment(segment), journal=False)
+
+        threads = [threading.Thread(
+            target=self._run_stage, name="ingest-chunk", daemon=True,
+            args=(lambda: self._chunk_stage(files), self._embed_queue, self.embed_stages, self.stats["chunk"])
+        )]
+        threads += [
+            threading.Thread(
+                target=self._run_stage, name=f"ingest-embed-{i}", daemon=True,
+                args=(self._embed_stage, self._write_queue, 1, self.stats["embed"])
+            )
+            for i in range(self.embed_stages)
+        ]
+        for thread in threads:
+            thread.start()
+
+        ready: Dict[int, _Batch] = {}
+        self._next_seq = 0
+        finished = 0
+
+        try:
+            with tqdm(total=len(files), desc="Ingesting") as progress:
+                while finished < self.embed_stages:
+                    batch = self._get(self._write_queue, stats)
+                    if batch is None:
+                        finished += 1
+                        continue
+                    ready[batch.seq] = batch
+
+                    start = time.perf_counter()
+                    progress.update(self._accept_ready(ready))
+                    stats.busy += time.perf_counter() - start
+
+            start = time.perf_counter()
+            if self.checkpoint is not None:
+                # save() sırasında kesilirse de embed edilenler kaybolmaz
+                self._save_checkpoint()
+            self._write(self._pending, build_filters=True)
+            stats.busy += time.perf_counter() - start
+        except _Stopped:
+            pass
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            self.wall = time.perf_counter() - started
+
+        if self._error is not None:
+            if self.checkpoint is not None:
+                # Embed edilmiş ama henüz yazılmamış batch'ler de --resume'da kullanılır
+                self._drain(ready)
+                self._save_checkpoint()
+            raise self._error
+        return self._counts
+
+    def format_stats(self) -> List[str]:
+        """Aşama sayaçlarını rapor satırları olarak döndürür."""
+        lines = [f"{'stage':8} {'items':>7} {'chunks':>8} {'busy s':>8} {'idle s':>8} "
+                 f"{'blocked s':>9} {'chunks/s':>9}"]
+        for stage in self.stats.values():
+            lines.append(f"{stage.name:8} {stage.items:7d} {stage.chunks:8d} {stage.busy:8.2f} "
+                         f"{stage.idle:8.2f} {stage.blocked:9.2f} {stage.throughput:9.0f}")
+        total = self.stats["write"].chunks
+        lines.append(f"{'total':8} {'':7} {total:8d} {self.wall:8.2f} {'':8} {'':9} "
+                     f"{total / self.wall if self.wall > 0 else 0.0:9.0f}")
+        return lines
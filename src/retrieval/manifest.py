@@ -0,0 +1,76 @@
+"""Ingestion manifest: per-file content hashes stored next to the index."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from .metadata_store import atomic_write_bytes
+
+
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path: Path) -> str:
+    """Dosya içeriğinin SHA-256 özetini döndürür (parça parça okur)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def empty_manifest(settings: Dict) -> Dict:
+    return {'settings': dict(settings), 'files': {}}
+
+
+def load_manifest(db_path: Path) -> Dict:
+    """db_path altındaki manifest'i okur; yoksa boş dict döndürür."""
+    path = Path(db_path) / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(db_path: Path, manifest: Dict):
+    atomic_write_bytes(
+        Path(db_path) / MANIFEST_FILE,
+        json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+    )
+
+
+def plan_changes(manifest: Dict, files: Iterable[Path]) -> Dict[str, List]:
+    """Manifest ile diskteki dosyaları karşılaştırır.
+
+    Dosyalar index'te source_file (dosya adı) ile tutulduğundan anahtar
+    olarak dosya adı kullanılır.
+
+    Returns:
+        {
+            'added': [Path, ...],      # manifest'te yok
+            'changed': [Path, ...],    # hash farklı
+            'unchanged': [Path, ...],
+            'removed': [str, ...],     # diskte artık yok (dosya adı)
+            'hashes': {dosya adı: sha256}
+        }
+    """
+    known = manifest.get('files', {})
+    plan = {'added': [], 'changed': [], 'unchanged': [], 'removed': [], 'hashes': {}}
+
+    seen = set()
+    for path in files:
+        name = path.name
+        seen.add(name)
+        digest = file_sha256(path)
+        plan['hashes'][name] = digest
+
+        if name not in known:
+            plan['added'].append(path)
+        elif known[name]['sha256'] != digest:
+            plan['changed'].append(path)
+        else:
+            plan['unchanged'].append(path)
+
+    plan['removed'] = sorted(name for name in known if name not in seen)
+    return plan
@@ -0,0 +1,290 @@
+"""Columnar, memory-mapped metadata storage for FAISS chunks."""
+
+import contextlib
+import json
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Union
+
+import numpy as np
+
+
+CATEGORICAL_COLUMNS = ('drug_name', 'section', 'source_file')
+
+
+# Geçici dosyalar 0600 açılır; yerine konan dosya normal open() izinlerini alır
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextlib.contextmanager
+def atomic_open(path: Path) -> Iterator[BinaryIO]:
+    """path'e atomik yazmak için aynı dizinde benzersiz bir geçici dosya açar.
+
+    Blok hatasız biterse dosya os.replace ile path'in yerine konur, hata
+    olursa silinir. Aynı dosyaya yazan thread/process'ler (örn. PageCache
+    worker'ları) birbirinin geçici dosyasını ezmez; dosyayı mmap ile okuyan
+    diğer process'ler eski inode'u okumaya devam eder, yarım yazılmış
+    içerik görmez.
+    """
+    path = Path(path)
+    f = tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + '.', suffix='.tmp', delete=False)
+    try:
+        with f:
+            yield f
+        os.chmod(f.name, 0o666 & ~_UMASK)
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Dosyayı benzersiz geçici isimle yazıp os.replace ile yerine koyar (atomic_open)."""
+    with atomic_open(path) as f:
+        f.write(data)
+
+
+def atomic_save_npy(path: Path, array: np.ndarray):
+    """atomic_write_bytes'ın .npy karşılığı."""
+    with atomic_open(path) as f:
+        np.save(f, array)
+
+
+class MetadataStore:
+    """Chunk metadata'sını kolon bazlı saklar.
+
+    - drug_name / section / source_file: integer kodlu diziler + sözlük
+    - chunk_id: int32 dizi
+    - text: UTF-8 blob + offset dizisi, mmap ile okunur
+
+    Diskten yüklenen kolonlar `np.load(mmap_mode='r')` ile açılır; aynı
+    makinedeki birden fazla process sayfaları paylaşır. Chunk metni sadece
+    `text(i)` çağrıldığında materialize edilir.
+    """
+
+    def __init__(self):
+        self.vocab: Dict[str, List[str]] = {col: [] for col in CATEGORICAL_COLUMNS}
+        self._lookup: Dict[str, Dict[str, int]] = {col: {} for col in CATEGORICAL_COLUMNS}
+
+        # Diskteki (mmap) kısım
+        self._codes: Dict[str, np.ndarray] = {
+            col: np.empty(0, dtype='int32') for col in CATEGORICAL_COLUMNS
+        }
+        self._chunk_ids = np.empty(0, dtype='int32')
+        self._offsets = np.zeros(1, dtype='int64')
+        self._blob: Union[mmap.mmap, bytes] = b''
+
+        # Henüz kaydedilmemiş (append edilmiş) kısım
+        self._new_codes: Dict[str, List[int]] = {col: [] for col in CATEGORICAL_COLUMNS}
+        self._new_chunk_ids: List[int] = []
+        self._new_texts: List[str] = []
+
+    # ------------------------------------------------------------------ #
+    # Okuma
+    # ------------------------------------------------------------------ #
+    @property
+    def _disk_count(self) -> int:
+        return len(self._chunk_ids)
+
+    def __len__(self) -> int:
+        return self._disk_count + len(self._new_chunk_ids)
+
+    def codes(self, column: str) -> np.ndarray:
+        """Kategorik kolonun tüm kodlarını döndürür."""
+        if not self._new_codes[column]:
+            return self._codes[column]
+        return np.concatenate([
+            self._codes[column],
+            np.array(self._new_codes[column], dtype='int32')
+        ])
+
+    def value(self, column: str, i: int) -> str:
+        """i. chunk'ın kategorik kolon değerini döndürür."""
+        if i < self._disk_count:
+            code = self._codes[column][i]
+        else:
+            code = self._new_codes[column][i - self._disk_count]
+        return self.vocab[column][code]
+
+    def chunk_id(self, i: int) -> int:
+        if i < self._disk_count:
+            return int(self._chunk_ids[i])
+        return self._new_chunk_ids[i - self._disk_count]
+
+    def text(self, i: int) -> str:
+        """i. chunk'ın metnini (sadece bu chunk için) okur."""
+        if not 0 <= i < len(self):
+            raise IndexError(f"Chunk {i} out of range (store has {len(self)} chunks)")
+        if i < self._disk_count:
+            start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+            return self._blob[start:end].decode('utf-8')
+        return self._new_texts[i - self._disk_count]
+
+    def get(self, i: int, with_text: bool = True) -> Dict:
+        """Eski metadata.pkl kaydı formatında dict döndürür."""
+        record = {
+            'drug_name': self.value('drug_name', i),
+            'section': self.value('section', i),
+            'chunk_id': str(self.chunk_id(i)),
+            'source_file': self.value('source_file', i),
+        }
+        if with_text:
+            record['text'] = self.text(i)
+        return record
+
+    def groups(self, column: str) -> Dict[str, np.ndarray]:
+        """Kolon değeri -> chunk ID dizisi (artan sırada)."""
+        codes = self.codes(column)
+        if len(codes) == 0:
+            return {}
+        order = np.argsort(codes, kind='stable').astype('int64')
+        sorted_codes = codes[order]
+        boundaries = np.flatnonzero(np.diff(sorted_codes)) + 1
+        result = {}
+        for ids in np.split(order, boundaries):
+            result[self.vocab[column][codes[ids[0]]]] = ids
+        return result
+
+    def unique_values(self, column: str) -> List[str]:
+        """Kolonda gerçekten kullanılan değerler (sıralı)."""
+        return sorted(self.groups(column).keys())
+
+    # ------------------------------------------------------------------ #
+    # Yazma
+    # ------------------------------------------------------------------ #
+    def _encode(self, column: str, value: str) -> int:
+        lookup = self._lookup[column]
+        code = lookup.get(value)
+        if code is None:
+            code = len(self.vocab[column])
+            self.vocab[column].append(value)
+            lookup[value] = code
+        return code
+
+    def append(self, text: str, meta: Dict[str, str]):
+        """Yeni bir chunk ekler (kaydedilene kadar bellekte tutulur).
+
+        Sadece drug_name, section, chunk_id ve source_file saklanır.
+        """
+        for col in CATEGORICAL_COLUMNS:
+            self._new_codes[col].append(self._encode(col, str(meta.get(col, ''))))
+        self._new_chunk_ids.append(int(meta.get('chunk_id', 0)))
+        self._new_texts.append(text)
+
+    def extend(self, texts: Iterable[str], metadatas: Iterable[Dict[str, str]]):
+        for text, meta in zip(texts, metadatas):
+            self.append(text, meta)
+
+    def save(self, directory: Path):
+        """Kolonları ve metin blob'unu diske yazar, sonra mmap ile yeniden açar."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        texts = [self.text(i).encode('utf-8') for i in range(len(self))]
+        offsets = np.zeros(len(texts) + 1, dtype='int64')
+        if texts:
+            np.cumsum([len(t) for t in texts], out=offsets[1:])
+
+        for col in CATEGORICAL_COLUMNS:
+            atomic_save_npy(directory / f'{col}.npy', self.codes(col).astype('int32'))
+        chunk_ids = np.concatenate([
+            self._chunk_ids, np.array(self._new_chunk_ids, dtype='int32')
+        ]).astype('int32')
+        atomic_save_npy(directory / 'chunk_id.npy', chunk_ids)
+        atomic_save_npy(directory / 'text_offsets.npy', offsets)
+        atomic_write_bytes(directory / 'texts.bin', b''.join(texts))
+
+        # Sözlük en son yazılır: count alanı kolonlarla tutarlılığı gösterir
+        atomic_write_bytes(
+            directory / 'store.json',
+            json.dumps({'count': len(texts), 'vocab': self.vocab}, ensure_ascii=False).encode('utf-8')
+        )
+
+        self._open(directory)
+
+    def _open(self, directory: Path):
+        with open(directory / 'store.json', 'r', encoding='utf-8') as f:
+            info = json.load(f)
+
+        self.vocab = {col: list(info['vocab'].get(col, [])) for col in CATEGORICAL_COLUMNS}
+        self._lookup = {
+            col: {v: i for i, v in enumerate(values)} for col, values in self.vocab.items()
+        }
+        self._codes = {
+            col: np.load(directory / f'{col}.npy', mmap_mode='r') for col in CATEGORICAL_COLUMNS
+        }
+        self._chunk_ids = np.load(directory / 'chunk_id.npy', mmap_mode='r')
+        self._offsets = np.load(directory / 'text_offsets.npy', mmap_mode='r')
+
+        self._close_blob()
+        blob_path = directory / 'texts.bin'
+        if blob_path.stat().st_size > 0:
+            with open(blob_path, 'rb') as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._new_codes = {col: [] for col in CATEGORICAL_COLUMNS}
+        self._new_chunk_ids = []
+        self._new_texts = []
+
+    @classmethod
+    def load(cls, directory: Path) -> 'MetadataStore':
+        """Diskteki store'u mmap ile açar."""
+        store = cls()
+        store._open(Path(directory))
+        return store
+
+    @classmethod
+    def exists(cls, directory: Path) -> bool:
+        return (Path(directory) / 'store.json').exists()
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> 'MetadataStore':
+        """Eski metadata.pkl (list of dict) formatından store oluşturur."""
+        store = cls()
+        for record in records:
+            store.append(record['text'], record)
+        return store
+
+    def remove(self, rows: np.ndarray):
+        """Verilen chunk ID'lerini siler; kalan chunk'lar sırasını korur.
+
+        FAISS flat index'in remove_ids davranışıyla aynı şekilde ID'ler
+        yeniden numaralanır (kalan i. chunk'ın yeni ID'si = kendisinden
+        önce kalan chunk sayısı). Sonuç bir sonraki save()'e kadar bellekte
+        tutulur.
+        """
+        keep = np.ones(len(self), dtype=bool)
+        keep[np.asarray(rows, dtype='int64')] = False
+        disk_keep = keep[:self._disk_count]
+        new_keep = keep[self._disk_count:]
+
+        starts = np.asarray(self._offsets[:-1])[disk_keep]
+        ends = np.asarray(self._offsets[1:])[disk_keep]
+        blob = b''.join(self._blob[s:e] for s, e in zip(starts.tolist(), ends.tolist()))
+        offsets = np.zeros(len(starts) + 1, dtype='int64')
+        np.cumsum(ends - starts, out=offsets[1:])
+
+        self._codes = {col: np.asarray(self._codes[col])[disk_keep] for col in CATEGORICAL_COLUMNS}
+        self._chunk_ids = np.asarray(self._chunk_ids)[disk_keep]
+        self._offsets = offsets
+        self._close_blob()
+        self._blob = blob
+
+        self._new_codes = {
+            col: [c for c, k in zip(codes, new_keep) if k] for col, codes in self._new_codes.items()
+        }
+        self._new_chunk_ids = [c for c, k in zip(self._new_chunk_ids, new_keep) if k]
+        self._new_texts = [t for t, k in zip(self._new_texts, new_keep) if k]
+
+    def _close_blob(self):
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+        self._blob = b''
+
+    def clear(self):
+        """Store'u boşaltır (disk dosyalarına dokunmaz)."""
+        self._close_blob()
+        self.__init__()
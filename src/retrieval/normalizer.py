@@ -0,0 +1,293 @@
+"""Line-streaming, single-pass cleanup of prospectus text and markdown.
+
+scripts/pdf_to_rag_md.py (ham PDF metni -> başlıklı markdown),
+scripts/clean_markdown.py ve PDF ingest'i aynı kuralları kullanır. Kurallar
+modül yüklenirken bir kez derlenir; her aşama satır akışı alan ve satır
+akışı döndüren bir generator'dır, zincirlenen aşamalar girdiyi tek geçişte
+işler ve bellekte sadece küçük bir satır penceresi tutar:
+
+    normalize_pdf_text(split_lines(open(path, encoding='utf-8')))
+
+Satırlar '\\n' içermez ve text.split('\\n') ile aynıdır; '\\n'.join(...)
+önceki tam metin fonksiyonlarının çıktısını birebir verir.
+"""
+
+import re
+from typing import Callable, Iterable, Iterator, TextIO
+
+
+# Satır sınırını aşabilen kurallar (önceki tam metin re.sub'ları, aynı regex'ler)
+_PAGE_NUMBER = re.compile(r'\n?\d+/\d+\s*\n?')            # "3/10" + çevresindeki satır sonları
+_RUNNING_HEADER = re.compile(r'KULLANMA TALİMATI\s*\n+', re.IGNORECASE)
+_RUNNING_HEADER_AT_END = re.compile(r'KULLANMA TALİMATI\s*\Z', re.IGNORECASE)
+_BLANK_RUN = re.compile(r'\n{3,}')
+_NUMBERED_LINE = re.compile(r'^(\d+)\.\s+([A-ZÇĞİÖŞÜ].+)$', re.MULTILINE)
+_NUMBER_ONLY = re.compile(r'\d+\.\s*\Z')                   # başlığı sonraki satırda kalan "3."
+_INLINE_PAGE_NUMBER = re.compile(r'\s+\d+/\d+\s+')
+
+# Satır kuralları
+_MAIN_SECTION = re.compile(r'^(\d+)\.\s+([A-ZÇĞİÖŞÜ].+)')
+_FREQUENCY = re.compile(r'^(Çok\s+)?([Yy]aygın|[Ss]eyrek|[Bb]ilinmiyor)(\s+olmayan)?[:\s]*$', re.IGNORECASE)
+_FREQUENCY_LINE = re.compile(r'^(Çok yaygın|Yaygın olmayan|Seyrek|Çok seyrek|Bilinmiyor)\s*$', re.IGNORECASE)
+_SUBSECTIONS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'KULLANMAYINIZ',
+        r'DİKKATLİ KULLANINIZ',
+        r'dikkat edilmesi gerekenler',
+        r'nasıl kullanılır',
+        r'Saklanması',
+        r'Hamilelik',
+        r'Emzirme',
+        r'Araç ve makine kullanımı',
+        r'Enfeksiyonlar',
+        r'Çocuklar ve ergenler',
+    )
+]
+_BOLD_LINE = re.compile(r'^\*\*.+\*\*$')
+
+_MD_PAGE_NUMBER_LINE = re.compile(r'^\d+/\d+\s*$')
+_MD_MAIN_SECTION = re.compile(r'^#\s+\*\*(\d+)\.\s+(.+?)\*\*$')      # "# **1. ARVELES nedir**"
+_MD_SUBSECTION = re.compile(r'^#\s+\*\*([A-ZÇĞİÖŞÜ][^*]+)\*\*$')    # "# **KULLANMAYINIZ**"
+_MD_FREQUENCY = re.compile(r'^(Çok\s+)?(Yaygın|Seyrek|Bilinmiyor)(\s+olmayan)?[:\s]*$', re.IGNORECASE)
+
+_SENTENCE_END = '.!?:;,)'
+_LIST_START = ('-', '•', '*', '1', '2', '3', '4', '5')
+
+# Pencere başına en az satır (regex'ler C'de satır satır değil blok halinde çalışır)
+WINDOW_LINES = 64
+
+
+def split_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Metin parçalarını (dosya nesnesi, sayfalar, read() blokları) satırlara böler.
+
+    Sonuç parçaların birleşiminin split('\\n')'i ile aynıdır; dosya '\\n' ile
+    bitiyorsa son satır boştur.
+    """
+    carry = ''
+    for chunk in chunks:
+        if '\n' not in chunk:
+            carry += chunk
+            continue
+        lines = (carry + chunk).split('\n')
+        carry = lines.pop()
+        yield from lines
+    yield carry
+
+
+def write_lines(lines: Iterable[str], stream: TextIO) -> int:
+    """Satırları '\\n' ile birleştirerek yazar; yazılan karakter sayısını döndürür."""
+    written = 0
+    separator = ''
+    for line in lines:
+        written += stream.write(separator + line)
+        separator = '\n'
+    return written
+
+
+def _substitute(
+    lines: Iterable[str],
+    pattern: re.Pattern,
+    repl: str,
+    unsafe_end: Callable[[str], bool],
+    needle: str = ''
+) -> Iterator[str]:
+    """pattern.sub(repl, '\\n'.join(lines))'in akış hali.
+
+    Satırlar pencerelerde biriktirilir ve regex pencereye uygulanır. Pencere
+    sadece hiçbir eşleşmenin aşamayacağı bir satır sonunda kesilir
+    (unsafe_end(satır) False); sonraki pencere o satır sonundaki '\\n' ile
+    başlar. Böylece satırları birleştiren / silen eşleşmeler de tam metindeki
+    gibi uygulanır. needle verilirse onu içermeyen pencereler regex'e girmez.
+    """
+    buffer = []
+    prefix = ''     # ilk pencereden sonra: kesilen satır sonu
+    current = ''    # henüz bitmemiş çıktı satırı
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) < WINDOW_LINES or unsafe_end(line):
+            continue
+        text = prefix + '\n'.join(buffer)
+        if needle in text:
+            text = pattern.sub(repl, text)
+        output = text.split('\n')
+        output[0] = current + output[0]
+        current = output.pop()
+        yield from output
+        buffer = []
+        prefix = '\n'
+
+    if prefix and not buffer:
+        # Son satır pencereyle birlikte yazıldı; arkasında satır sonu yok
+        yield current
+        return
+    text = prefix + '\n'.join(buffer)
+    if needle in text:
+        text = pattern.sub(repl, text)
+    output = text.split('\n')
+    output[0] = current + output[0]
+    yield from output
+
+
+def _ends_in_number(line: str) -> bool:
+    """Satır '/', rakam veya boşlukla bitiyor (ya da boş): sayfa numarası eşleşmesi sonraki satıra uzanabilir."""
+    last = line[-1:]
+    return not last or last == '/' or last.isspace() or last.isdecimal()
+
+
+def _ends_in_header(line: str) -> bool:
+    return not line.strip() or _RUNNING_HEADER_AT_END.search(line) is not None
+
+
+def _opens_section(line: str) -> bool:
+    return not line.strip() or _NUMBER_ONLY.match(line) is not None
+
+
+def drop_page_numbers(lines: Iterable[str]) -> Iterator[str]:
+    """'3/10' sayfa numaralarını siler: re.sub(r'\\n?\\d+/\\d+\\s*\\n?', '', text).
+
+    Satır başındaki numara önceki satırı, satır sonundaki numara (arkasındaki
+    boşluklarla) sonraki dolu satırı birleştirir.
+    """
+    return _substitute(lines, _PAGE_NUMBER, '', _ends_in_number, needle='/')
+
+
+def drop_running_headers(lines: Iterable[str]) -> Iterator[str]:
+    """Sayfa başlarında tekrarlanan 'KULLANMA TALİMATI' satırlarını siler."""
+    return _substitute(lines, _RUNNING_HEADER, '', _ends_in_header)
+
+
+def join_wrapped_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Noktalama ile bitmeyen satırı sonraki satırla birleştirir.
+
+    Sonraki satır madde/numara ile başlıyorsa birleştirmez; satır sonundaki
+    '-' (heceleme) silinir. Birleşen satır bir daha birleştirilmez.
+    """
+    held = None
+    for line in lines:
+        if held is None:
+            held = line.rstrip()
+            continue
+        following = line.lstrip()
+        if held and held[-1] not in _SENTENCE_END and not following.startswith(_LIST_START):
+            yield held[:-1] + following if held.endswith('-') else held + ' ' + following
+            held = None
+        else:
+            yield held
+            held = line.rstrip()
+    if held is not None:
+        yield held
+
+
+def collapse_blank_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Ardışık boş satırları tek boş satıra indirir (\\n{3,} -> \\n\\n)."""
+    return _substitute(lines, _BLANK_RUN, '\n\n', lambda line: not line, needle='\n\n\n')
+
+
+def number_sections(lines: Iterable[str]) -> Iterator[str]:
+    """Numaralı bölümleri H1 yapar: "3. ARVELES nasıl kullanılır" -> "# 3. ARVELES nasıl kullanılır".
+
+    Başlığı sonraki satıra kaymış numara ("3." + boş satırlar + başlık) tek
+    satırda birleşir.
+    """
+    return _substitute(lines, _NUMBERED_LINE, r'# \1. \2', _opens_section, needle='.')
+
+
+def structure_sections(lines: Iterable[str]) -> Iterator[str]:
+    """Düz prospektüs satırlarını hiyerarşik markdown'a çevirir.
+
+    Satırlar strip edilir; "1. ..." -> "## 1. ...", yan etki bölümündeki
+    sıklık kategorileri ve tamamı büyük harf / kalın alt başlıklar -> "###".
+    Önceki uygulamadaki gibi alt başlık satırı korunur ve eşleşen her kalıp
+    için bir "###" satırı eklenir.
+    """
+    in_side_effects = False
+    for line in lines:
+        line = line.strip()
+
+        if not line:
+            yield ''
+            continue
+
+        main_section = _MAIN_SECTION.match(line)
+        if main_section:
+            title = main_section.group(2)
+            yield f"## {main_section.group(1)}. {title}"
+            in_side_effects = 'yan etki' in title.lower()
+            continue
+
+        if in_side_effects:
+            # "Çok yaygın:", "Yaygın olmayan", "Seyrek:", ...
+            if _FREQUENCY.match(line):
+                yield f"### {line.rstrip(':')}"
+                continue
+            if _FREQUENCY_LINE.match(line):
+                yield f"### {line}"
+                continue
+
+        if line.isupper() or _BOLD_LINE.match(line):
+            heading = f"### {line.replace('*', '').strip()}"
+            for pattern in _SUBSECTIONS:
+                if pattern.search(line):
+                    yield heading
+
+        yield line
+
+
+def restructure_markdown(lines: Iterable[str]) -> Iterator[str]:
+    """Elle yazılmış markdown'un başlıklarını düzenler.
+
+    "# **1. ARVELES nedir**" -> "## 1. ARVELES nedir", "# **KULLANMAYINIZ**"
+    -> "### KULLANMAYINIZ", yan etki bölümündeki sıklık satırları -> "###";
+    tek başına sayfa numarası satırları silinir.
+    """
+    in_side_effects = False
+    for line in lines:
+        stripped = line.strip()
+
+        if not stripped:
+            yield ''
+            continue
+
+        # Başlık kuralları '#', sayfa numarası rakamla başlar; çoğu satır hiçbirine girmez
+        first = stripped[0]
+        if first == '#':
+            main_section = _MD_MAIN_SECTION.match(stripped)
+            if main_section:
+                title = main_section.group(2)
+                yield f"## {main_section.group(1)}. {title}"
+                in_side_effects = 'yan etki' in title.lower()
+                continue
+
+            subsection = _MD_SUBSECTION.match(stripped)
+            if subsection:
+                yield f"### {subsection.group(1).strip()}"
+                continue
+        elif first.isdecimal() and _MD_PAGE_NUMBER_LINE.match(stripped):
+            continue
+
+        if in_side_effects and _MD_FREQUENCY.match(stripped):
+            yield f"### {stripped.rstrip(':')}"
+            continue
+
+        yield line
+
+
+def drop_inline_page_numbers(lines: Iterable[str]) -> Iterator[str]:
+    """Metin içindeki sayfa numaralarını tek boşluğa indirir (\\s+\\d+/\\d+\\s+ -> ' ')."""
+    return _substitute(lines, _INLINE_PAGE_NUMBER, ' ', _ends_in_number, needle='/')
+
+
+def normalize_pdf_text(lines: Iterable[str]) -> Iterator[str]:
+    """Ham PDF metni: sayfa numaraları, tekrarlanan başlıklar, kırık satırlar, boş satırlar."""
+    return collapse_blank_lines(join_wrapped_lines(drop_running_headers(drop_page_numbers(lines))))
+
+
+def structure_pdf_markdown(lines: Iterable[str]) -> Iterator[str]:
+    """Temizlenmiş PDF metni -> numaralı H1'ler ve hiyerarşik alt başlıklar."""
+    return structure_sections(number_sections(lines))
+
+
+def normalize_markdown(lines: Iterable[str]) -> Iterator[str]:
+    """Elle yazılmış markdown: başlıklar, sayfa numaraları, boş satırlar."""
+    return drop_inline_page_numbers(collapse_blank_lines(restructure_markdown(lines)))
@@ -0,0 +1,128 @@
+"""PDF sayfa çıkarımı: diskte sayfa metni cache'i ve sayfa sayfa markdown akışı.
+
+scripts/pdf_to_rag_md.py (toplu .md dönüşümü) ve PDF ingest'i
+(ingest_pipeline.chunk_file) aynı fonksiyonları kullanır.
+"""
+
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import pdfplumber
+
+from .manifest import file_sha256
+from .metadata_store import atomic_write_bytes
+from .normalizer import normalize_pdf_text, split_lines, structure_pdf_markdown
+
+
+DEFAULT_CACHE_DIR = Path('.cache/pdf_pages')
+
+
+class PageCache:
+    """Çıkarılmış sayfa metni: <cache_dir>/pdfplumber-<sürüm>/<pdf sha256>/<sayfa>.txt
+
+    Çıkarım çıktısı sürümler arasında değişebileceği için pdfplumber sürümü
+    anahtarın parçasıdır. Boş sayfalar boş dosya olarak saklanır.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.root = Path(cache_dir) / f"pdfplumber-{pdfplumber.__version__}"
+
+    def _path(self, pdf_hash: str, page_number: int) -> Path:
+        return self.root / pdf_hash / f"{page_number:05d}.txt"
+
+    def get(self, pdf_hash: str, page_number: int) -> Optional[str]:
+        try:
+            return self._path(pdf_hash, page_number).read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+
+    def put(self, pdf_hash: str, page_number: int, text: str):
+        path = self._path(pdf_hash, page_number)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, text.encode('utf-8'))
+
+    def page_count(self, pdf_hash: str) -> Optional[int]:
+        try:
+            return int((self.root / pdf_hash / "pages").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put_page_count(self, pdf_hash: str, count: int):
+        path = self.root / pdf_hash / "pages"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, str(count).encode('utf-8'))
+
+
+def iter_page_texts(
+    pdf_path: Path,
+    cache: Optional[PageCache] = None,
+    start: int = 0,
+    stop: Optional[int] = None
+) -> Iterator[Tuple[int, str]]:
+    """[start, stop) aralığındaki sayfalar için (sayfa no, metin) üretir.
+
+    Cache'teki sayfalar diskten okunur; PDF sadece eksik bir sayfa varsa
+    açılır, sayfa pdfplumber ile çıkarılıp hemen kapatılır ve cache'e yazılır.
+    """
+    pdf_hash = file_sha256(pdf_path) if cache is not None else None
+    count = cache.page_count(pdf_hash) if cache is not None else None
+
+    pdf = None
+    try:
+        if count is None:
+            pdf = pdfplumber.open(pdf_path)
+            count = len(pdf.pages)
+            if cache is not None:
+                cache.put_page_count(pdf_hash, count)
+        stop = count if stop is None else min(stop, count)
+
+        for number in range(start, stop):
+            text = cache.get(pdf_hash, number) if cache is not None else None
+            if text is None:
+                if pdf is None:
+                    pdf = pdfplumber.open(pdf_path)
+                page = pdf.pages[number]
+                text = page.extract_text() or ''
+                page.close()  # sayfanın parse edilmiş layout nesneleri bırakılır
+                if cache is not None:
+                    cache.put(pdf_hash, number, text)
+            yield number, text
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+
+def pdf_page_count(pdf_path: Path, cache: Optional[PageCache] = None) -> int:
+    """Sayfa sayısı (PDF daha önce görüldüyse cache'ten)."""
+    if cache is not None:
+        pdf_hash = file_sha256(pdf_path)
+        count = cache.page_count(pdf_hash)
+        if count is not None:
+            return count
+    with pdfplumber.open(pdf_path) as pdf:
+        count = len(pdf.pages)
+    if cache is not None:
+        cache.put_page_count(pdf_hash, count)
+    return count
+
+
+def iter_pdf_markdown(pdf_path: Path, cache: Optional[PageCache] = None) -> Iterator[str]:
+    """PDF'in RAG markdown'ını satır satır üretir, sayfaları tek tek çıkarır.
+
+    Sayfalar scripts/pdf_to_rag_md.py process_single_pdf ile aynı satır
+    aşamalarından geçer; bellekte sadece o anki sayfa ve küçük bir satır
+    penceresi tutulur, diske bir şey yazılmaz. Çıktı, frontmatter'sız
+    process_single_pdf çıktısıyla aynıdır ve ilaç adıyla (H1) başlar. Cache
+    verilirse çıkarılmış sayfalar tekrar parse edilmez.
+    """
+    def page_chunks() -> Iterator[str]:
+        separator = ""
+        for _, text in iter_page_texts(pdf_path, cache):
+            if text:
+                yield separator + text
+                separator = "\n\n"
+
+    yield f"# {pdf_path.stem}\n"
+    yield "\n"
+    for line in structure_pdf_markdown(normalize_pdf_text(split_lines(page_chunks()))):
+        yield line + '\n'
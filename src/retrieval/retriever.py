@@ -5,115 +5,485 @@ import numpy as np
 from pathlib import Path
 from typing import List, Dict, Optional
 import pickle
-import re
-from difflib import get_close_matches
+import time
 
+from .bm25 import BM25Index
+from .cache import EmbeddingStore
+from .drug_lexicon import DrugLexicon
 from .embedder import get_embedder
+from .indexing import (
+    build_index,
+    evaluate_recall,
+    index_type_of,
+    is_quantized,
+    prepare_index,
+    reconstruct_all,
+    remove_rows,
+    rerank,
+    resolve_index_config,
+    search_parameters,
+    supports_selector,
+    train_index,
+)
+from .manifest import load_manifest, save_manifest
+from .metadata_store import MetadataStore, atomic_save_npy
+from .snapshots import (
+    current_version,
+    new_version,
+    prune_snapshots,
+    publish_snapshot,
+    remove_legacy_files,
+    resolve_snapshot,
+    snapshot_path,
+)
+
+
+RETRIEVAL_MODES = ("dense", "hybrid")
+
+DEFAULT_HYBRID_CONFIG = {
+    "mode": "dense",
+    "fusion": "rrf",            # "rrf" veya "weighted"
+    "rrf_k": 60,
+    "dense_weight": 0.5,        # weighted fusion'da dense skorun ağırlığı
+    "hybrid_candidates": 50,    # her iki listeden alınacak aday sayısı
+}
+
+
+# Small-to-big: child pasajlar aranır, context olarak parent bölümler döner
+DEFAULT_PARENT_CONFIG = {
+    "child_candidates": 4,          # top_k başına aranan child pasaj sayısı
+    "parent_context_chars": 6000,   # context'e giren parent metinlerinin toplam bütçesi
+}
+
+
+def _min_max_normalize(scores: Dict[int, float]) -> Dict[int, float]:
+    """Skorları [0, 1] aralığına ölçekler (weighted fusion için)."""
+    if not scores:
+        return {}
+    low, high = min(scores.values()), max(scores.values())
+    span = (high - low) or 1.0
+    return {i: (s - low) / span for i, s in scores.items()}
 
 
 class DrugRetriever:
     """İlaç bilgilerini FAISS ile retrieve eder.
     
     ChromaDB yerine FAISS kullanır (Python 3.14 uyumlu).
-    Metadata filtering manuel olarak yapılır.
+    Metadata filtering, drug_name/section bazlı ID selector'lar ile
+    arama sırasında yapılır (pre-filtering). İsteğe bağlı olarak BM25
+    lexical index ile hybrid arama yapılır.
     """
     
     def __init__(
         self,
         db_path: str = "./faiss_db",
-        embedding_model: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+        embedding_model: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2",
+        index_config: Optional[Dict] = None,
+        retrieval_config: Optional[Dict] = None,
+        embedding_cache_path: Optional[str] = None
     ):
         """
         Args:
             db_path: FAISS index ve metadata storage yolu
             embedding_model: Embedding model adı
+            index_config: config.toml [database] ayarları (index_type,
+                hnsw_ef_search, ivf_nprobe, ...). Yeni index oluşturulurken
+                tip, mevcut index için arama parametreleri buradan alınır.
+            retrieval_config: config.toml [retrieval] ayarları (mode, fusion,
+                rrf_k, dense_weight, hybrid_candidates, child_candidates,
+                parent_context_chars)
+            embedding_cache_path: Chunk embedding cache'i (SQLite). Verilirse
+                add_documents önce bu cache'e bakar, sadece eksikleri embed eder.
         """
         self.db_path = Path(db_path)
         self.db_path.mkdir(exist_ok=True)
         self.embedder = get_embedder(model_name=embedding_model)
+        self.embedding_cache: Optional[EmbeddingStore] = None
+        if embedding_cache_path:
+            self.embedding_cache = EmbeddingStore(embedding_cache_path, self.embedder.cache_namespace)
+        self.index_config = resolve_index_config(index_config)
+        self.hybrid_config = dict(DEFAULT_HYBRID_CONFIG)
+        self.parent_config = dict(DEFAULT_PARENT_CONFIG)
+        if retrieval_config:
+            self.hybrid_config.update(
+                {k: v for k, v in retrieval_config.items() if k in DEFAULT_HYBRID_CONFIG}
+            )
+            self.parent_config.update(
+                {k: v for k, v in retrieval_config.items() if k in DEFAULT_PARENT_CONFIG}
+            )
+        
+        # Aktif snapshot (CURRENT yoksa eski düz layout: db_path'in kendisi)
+        self.snapshot_version: Optional[str] = current_version(self.db_path)
+        self._set_snapshot_dir(resolve_snapshot(self.db_path))
+        self._bm25: Optional[BM25Index] = None
         
-        self.index_file = self.db_path / "faiss.index"
-        self.metadata_file = self.db_path / "metadata.pkl"
+        # Quantized index'lerde tam hassasiyetli vektörler (re-ranking için, mmap)
+        self.vectors: Optional[np.ndarray] = None
+        
+        # Small-to-big index'te parent bölümler (index'te child pasajlar durur)
+        self.parents: Optional[MetadataStore] = None
+        
+        # Ingestion manifest'i (dosya hash'leri); index ile birlikte kaydedilir
+        self.manifest: Dict = load_manifest(self.snapshot_dir)
         
         # Load existing index or create new
         if self.index_file.exists():
             self.index = faiss.read_index(str(self.index_file))
-            with open(self.metadata_file, 'rb') as f:
-                self.metadata = pickle.load(f)
+            prepare_index(self.index)
+            self.metadata = self._load_metadata()
+            if BM25Index.exists(self.bm25_dir):
+                self._bm25 = BM25Index.load(self.bm25_dir)
+            if is_quantized(self.index) and self.vectors_file.exists():
+                self.vectors = np.load(self.vectors_file, mmap_mode='r')
+            if MetadataStore.exists(self.parents_dir):
+                self.parents = MetadataStore.load(self.parents_dir)
         else:
-            # Create empty index
-            self.index = faiss.IndexFlatIP(self.embedder.dimension)  # Inner Product (cosine similarity)
-            self.metadata = []
+            # Create empty index (Inner Product = cosine similarity)
+            self.index = build_index(self.embedder.dimension, self.index_config)
+            self.metadata = MetadataStore()
+        
+        self._build_filter_index()
+    
+    def _set_snapshot_dir(self, snapshot_dir: Path):
+        """Okuma/yazma yollarını verilen snapshot dizinine çevirir."""
+        self.snapshot_dir = snapshot_dir
+        self.index_file = snapshot_dir / "faiss.index"
+        self.metadata_dir = snapshot_dir / "metadata"
+        self.legacy_metadata_file = snapshot_dir / "metadata.pkl"
+        self.parents_dir = snapshot_dir / "parents"
+        self.bm25_dir = snapshot_dir / "bm25"
+        self.vectors_file = snapshot_dir / "vectors.npy"
+    
+    def _load_metadata(self) -> MetadataStore:
+        """Columnar store'u mmap ile açar; yoksa eski metadata.pkl'yi çevirir."""
+        if MetadataStore.exists(self.metadata_dir):
+            return MetadataStore.load(self.metadata_dir)
+        
+        # Eski format: bir sonraki save() ile columnar formata geçer
+        with open(self.legacy_metadata_file, 'rb') as f:
+            return MetadataStore.from_records(pickle.load(f))
     
     def add_documents(
         self,
         texts: List[str],
-        metadatas: List[Dict[str, str]]
+        metadatas: List[Dict[str, str]],
+        embedder=None
     ):
         """Dokümanları index'e ekler.
         
         Args:
             texts: Chunk metinleri
             metadatas: Her chunk için metadata dict
+            embedder: Cache'te olmayan chunk'ları encode edecek nesne
+                (embed_array arayüzü, örn. EmbeddingPool; None: self.embedder)
         """
         if not texts:
             return
         
-        # Generate embeddings
-        embeddings = self.embedder.embed(texts)
-        embeddings_np = np.array(embeddings, dtype='float32')
+        # Generate embeddings (cache'te olmayanlar), cosine için normalize
+        embeddings_np = self.embed_documents(texts, embedder)
+        self.add_embeddings(texts, metadatas, embeddings_np)
+    
+    def add_embeddings(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, str]],
+        embeddings: np.ndarray,
+        build_filters: bool = True
+    ):
+        """Önceden hesaplanmış (L2-normalize) vektörleri metinleriyle ekler.
+        
+        Args:
+            texts: Chunk metinleri
+            metadatas: Her chunk için metadata dict
+            embeddings: (len(texts), d) float32 vektörler (embed_documents çıktısı)
+            build_filters: False ise filtre index'i ve ilaç sözlüğü kurulmaz;
+                art arda eklenen batch'lerde sadece sonuncusunda kurmak için
+        """
+        if len(texts):
+            # IVF gibi index'ler ilk eklemede bu vektörlerle eğitilir;
+            # nlist otomatikse index eğitim verisinin boyutuna göre yeniden kurulur
+            if not self.index.is_trained:
+                if self.index.ntotal == 0 and self.index_config['ivf_nlist'] == 0:
+                    self.index = build_index(self.embedder.dimension, self.index_config, len(embeddings))
+                train_index(self.index, embeddings)
+            
+            # Add to index
+            self.index.add(embeddings)
+            if is_quantized(self.index):
+                self.vectors = embeddings if self.vectors is None else np.concatenate([self.vectors, embeddings])
+            
+            # Store metadata
+            self.metadata.extend(texts, metadatas)
+            self._bm25 = None  # Lexical index bir sonraki save() / hybrid sorguda yeniden kurulur
         
-        # Normalize for cosine similarity
-        faiss.normalize_L2(embeddings_np)
+        if build_filters:
+            self._build_filter_index()
+    
+    @property
+    def appendable(self) -> bool:
+        """Index batch batch eklemeye uygun mu.
         
-        # Add to index
-        self.index.add(embeddings_np)
+        Eğitim gerektiren (IVF, SQ8/PQ) index'ler tüm korpusla tek seferde
+        eklenmelidir; quantized index'lerde ayrıca tam vektör dizisi her
+        eklemede yeniden kopyalanır.
+        """
+        return self.index.is_trained and not is_quantized(self.index)
+    
+    def add_parents(self, texts: List[str], metadatas: List[Dict[str, str]]):
+        """Small-to-big için parent bölümleri ekler (embed edilmez).
         
-        # Store metadata
-        for i, (text, meta) in enumerate(zip(texts, metadatas)):
-            self.metadata.append({
-                'text': text,
-                **meta,
-                'index': len(self.metadata)
-            })
+        Child pasajlar add_documents ile, parent'larıyla aynı source_file
+        ve chunk_id metadata'sıyla eklenir; retrieve child'ları skorlayıp
+        bu parent'lara genişletir.
+        
+        Args:
+            texts: Parent chunk metinleri
+            metadatas: Her parent için metadata dict
+        """
+        if self.parents is None:
+            self.parents = MetadataStore()
+        start = len(self.parents)
+        self.parents.extend(texts, metadatas)
+        # Yeni satırlar sona eklenir; eşleme sadece onlar için genişletilir
+        for row, meta in enumerate(metadatas, start):
+            self._parent_rows[(str(meta.get('source_file', '')), int(meta.get('chunk_id', 0)))] = row
     
-    def save(self):
-        """Index ve metadata'yı diske kaydeder."""
+    def embed_documents(self, texts: List[str], embedder=None) -> np.ndarray:
+        """Chunk'ları embedding cache üzerinden vektörleştirir.
+        
+        Cache'te olmayan (ve tekrar etmeyen) metinler tek embed çağrısında
+        hesaplanır ve cache'e geri yazılır. Dönen (n, d) float32 dizi
+        L2-normalize edilmiştir.
+        
+        Args:
+            texts: Chunk metinleri
+            embedder: embed_array arayüzlü nesne (None: self.embedder)
+        """
+        embedder = embedder or self.embedder
+        if self.embedding_cache is None:
+            return embedder.embed_array(texts, normalize=True)
+        
+        vectors = np.empty((len(texts), self.embedder.dimension), dtype='float32')
+        missing: Dict[bytes, List[int]] = {}
+        
+        cached = self.embedding_cache.get_many(texts, self.embedder.dimension)
+        for i, vector in enumerate(cached):
+            if vector is not None:
+                vectors[i] = vector
+            else:
+                missing.setdefault(self.embedding_cache.key(texts[i]), []).append(i)
+        
+        if missing:
+            positions = list(missing.values())
+            miss_texts = [texts[group[0]] for group in positions]
+            embeddings = embedder.embed_array(miss_texts, normalize=True)
+            for group, embedding in zip(positions, embeddings):
+                vectors[group] = embedding
+            self.embedding_cache.put_many(miss_texts, embeddings)
+        
+        # Eski cache kayıtları normalize edilmemiş olabilir (yerinde, idempotent)
+        faiss.normalize_L2(vectors)
+        return vectors
+    
+    def delete_documents(self, source_files: List[str]) -> int:
+        """Verilen kaynak dosyalara ait tüm chunk'ları index'ten siler.
+        
+        Args:
+            source_files: Dosya adları (metadata'daki source_file)
+            
+        Returns:
+            Silinen chunk sayısı
+        """
+        if self.parents is not None:
+            parent_groups = self.parents.groups('source_file')
+            parent_rows = [parent_groups[name] for name in source_files if name in parent_groups]
+            if parent_rows:
+                self.parents.remove(np.concatenate(parent_rows))
+        
+        groups = self.metadata.groups('source_file')
+        parts = [groups[name] for name in source_files if name in groups]
+        if not parts:
+            return 0
+        
+        rows = np.concatenate(parts)
+        self.index = remove_rows(self.index, rows, vectors=self.vectors)
+        self.metadata.remove(rows)
+        if self.vectors is not None:
+            keep = np.ones(len(self.vectors), dtype=bool)
+            keep[rows] = False
+            self.vectors = np.asarray(self.vectors)[keep]
+        
+        self._build_filter_index()
+        self._bm25 = None
+        return len(rows)
+    
+    def save(self) -> str:
+        """Index ve metadata'yı yeni bir snapshot olarak diske kaydeder.
+        
+        Tüm dosyalar önce snapshots/<version>/ altına yazılır, ardından
+        CURRENT pointer'ı atomik olarak bu sürüme çevrilir. Yarıda kalan bir
+        save yayınlanmamış bir dizin bırakır; aktif sürüm tutarlı kalır.
+        
+        Returns:
+            Yayınlanan sürüm adı
+        """
+        version = new_version()
+        self._set_snapshot_dir(snapshot_path(self.db_path, version))
+        self.snapshot_dir.mkdir(parents=True)
+        
         faiss.write_index(self.index, str(self.index_file))
-        with open(self.metadata_file, 'wb') as f:
-            pickle.dump(self.metadata, f)
+        self.metadata.save(self.metadata_dir)
+        if self.parents is not None:
+            self.parents.save(self.parents_dir)
+        
+        if self.vectors is not None:
+            atomic_save_npy(self.vectors_file, np.ascontiguousarray(self.vectors, dtype='float32'))
+            self.vectors = np.load(self.vectors_file, mmap_mode='r')
+        
+        # BM25 inverted index FAISS index'in yanına yazılır, mmap ile geri açılır
+        self.bm25.save(self.bm25_dir)
+        self._bm25 = BM25Index.load(self.bm25_dir)
+        
+        self.manifest['snapshot'] = {
+            'version': version,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'total_chunks': len(self.metadata),
+            'index_type': index_type_of(self.index),
+            'quantized': is_quantized(self.index),
+            'parents': len(self.parents) if self.parents is not None else 0,
+        }
+        save_manifest(self.snapshot_dir, self.manifest)
+        
+        # Dizin tamam: pointer'ı çevir, eski sürümleri ve düz layout'u temizle
+        publish_snapshot(self.db_path, version)
+        self.snapshot_version = version
+        remove_legacy_files(self.db_path)
+        prune_snapshots(self.db_path, keep=self.index_config['keep_snapshots'])
+        return version
+    
+    def has_newer_snapshot(self) -> bool:
+        """Diskte bu instance'ın yüklediğinden farklı bir sürüm yayınlanmış mı?"""
+        version = current_version(self.db_path)
+        return version is not None and version != self.snapshot_version
     
     def clear(self):
-        """Index ve metadata'yı temizler."""
-        self.index.reset()
-        self.metadata = []
+        """Index ve metadata'yı bellekte temizler.
         
-        if self.index_file.exists():
-            self.index_file.unlink()
-        if self.metadata_file.exists():
-            self.metadata_file.unlink()
+        Diskteki snapshot'lara dokunulmaz (çalışan uygulamalar onları
+        okuyor olabilir); bir sonraki save() yeni bir sürüm yayınlar.
+        """
+        self.index = build_index(self.embedder.dimension, self.index_config)
+        self.metadata.clear()
+        self.parents = None
+        self._build_filter_index()
+        self._bm25 = None
+        self.vectors = None
+        self.manifest = {}
     
-    def extract_drug_names_from_query(self, query: str) -> List[str]:
-        """Sorgudan ilaç isimlerini çıkarır ve fuzzy matching ile metadata'ya eşleştirir."""
-        # Büyük harfle başlayan ve alfabetik karakterlerle devam eden kelimeleri yakala
-        potential_drugs = re.findall(r'\b[A-Z][a-zA-Zçğıöşüs0-9]+\b', query)
-        
-        # Veritabanındaki gerçek ilaç isimlerini al
-        available_drugs = list(set(m['drug_name'] for m in self.metadata))
-        
-        # Her potansiyel ilaç ismini veritabanında eşle (exact + fuzzy match)
-        matched_drugs = []
-        for drug in potential_drugs:
-            if drug in available_drugs:
-                # Exact match
-                matched_drugs.append(drug)
+    @property
+    def bm25(self) -> BM25Index:
+        """Lexical (BM25) index; diskte yoksa chunk metinlerinden kurulur."""
+        if self._bm25 is None:
+            self._bm25 = BM25Index.build(
+                self.metadata.text(i) for i in range(len(self.metadata))
+            )
+        return self._bm25
+    
+    def _build_filter_index(self):
+        """drug_name ve section değerlerinden chunk ID listelerini oluşturur.
+        
+        Filtreli sorgular bu listelerden ID selector kurar; böylece FAISS
+        sadece uygun vektörleri skorlar. İlaç ismi sözlüğü de burada kurulur.
+        """
+        self._drug_ids = self.metadata.groups('drug_name')
+        self._section_ids = self.metadata.groups('section')
+        self.lexicon = DrugLexicon(self._drug_ids)
+        self._build_parent_lookup()
+    
+    def _build_parent_lookup(self):
+        """(source_file, chunk_id) -> parent satırı eşlemesini kurar."""
+        self._parent_rows: Dict[tuple, int] = {}
+        if self.parents is None:
+            return
+        for name, rows in self.parents.groups('source_file').items():
+            for row in rows.tolist():
+                self._parent_rows[(name, self.parents.chunk_id(row))] = row
+    
+    def _eligible_ids(
+        self,
+        drug_names: Optional[List[str]],
+        section_filter: Optional[str]
+    ) -> Optional[np.ndarray]:
+        """Filtrelere uyan chunk ID'lerini döndürür (None: filtre yok)."""
+        eligible = None
+        
+        if drug_names:
+            parts = [self._drug_ids[d] for d in set(drug_names) if d in self._drug_ids]
+            eligible = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype='int64')
+        
+        if section_filter:
+            section = self._section_ids.get(section_filter, np.empty(0, dtype='int64'))
+            eligible = section if eligible is None else np.intersect1d(eligible, section, assume_unique=True)
+        
+        return eligible
+    
+    @property
+    def _rerank_factor(self) -> int:
+        """Quantized index'te aday çarpanı (tam vektörler yoksa 0)."""
+        if self.vectors is None:
+            return 0
+        return self.index_config['rerank_factor']
+    
+    def _search(self, query_np: np.ndarray, k: int, eligible: Optional[np.ndarray]):
+        """FAISS araması; eligible verilirse sadece o ID'ler skorlanır.
+        
+        Quantized index'lerde k*rerank_factor aday aranır ve diskteki tam
+        hassasiyetli vektörlerle exact skorlanarak ilk k döndürülür.
+        """
+        factor = self._rerank_factor
+        
+        if eligible is None:
+            k = min(k, self.index.ntotal)
+            params = search_parameters(self.index, self.index_config)
+            if not factor:
+                return self.index.search(query_np, k, params=params)
+            _, candidates = self.index.search(query_np, min(k * factor, self.index.ntotal), params=params)
+            return rerank(query_np, candidates, self.vectors, k)
+        
+        k = min(k, len(eligible))
+        
+        # ANN / quantized index'lerde küçük filtre kümeleri tam (exact) skorlanır;
+        # selector desteklemeyen index'lerde (flat PQ) filtre her zaman böyle uygulanır
+        approximate = index_type_of(self.index) != "flat" or self.vectors is not None
+        small = len(eligible) <= self.index_config['filter_exact_max']
+        if (approximate and small) or not supports_selector(self.index):
+            if self.vectors is not None:
+                vectors = np.asarray(self.vectors[eligible])
             else:
-                # Fuzzy match (örn: Arvales -> Arveles)
-                close_matches = get_close_matches(drug, available_drugs, n=1, cutoff=0.8)
-                if close_matches:
-                    matched_drugs.append(close_matches[0])
+                vectors = self.index.reconstruct_batch(eligible)
+            all_scores = query_np @ vectors.T
+            top = np.argsort(-all_scores, axis=1)[:, :k]
+            return np.take_along_axis(all_scores, top, axis=1), eligible[top]
         
-        return matched_drugs
+        selector = faiss.IDSelectorBatch(eligible)
+        params = search_parameters(
+            self.index,
+            self.index_config,
+            selector=selector,
+            selectivity=len(eligible) / self.index.ntotal
+        )
+        if not factor:
+            return self.index.search(query_np, k, params=params)
+        _, candidates = self.index.search(query_np, min(k * factor, len(eligible)), params=params)
+        return rerank(query_np, candidates, self.vectors, k)
+    
+    def extract_drug_names_from_query(self, query: str) -> List[str]:
+        """Sorgudan ilaç isimlerini çıkarır (exact + fuzzy, Türkçe case folding).
+        
+        Örn: "arveles'in yan etkileri" -> ["Arvales"]
+        """
+        return self.lexicon.find(query)
     
     def retrieve(
         self,
@@ -121,7 +491,8 @@ class DrugRetriever:
         drug_names: Optional[List[str]] = None,
         top_k: int = 5,
         similarity_threshold: float = 0.65,
-        section_filter: Optional[str] = None
+        section_filter: Optional[str] = None,
+        mode: Optional[str] = None
     ) -> Dict:
         """İlaç bilgilerini retrieve eder.
         
@@ -131,6 +502,7 @@ class DrugRetriever:
             top_k: Kaç chunk getirilecek
             similarity_threshold: Minimum benzerlik skoru
             section_filter: Bölüm filtresi
+            mode: "dense" veya "hybrid" (None ise retrieval_config'deki mod)
             
         Returns:
             {
@@ -139,67 +511,225 @@ class DrugRetriever:
                 'max_score': float
             }
         """
+        return self.retrieve_many(
+            [query],
+            drug_names=[drug_names],
+            top_k=top_k,
+            similarity_threshold=similarity_threshold,
+            section_filters=[section_filter],
+            mode=mode
+        )[0]
+    
+    def retrieve_many(
+        self,
+        queries: List[str],
+        drug_names: Optional[List[Optional[List[str]]]] = None,
+        top_k: int = 5,
+        similarity_threshold: float = 0.65,
+        section_filters: Optional[List[Optional[str]]] = None,
+        mode: Optional[str] = None
+    ) -> List[Dict]:
+        """Birden fazla sorguyu tek seferde retrieve eder.
+        
+        Tüm sorgular tek bir embed batch'inde vektörleştirilir; aynı
+        filtreye sahip sorgular tek bir FAISS matris aramasıyla işlenir.
+        Her sorgu için filtre ve threshold davranışı retrieve() ile aynıdır.
+        
+        Hybrid modda dense ve BM25 sıralamaları RRF (veya ağırlıklı skor)
+        ile birleştirilir. Threshold her iki modda da cosine skora uygulanır;
+        'score' alanı cosine benzerliği, 'fused_score' sıralama skorudur.
+        
+        Args:
+            queries: Kullanıcı soruları
+            drug_names: Her sorgu için ilaç isimleri (None / eleman None ise otomatik tespit)
+            top_k: Her sorgu için kaç chunk getirilecek
+            similarity_threshold: Minimum benzerlik skoru
+            section_filters: Her sorgu için bölüm filtresi
+            mode: "dense" veya "hybrid" (None ise retrieval_config'deki mod)
+            
+        Returns:
+            Her sorgu için retrieve() formatında sonuç listesi
+        """
+        mode = mode or self.hybrid_config['mode']
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}'. Supported: {', '.join(RETRIEVAL_MODES)}")
+        
+        if drug_names is None:
+            drug_names = [None] * len(queries)
+        if section_filters is None:
+            section_filters = [None] * len(queries)
+        
         if self.index.ntotal == 0:
-            return {
-                'chunks': [],
-                'drug_names': [],
-                'max_score': 0.0
-            }
+            return [
+                {'chunks': [], 'drug_names': [], 'max_score': 0.0}
+                for _ in queries
+            ]
         
-        # Query embedding
-        query_embedding = self.embedder.embed_single(query)
-        query_np = np.array([query_embedding], dtype='float32')
-        faiss.normalize_L2(query_np)
+        if not queries:
+            return []
+        
+        # Query embeddings (cache + tek batch)
+        query_np = self.embedder.embed_queries(queries, normalize=True)
         
         # İlaç isimlerini tespit et
-        if drug_names is None:
-            drug_names = self.extract_drug_names_from_query(query)
+        drug_names = [
+            names if names is not None else self.extract_drug_names_from_query(query)
+            for query, names in zip(queries, drug_names)
+        ]
         
-        # Search in FAISS (get more for filtering)
-        k = min(top_k * 4, self.index.ntotal)
-        scores, indices = self.index.search(query_np, k)
+        # Aynı filtreye sahip sorguları grupla
+        groups: Dict[tuple, List[int]] = {}
+        for i, (names, section) in enumerate(zip(drug_names, section_filters)):
+            key = (tuple(sorted(set(names))) if names else None, section or None)
+            groups.setdefault(key, []).append(i)
         
-        # Filter and format results
-        chunks = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx == -1:  # Invalid index
+        results: List[Optional[Dict]] = [None] * len(queries)
+        for (names, section), positions in groups.items():
+            # Pre-filtering: sadece filtrelere uyan vektörler aranır
+            eligible = self._eligible_ids(list(names) if names else None, section)
+            if eligible is not None and len(eligible) == 0:
+                for i in positions:
+                    results[i] = {'chunks': [], 'drug_names': drug_names[i], 'max_score': 0.0}
                 continue
             
-            meta = self.metadata[idx]
+            # Small-to-big: birden fazla child aynı parent'a düşebileceğinden fazla aday
+            n_hits = top_k * self.parent_config['child_candidates'] if self.parents is not None else top_k
+            k = n_hits if mode == "dense" else max(n_hits, self.hybrid_config['hybrid_candidates'])
+            scores, indices = self._search(query_np[positions], k, eligible)
             
-            # Apply filters
-            if drug_names:
-                if meta['drug_name'] not in drug_names:
-                    continue
-            
-            if section_filter:
-                if meta['section'] != section_filter:
-                    continue
+            for row, i in enumerate(positions):
+                if mode == "dense":
+                    chunks = self._format_hits(scores[row], indices[row], similarity_threshold)
+                else:
+                    chunks = self._hybrid_hits(
+                        queries[i], query_np[i], scores[row], indices[row],
+                        n_hits, similarity_threshold, eligible
+                    )
+                if self.parents is not None:
+                    chunks = self._expand_to_parents(chunks, top_k)
+                results[i] = {
+                    'chunks': chunks,
+                    'drug_names': drug_names[i],
+                    'max_score': max((c['score'] for c in chunks), default=0.0)
+                }
+        
+        return results
+    
+    def _format_hits(
+        self,
+        scores: np.ndarray,
+        indices: np.ndarray,
+        similarity_threshold: float
+    ) -> List[Dict]:
+        """FAISS sonuç satırını chunk listesine çevirir (skora göre sıralı)."""
+        chunks = []
+        for score, idx in zip(scores, indices):
+            if idx == -1:  # Invalid index
+                continue
             
-            # Threshold check
+            # Threshold check (metin sadece dönen chunk'lar için okunur)
             if score >= similarity_threshold:
                 chunks.append({
-                    'text': meta['text'],
-                    'metadata': {
-                        'drug_name': meta['drug_name'],
-                        'section': meta['section'],
-                        'chunk_id': meta['chunk_id'],
-                        'source_file': meta['source_file']
-                    },
+                    'text': self.metadata.text(idx),
+                    'metadata': self.metadata.get(idx, with_text=False),
                     'score': float(score),
                     'id': str(idx)
                 })
         
-        # Sort by score and limit
-        chunks = sorted(chunks, key=lambda x: x['score'], reverse=True)[:top_k]
+        return chunks
+    
+    def _hybrid_hits(
+        self,
+        query: str,
+        query_vector: np.ndarray,
+        dense_scores: np.ndarray,
+        dense_ids: np.ndarray,
+        top_k: int,
+        similarity_threshold: float,
+        eligible: Optional[np.ndarray]
+    ) -> List[Dict]:
+        """Dense ve BM25 aday listelerini birleştirip chunk listesine çevirir."""
+        config = self.hybrid_config
+        valid = dense_ids != -1
+        dense_ids, dense_scores = dense_ids[valid], dense_scores[valid]
+        lexical_ids, lexical_scores = self.bm25.search(query, config['hybrid_candidates'], eligible)
         
-        max_score = chunks[0]['score'] if chunks else 0.0
+        cosine = dict(zip(dense_ids.tolist(), dense_scores.tolist()))
+        bm25 = dict(zip(lexical_ids.tolist(), lexical_scores.tolist()))
         
-        return {
-            'chunks': chunks,
-            'drug_names': drug_names,
-            'max_score': max_score
-        }
+        # Sadece lexical listede olan adayların cosine skorunu tam hesapla
+        missing = np.array([i for i in bm25 if i not in cosine], dtype='int64')
+        if len(missing):
+            if self.vectors is not None:
+                vectors = np.asarray(self.vectors[missing])
+            else:
+                vectors = self.index.reconstruct_batch(missing)
+            cosine.update(zip(missing.tolist(), (vectors @ query_vector).tolist()))
+        
+        fused: Dict[int, float] = {}
+        if config['fusion'] == "weighted":
+            dense_norm = _min_max_normalize({i: cosine[i] for i in dense_ids.tolist()})
+            lexical_norm = _min_max_normalize(bm25)
+            weight = config['dense_weight']
+            for i in set(dense_norm) | set(lexical_norm):
+                fused[i] = weight * dense_norm.get(i, 0.0) + (1 - weight) * lexical_norm.get(i, 0.0)
+        else:
+            for ranking in (dense_ids.tolist(), lexical_ids.tolist()):
+                for rank, i in enumerate(ranking):
+                    fused[i] = fused.get(i, 0.0) + 1.0 / (config['rrf_k'] + rank + 1)
+        
+        chunks = []
+        for idx in sorted(fused, key=fused.get, reverse=True):
+            if cosine[idx] < similarity_threshold:
+                continue
+            chunks.append({
+                'text': self.metadata.text(idx),
+                'metadata': self.metadata.get(idx, with_text=False),
+                'score': float(cosine[idx]),
+                'fused_score': float(fused[idx]),
+                'bm25_score': float(bm25.get(idx, 0.0)),
+                'id': str(idx)
+            })
+            if len(chunks) == top_k:
+                break
+        
+        return chunks
+    
+    def _expand_to_parents(self, hits: List[Dict], top_k: int) -> List[Dict]:
+        """Child isabetlerini (skor sırasıyla) tekilleştirilmiş parent'lara genişletir.
+        
+        Her parent bir kez, en iyi child'ının skoruyla döner; eşleşen child
+        pasajları 'matched' alanında tutulur. Toplam parent metni
+        parent_context_chars bütçesini aşınca (ilk parent hariç) durur.
+        """
+        budget = self.parent_config['parent_context_chars']
+        parents: Dict[int, Dict] = {}
+        used = 0
+        
+        for hit in hits:
+            metadata = hit['metadata']
+            row = self._parent_rows.get((metadata['source_file'], int(metadata['chunk_id'])))
+            if row is None:
+                continue
+            if row in parents:
+                parents[row]['matched'].append(hit['text'])
+                continue
+            if len(parents) == top_k:
+                continue
+            
+            text = self.parents.text(row)
+            if parents and used + len(text) > budget:
+                continue
+            used += len(text)
+            parents[row] = {
+                **hit,
+                'text': text,
+                'metadata': self.parents.get(row, with_text=False),
+                'matched': [hit['text']],
+                'id': f"p{row}",
+            }
+        
+        return list(parents.values())
     
     def format_context(self, chunks: List[Dict]) -> str:
         """Retrieve edilen chunk'ları LLM için context formatına dönüştürür."""
@@ -216,12 +746,27 @@ class DrugRetriever:
         
         return "\n".join(context_parts)
     
+    def evaluate_recall(self, k: int = 10, n_queries: int = 200) -> Dict:
+        """Mevcut index'in recall@k değerini flat aramaya göre ölçer.
+        
+        Quantized index'lerde referans tam hassasiyetli vektörlerdir ve
+        re-ranking sonrası recall da ('rerank_recall') raporlanır.
+        """
+        if self.vectors is None:
+            vectors = reconstruct_all(self.index)
+        else:
+            vectors = np.asarray(self.vectors)
+        return evaluate_recall(
+            self.index, vectors, self.index_config,
+            k=k, n_queries=n_queries, rerank_factor=self._rerank_factor
+        )
+    
     def get_collection_stats(self) -> Dict:
         """Collection istatistiklerini döndürür."""
-        unique_drugs = set(m['drug_name'] for m in self.metadata)
-        
         return {
             'total_chunks': len(self.metadata),
-            'unique_drugs': sorted(list(unique_drugs)),
-            'collection_name': 'faiss_index'
+            'unique_drugs': sorted(self._drug_ids),
+            'total_parents': len(self.parents) if self.parents is not None else 0,
+            'collection_name': 'faiss_index',
+            'index_type': index_type_of(self.index)
         }
@@ -0,0 +1,103 @@
+"""Versioned index snapshots with an atomically swapped CURRENT pointer.
+
+Layout:
+    faiss_db/
+        CURRENT                      # aktif sürümün adı
+        snapshots/<version>/         # faiss.index, metadata/, bm25/, manifest.json, ...
+
+Her save() yeni bir sürüm dizinine yazar; dizin tamamlandıktan sonra CURRENT
+tmp + os.replace ile değiştirilir. Okuyucular ya eski ya yeni sürümü tam
+olarak görür. CURRENT yoksa eski (düz) layout db_path'in kendisinden okunur.
+"""
+
+import shutil
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from .metadata_store import atomic_write_bytes
+
+
+CURRENT_FILE = "CURRENT"
+SNAPSHOTS_DIR = "snapshots"
+
+# Eski düz layout'ta db_path kökünde bulunan dosyalar (taşındıktan sonra silinir)
+LEGACY_ENTRIES = ("faiss.index", "metadata.pkl", "metadata", "bm25", "vectors.npy", "manifest.json")
+
+
+def new_version() -> str:
+    """Zamana göre sıralanabilir bir sürüm adı üretir (örn: 20260101-120000-123456789)."""
+    now = time.time_ns()
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now // 10**9))
+    return f"{stamp}-{now % 10**9:09d}"
+
+
+def snapshot_path(db_path: Path, version: str) -> Path:
+    return Path(db_path) / SNAPSHOTS_DIR / version
+
+
+def current_version(db_path: Path) -> Optional[str]:
+    """CURRENT pointer'ının gösterdiği sürüm (yoksa None)."""
+    path = Path(db_path) / CURRENT_FILE
+    try:
+        version = path.read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def resolve_snapshot(db_path: Path) -> Path:
+    """Okunacak dizin: aktif sürüm dizini veya (CURRENT yoksa) db_path'in kendisi."""
+    version = current_version(db_path)
+    if version is None:
+        return Path(db_path)
+    return snapshot_path(db_path, version)
+
+
+def publish_snapshot(db_path: Path, version: str):
+    """CURRENT pointer'ını atomik olarak yeni sürüme çevirir."""
+    if not snapshot_path(db_path, version).is_dir():
+        raise FileNotFoundError(f"Snapshot {version} not found in {db_path}")
+    atomic_write_bytes(Path(db_path) / CURRENT_FILE, version.encode('utf-8'))
+
+
+def list_snapshots(db_path: Path) -> List[str]:
+    """Diskteki sürümler (eskiden yeniye)."""
+    root = Path(db_path) / SNAPSHOTS_DIR
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir())
+
+
+def prune_snapshots(db_path: Path, keep: int = 2) -> List[str]:
+    """Aktif sürüm ve en yeni `keep` sürüm dışındakileri siler.
+
+    Eski sürümü mmap ile açmış process'ler etkilenmez (silinen dosyanın
+    sayfaları kapatılana kadar geçerli kalır); yine de henüz yeni sürüme
+    geçmemiş okuyucular için bir önceki sürüm varsayılan olarak tutulur.
+
+    Returns:
+        Silinen sürümler
+    """
+    versions = list_snapshots(db_path)
+    protected = set(versions[-max(keep, 1):])
+    current = current_version(db_path)
+    if current is not None:
+        protected.add(current)
+
+    removed = []
+    for version in versions:
+        if version not in protected:
+            shutil.rmtree(snapshot_path(db_path, version), ignore_errors=True)
+            removed.append(version)
+    return removed
+
+
+def remove_legacy_files(db_path: Path):
+    """Snapshot layout'una geçildikten sonra kökteki eski dosyaları siler."""
+    for name in LEGACY_ENTRIES:
+        path = Path(db_path) / name
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.exists():
+            path.unlink()
@@ -0,0 +1,28 @@
+"""Turkish-aware text normalization helpers."""
+
+import re
+
+
+# str.lower() 'I' -> 'i' ve 'İ' -> 'i̇' (i + U+0307) üretir; Türkçe'de doğrusu 'ı' ve 'i'
+_COMBINING_DOT = '\u0307'
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def turkish_lower(text: str) -> str:
+    """Türkçe kurallarına göre küçük harfe çevirir (İ -> i, I -> ı)."""
+    # str.translate'den çok daha hızlı (replace/lower C'de tek geçiş); metindeki
+    # ayrık U+0307 (örn. NFD "İ") da atılır
+    return text.replace('I', 'ı').replace('İ', 'i').lower().replace(_COMBINING_DOT, '')
+
+
+def normalize_text(text: str) -> str:
+    """Karşılaştırma/anahtar için metni normalize eder.
+
+    Türkçe küçük harf, noktalama -> boşluk, ardışık boşlukları tek boşluk.
+
+    Örn: "  Arvales'in YAN etkileri nelerdir? " -> "arvales in yan etkileri nelerdir"
+    """
+    text = _PUNCTUATION_RE.sub(' ', turkish_lower(text))
+    return _WHITESPACE_RE.sub(' ', text).strip()
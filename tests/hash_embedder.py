@@ -0,0 +1,65 @@
+"""Testler için model indirmeyen, deterministik embedder.
+
+Her kelimeye crc32'sinden türetilen sabit bir rastgele vektör atanır; metin
+vektörü kelime vektörlerinin toplamıdır. Ortak kelimesi çok olan metinler
+birbirine yakın düşer. hash_embedder() bloğu içinde DrugRetriever ve
+ingest_documents gerçek model yerine bunu kullanır (get_embedder singleton'ı).
+"""
+
+import contextlib
+import re
+import zlib
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from src.retrieval import embedder as embedder_module
+from src.retrieval.embedder import normalize_rows
+
+
+_WORD = re.compile(r"\w+")
+
+
+class HashEmbedder:
+    """TurkishEmbedder'ın retriever/ingest tarafından kullanılan arayüzü."""
+
+    backend = "hash"
+    max_seq_length = 512
+
+    def __init__(self, dimension: int = 64):
+        self.dimension = dimension
+        self.model_name = f"hash-{dimension}"
+        self.cache_namespace = self.model_name
+        self._words: Dict[str, np.ndarray] = {}
+
+    def _word(self, word: str) -> np.ndarray:
+        if word not in self._words:
+            rng = np.random.default_rng(zlib.crc32(word.encode('utf-8')))
+            self._words[word] = rng.standard_normal(self.dimension).astype('float32')
+        return self._words[word]
+
+    def embed_array(self, texts: List[str], normalize: bool = False) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in _WORD.findall(text.lower()):
+                vectors[row] += self._word(word)
+        if normalize:
+            normalize_rows(vectors)
+        return vectors
+
+    def embed_queries(self, queries: List[str], normalize: bool = False) -> np.ndarray:
+        return self.embed_array(queries, normalize=normalize)
+
+    def truncation_stats(self, texts: List[str]) -> Dict[str, int]:
+        return {'chunks': len(texts), 'truncated_chunks': 0, 'total_tokens': 0, 'truncated_tokens': 0}
+
+
+@contextlib.contextmanager
+def hash_embedder(dimension: int = 64) -> Iterator[HashEmbedder]:
+    """Blok boyunca get_embedder()'ın döndürdüğü global embedder'ı HashEmbedder yapar."""
+    previous = embedder_module._embedder
+    embedder_module._embedder = HashEmbedder(dimension)
+    try:
+        yield embedder_module._embedder
+    finally:
+        embedder_module._embedder = previous
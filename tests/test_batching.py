@@ -0,0 +1,101 @@
+"""Sorgu micro-batching (MicroBatcher) testi."""
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.batching import MicroBatcher
+from src.retrieval.embedder import padded_tokens, token_budget_batches
+
+
+def fake_encode(texts):
+    return np.array([[len(text), i] for i, text in enumerate(texts)], dtype='float32')
+
+
+def test_concurrent_requests_are_merged():
+    """Eşzamanlı istekler birleştirilir, her çağıran kendi sonucunu alır."""
+    print("\n🧪 TEST 1: Micro-batching")
+    print("=" * 60)
+
+    batcher = MicroBatcher(fake_encode, max_batch_size=64, max_wait_ms=50)
+    results = {}
+    barrier = threading.Barrier(8)
+
+    def worker(n: int):
+        barrier.wait()
+        results[n] = batcher.submit(["x" * n, "y" * (n + 10)])
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    print(f"\n✓ {batcher.requests} istek, {batcher.batches} batch")
+    assert batcher.batches < batcher.requests == 8
+    for n, vectors in results.items():
+        assert vectors[:, 0].tolist() == [n, n + 10]
+
+
+def test_errors_reach_callers():
+    """Model hatası bekleyen çağırana iletilir."""
+    def failing(texts):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(failing, max_wait_ms=1)
+    try:
+        batcher.submit(["a"])
+        assert False, "ValueError bekleniyordu"
+    except ValueError:
+        pass
+    batcher.close()
+
+
+def test_token_budget_batches():
+    """Batch'ler bütçeye sığar ve her indeks tam bir kez yer alır."""
+    print("\n🧪 TEST 3: Token Bütçeli Batch'ler")
+    print("=" * 60)
+
+    lengths = np.array([12, 128, 7, 128, 40, 3, 90, 64, 5, 128])
+    batches = token_budget_batches(lengths, token_budget=256)
+    print(f"\n✓ {len(batches)} batch, padding dahil {padded_tokens(lengths, batches)} token "
+          f"(gerçek {lengths.sum()})")
+
+    assert sorted(np.concatenate(batches).tolist()) == list(range(len(lengths)))
+    for batch in batches:
+        assert lengths[batch].max() * len(batch) <= 256
+    assert padded_tokens(lengths, batches) < lengths.max() * len(lengths)
+
+    # Bütçeden uzun metin tek başına batch olur
+    assert [b.tolist() for b in token_budget_batches(np.array([300, 10]), 256)] == [[0], [1]]
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("🔀 Pharma Navigator - Batching Tests")
+    print("=" * 60)
+
+    try:
+        test_concurrent_requests_are_merged()
+        test_errors_reach_callers()
+        test_token_budget_batches()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
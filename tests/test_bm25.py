@@ -0,0 +1,141 @@
+"""BM25 lexical index ve hybrid (dense + BM25) arama testleri.
+
+Embedding modeli indirilmez; retriever testi HashEmbedder ile çalışır.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.bm25 import BM25Index, tokenize
+from src.retrieval.retriever import DrugRetriever
+from tests.hash_embedder import hash_embedder
+
+
+DOCUMENTS = [
+    "Arvales günde 3 kez 25 mg alınır. Tabletleri suyla yutunuz.",
+    "Arvales yan etkileri: baş ağrısı, bulantı ve kaşıntı.",
+    "Cipralex yan etkileri: uykusuzluk ve bulantı.",
+    "Cipralex 10 mg günde bir kez alınır.",
+    "Saklama: 25 °C altındaki oda sıcaklığında saklayınız.",
+]
+
+
+def test_tokenize():
+    """Türkçe küçük harf, stopword eleme, prefix-5 kök ve sayı+birim token'ları."""
+    print("\n🧪 TEST 1: Tokenization")
+    print("=" * 60)
+
+    tokens = tokenize("Günde 2 kez 50 mg ARVELES tabletleri ve 2,5 ml İLAÇLARI")
+    print(f"\n✓ {tokens}")
+    assert tokens == ['günde', '2', 'kez', '50', '50mg', 'mg', 'arvel', 'table', '2,5', '2,5ml', 'ml', 'ilaçl']
+    # Aynı kökün çekimli biçimleri aynı token'a iner
+    assert tokenize("tabletler") == tokenize("tabletleri") == ['table']
+    assert tokenize("IŞIKTA") == tokenize("ışıktan") == ["ışıkt"]  # I -> ı
+
+
+def test_scoring_and_save_load():
+    """Skor sırası, eligible filtresi ve CSR diziler için save / mmap load eşitliği."""
+    print("\n🧪 TEST 2: Scoring / Save-Load")
+    print("=" * 60)
+
+    index = BM25Index.build(DOCUMENTS)
+    ids, scores = index.search("arvales yan etkileri", k=5)
+    print(f"\n✓ ids: {ids.tolist()}, scores: {np.round(scores, 3).tolist()}")
+    # İki terimi de içeren doküman önce, sonra tek terimliler; eşleşmeyenler dönmez
+    assert ids[0] == 1
+    assert set(ids.tolist()) == {0, 1, 2}
+    assert np.all(np.diff(scores) <= 0)
+    assert index.search("parasetamol", k=5)[0].size == 0
+
+    # "25 mg" birleşik token'ı sadece dozu yazan dokümanda geçer
+    assert index.search("25 mg", k=1)[0].tolist() == [0]
+
+    # eligible dışındaki dokümanlar skorlanmaz
+    ids, _ = index.search("yan etkileri", k=5, eligible=np.array([2, 3]))
+    assert ids.tolist() == [2]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index.save(Path(tmp) / "bm25")
+        assert BM25Index.exists(Path(tmp) / "bm25")
+        loaded = BM25Index.load(Path(tmp) / "bm25")
+        assert loaded.vocab == index.vocab
+        for name in ('offsets', 'doc_ids', 'tfs', 'doc_len'):
+            assert isinstance(getattr(loaded, name), np.memmap)
+            assert np.array_equal(getattr(loaded, name), getattr(index, name))
+        for query in ("arvales yan etkileri", "günde kez alınır", "saklama sıcaklığı"):
+            expected, loaded_result = index.search(query, k=5), loaded.search(query, k=5)
+            assert np.array_equal(expected[0], loaded_result[0])
+            assert np.allclose(expected[1], loaded_result[1])
+        del loaded  # mmap'ler dizin silinmeden kapanır
+
+
+def test_hybrid_fusion_with_filter():
+    """RRF ve weighted fusion filtreye uyar; sadece BM25'te bulunan aday da skorlanır."""
+    print("\n🧪 TEST 3: Hybrid Fusion")
+    print("=" * 60)
+
+    with hash_embedder(), tempfile.TemporaryDirectory() as tmp:
+        retriever = DrugRetriever(db_path=tmp, retrieval_config={'hybrid_candidates': 5})
+        drugs = ["Arvales", "Arvales", "Cipralex", "Cipralex", "Arvales"]
+        sections = ["kullanım", "yan etkiler", "yan etkiler", "kullanım", "saklama"]
+        retriever.add_documents(DOCUMENTS, [
+            {'drug_name': drug, 'section': section, 'source_file': f"{drug}.md", 'chunk_id': str(i)}
+            for i, (drug, section) in enumerate(zip(drugs, sections))
+        ])
+
+        for fusion in ("rrf", "weighted"):
+            retriever.hybrid_config['fusion'] = fusion
+            result = retriever.retrieve(
+                "yan etkileri bulantı", top_k=3, drug_names=["Cipralex"],
+                similarity_threshold=-1.0, mode="hybrid"
+            )
+            chunks = result['chunks']
+            print(f"\n✓ {fusion}: {[(c['id'], round(c['fused_score'], 3)) for c in chunks]}")
+            assert chunks and all(c['metadata']['drug_name'] == "Cipralex" for c in chunks)
+            assert chunks[0]['id'] == "2"
+            assert chunks[0]['bm25_score'] > 0
+            assert all(c['fused_score'] >= d['fused_score'] for c, d in zip(chunks, chunks[1:]))
+
+        # Dense aday listesi 1 ile sınırlıyken BM25'in bulduğu aday da tam cosine ile skorlanır
+        dense_ids = np.array([3, -1], dtype='int64')
+        query = "yan etkileri bulantı"
+        query_vector = retriever.embedder.embed_queries([query], normalize=True)[0]
+        vectors = retriever.index.reconstruct_batch(np.array([2, 3], dtype='int64'))
+        chunks = retriever._hybrid_hits(
+            query, query_vector, np.array([vectors[1] @ query_vector, 0.0], dtype='float32'), dense_ids,
+            top_k=2, similarity_threshold=-1.0, eligible=np.array([2, 3], dtype='int64')
+        )
+        scores = {c['id']: c['score'] for c in chunks}
+        assert set(scores) == {"2", "3"}
+        assert np.isclose(scores["2"], vectors[0] @ query_vector, atol=1e-5)
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("🔎 Pharma Navigator - BM25 / Hybrid Tests")
+    print("=" * 60)
+
+    try:
+        test_tokenize()
+        test_scoring_and_save_load()
+        test_hybrid_fusion_with_filter()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
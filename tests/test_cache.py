@@ -0,0 +1,115 @@
+"""Embedding cache'leri (EmbeddingStore, QueryEmbeddingCache) testleri."""
+
+import atexit
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.cache import EmbeddingStore, QueryEmbeddingCache
+
+
+def test_embedding_store_roundtrip():
+    """Yazılan vektörler aynı model + metin için geri okunur."""
+    print("\n🧪 TEST 1: Embedding Store")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "chunks.sqlite"
+        vectors = np.random.default_rng(0).standard_normal((2, 8)).astype('float32')
+
+        store = EmbeddingStore(path, "model-a")
+        store.put_many(["Arvales yan etkileri", "Cipralex dozu"], vectors)
+        store.close()
+
+        store = EmbeddingStore(path, "model-a")
+        found = store.get_many(["Arvales  yan\netkileri", "Cipralex dozu", "Janumet"], dimension=8)
+        print(f"\n✓ Hits: {store.hits}, misses: {store.misses}")
+        assert np.array_equal(found[0], vectors[0])  # sadece boşluk farkı
+        assert np.array_equal(found[1], vectors[1])
+        assert found[2] is None
+
+        # Farklı model veya boyut eşleşmez
+        assert EmbeddingStore(path, "model-b").get_many(["Cipralex dozu"], dimension=8) == [None]
+        assert store.get_many(["Cipralex dozu"], dimension=16) == [None]
+        store.close()
+
+
+def test_query_cache_keys_and_lru():
+    """Türkçe normalize edilmiş sorgular aynı girdiyi paylaşır; en eski kullanılan çıkarılır."""
+    print("\n🧪 TEST 2: Query Cache Keys / LRU")
+    print("=" * 60)
+
+    cache = QueryEmbeddingCache("model-a", max_size=2)
+    vector = np.arange(4, dtype='float32')
+    cache.put("İLAÇ  Yan\netkileri?", vector)
+    assert np.array_equal(cache.get("ilaç yan etkileri"), vector)  # İ/i, boşluk, noktalama
+    assert cache.get("ISIK") is None and cache.get("ışık") is None
+    cache.put("IŞIK", vector)
+    assert cache.get("ışık") is not None  # I/ı
+
+    # "ilaç yan etkileri" en son kullanılan: yeni girdi "ışık"ı çıkarır
+    cache.get("ilaç yan etkileri")
+    cache.put("Cipralex dozu", vector)
+    print(f"\n✓ {cache.stats()}")
+    assert len(cache) == 2
+    assert cache.get("ışık") is None
+    assert cache.get("ilaç yan etkileri") is not None and cache.get("cipralex dozu") is not None
+    assert QueryEmbeddingCache("model-b").get("ilaç yan etkileri") is None
+
+
+def test_query_cache_spill_roundtrip():
+    """Spill dosyası LRU sırasıyla yazılır ve aynı model için geri yüklenir."""
+    print("\n🧪 TEST 3: Query Cache Spill")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache" / "queries.npz"
+        vectors = np.random.default_rng(0).standard_normal((3, 8)).astype('float32')
+
+        cache = QueryEmbeddingCache("model-a", max_size=3, spill_path=str(path))
+        atexit.unregister(cache.save)
+        for text, vector in zip(["Arvales", "Cipralex", "Janumet"], vectors):
+            cache.put(text, vector)
+        cache.get("Arvales")  # en son kullanılan
+        cache.save()
+        assert [p.name for p in path.parent.iterdir()] == ["queries.npz"]  # geçici dosya kalmaz
+
+        reloaded = QueryEmbeddingCache("model-a", max_size=3, spill_path=str(path))
+        atexit.unregister(reloaded.save)
+        print(f"\n✓ {len(reloaded)} girdi geri yüklendi")
+        assert list(reloaded._entries) == [cache.key(text) for text in ("Cipralex", "Janumet", "Arvales")]
+        assert np.array_equal(reloaded.get("janumet"), vectors[2])
+
+        other = QueryEmbeddingCache("model-b", spill_path=str(path))
+        atexit.unregister(other.save)
+        assert len(other) == 0
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("🗄️  Pharma Navigator - Cache Tests")
+    print("=" * 60)
+
+    try:
+        test_embedding_store_roundtrip()
+        test_query_cache_keys_and_lru()
+        test_query_cache_spill_roundtrip()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Ingest checkpoint (resume) testi."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.checkpoint import IngestCheckpoint
+from src.retrieval.ingest_pipeline import IngestPipeline
+
+
+def _segment(names, dim=4):
+    """Her dosya için iki chunk'lık bir segment."""
+    texts = [f"{name} chunk {i}" for name in names for i in range(2)]
+    return {
+        'files': [(name, 2) for name in names],
+        'texts': texts,
+        'metadatas': [{'source_file': name, 'chunk_id': str(i)} for name in names for i in range(2)],
+        'parent_texts': [],
+        'parent_metadatas': [],
+        'vectors': np.arange(len(texts) * dim, dtype='float32').reshape(len(texts), dim),
+    }
+
+
+def test_checkpoint_resume():
+    """Segmentler geri yüklenir; ayar değişince veya sonradan değişen dosyada kullanılmaz."""
+    print("\n🧪 TEST 1: Checkpoint / Resume")
+    print("=" * 60)
+
+    settings = {'chunk_size': 1800, 'index_type': 'flat'}
+    hashes = {'A.md': 'a1', 'B.md': 'b1', 'C.md': 'c1'}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = IngestCheckpoint(Path(tmp) / "checkpoint")
+        checkpoint.begin(settings, rebuild=True, base_version=None, hashes=hashes)
+        checkpoint.append(_segment(["A.md"]))
+        checkpoint.append(_segment(["B.md"]))
+
+        # Yeni süreç: aynı ayarlarla devam edilir
+        resumed = IngestCheckpoint(Path(tmp) / "checkpoint")
+        assert resumed.resume({**settings, 'chunk_size': 900}, None, hashes) is None
+        state = resumed.resume(settings, None, hashes)
+        print(f"\n✓ {state['segments']} segment, {state['chunks']} chunk, dosyalar: {sorted(state['files'])}")
+        assert state['chunks'] == 4
+        assert resumed.done_files() == {'A.md': 'a1', 'B.md': 'b1'}
+
+        segments = resumed.load_segments()
+        assert [s['files'] for s in segments] == [[("A.md", 2)], [("B.md", 2)]]
+        assert np.array_equal(segments[1]['vectors'], _segment(["B.md"])['vectors'])
+
+        # Checkpoint'ten sonra değişen dosyanın satırları atılır
+        segments = resumed.load_segments(skip_files=["A.md"])
+        assert segments[0]['texts'] == [] and len(segments[0]['vectors']) == 0
+        assert segments[1]['texts'] == ["B.md chunk 0", "B.md chunk 1"]
+
+        resumed.clear()
+        assert not resumed.exists()
+
+
+class _FailingRetriever:
+    """IngestPipeline'ın kullandığı retriever arayüzü; `fail_at`. embed çağrısında hata verir."""
+
+    appendable = True
+
+    def __init__(self, fail_at: int, dim: int = 4):
+        self.embedder = self
+        self.dimension = dim
+        self.fail_at = fail_at
+        self.calls = 0
+        self.added = []
+
+    def truncation_stats(self, texts):
+        return {'chunks': len(texts), 'truncated_chunks': 0, 'total_tokens': 0, 'truncated_tokens': 0}
+
+    def embed_documents(self, texts, embedder=None):
+        self.calls += 1
+        if self.calls == self.fail_at:
+            raise RuntimeError("encoder failed")
+        return np.ones((len(texts), self.dimension), dtype='float32')
+
+    def add_parents(self, texts, metadatas):
+        pass
+
+    def add_embeddings(self, texts, metadatas, embeddings, build_filters=True):
+        self.added.extend(texts)
+
+
+def test_stage_failure_saves_checkpoint():
+    """Bir aşama hata verince embed edilmiş batch'ler checkpoint'e yazılıp hata yükseltilir."""
+    print("\n🧪 TEST 2: Stage Failure")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for name in ("A", "B", "C", "D"):
+            path = Path(tmp) / f"{name}.md"
+            path.write_text(f"# {name}\n\n" + f"{name} ilacının yan etkileri baş ağrısıdır. " * 20, encoding='utf-8')
+            files.append(path)
+        hashes = {path.name: path.name for path in files}
+
+        checkpoint = IngestCheckpoint(Path(tmp) / "checkpoint")
+        checkpoint.begin({}, rebuild=True, base_version=None, hashes=hashes)
+        pipeline = IngestPipeline(
+            _FailingRetriever(fail_at=3),
+            chunk_options={'chunk_size': 1800, 'chunk_overlap': 0},
+            batch_chunks=1,
+            checkpoint=checkpoint,
+            checkpoint_interval=1e9
+        )
+        try:
+            pipeline.run(files)
+            raise AssertionError("Aşama hatası yükseltilmedi")
+        except RuntimeError as e:
+            assert str(e) == "encoder failed"
+
+        done = IngestCheckpoint(Path(tmp) / "checkpoint").resume({}, None, hashes)
+        print(f"\n✓ Hata sonrası checkpoint: {sorted(done['files'])}")
+        assert sorted(done['files']) == ["A.md", "B.md"]
+        assert pipeline.checkpoints == 1
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("💾 Pharma Navigator - Checkpoint Tests")
+    print("=" * 60)
+
+    try:
+        test_checkpoint_resume()
+        test_stage_failure_saves_checkpoint()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Chunker testleri: başlık bazlı chunking ve bölüm sınıflandırıcı."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.chunker import (
+    classify_sections,
+    detect_section,
+    iter_drug_chunks,
+    split_child_passages,
+)
+
+
+LEAFLET = """# **KULLANMA TALİMATI**
+
+# **TESTOL 500 mg tablet**
+
+# **2. TESTOL'ü kullanmadan önce dikkat edilmesi gerekenler**
+
+# **TESTOL'ü aşağıdaki durumlarda KULLANMAYINIZ**
+
+""" + "Eğer böbrek yetmezliğiniz varsa bu ilacı kullanmayınız. " * 12 + """
+
+# **4. Olası yan etkiler nelerdir?**
+
+""" + "Baş ağrısı ve mide bulantısı görülebilir. " * 60 + "\n"
+
+
+def test_heading_aware_chunks():
+    """Chunk'lar bölüm sınırını aşmaz ve etiketi başlık yolundan alır."""
+    print("\n🧪 TEST 1: Başlık Bazlı Chunking")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "Testol.md"
+        path.write_text(LEAFLET, encoding="utf-8")
+        chunks = list(iter_drug_chunks(str(path), chunk_size=1000, chunk_overlap=100))
+
+    for chunk in chunks:
+        print(f"\n✓ [{chunk['section']}] {chunk['heading'][:60]} ({len(chunk['text'])} karakter)")
+
+    assert [c['chunk_id'] for c in chunks] == list(range(len(chunks)))
+    assert all(c['drug_name'] == "Testol" for c in chunks)
+
+    # Numarasız alt başlık, numaralı üst bölümün etiketini alır
+    contraindication = [c for c in chunks if "KULLANMAYINIZ" in c['heading']]
+    assert contraindication and all(c['section'] == "uyarılar" for c in contraindication)
+    assert contraindication[0]['heading'].startswith("2. TESTOL")
+
+    # Uzun bölüm kendi içinde bölünür, diğer bölümün metnini içermez
+    side_effects = [c for c in chunks if c['section'] == "yan etkiler"]
+    assert len(side_effects) > 1
+    assert all("böbrek" not in c['text'] for c in side_effects)
+
+
+def test_section_classifier():
+    """Kısa keyword'ler kelime içinde eşleşmez, Türkçe büyük harf doğru küçültülür."""
+    print("\n🧪 TEST 2: Bölüm Sınıflandırıcı")
+    print("=" * 60)
+
+    texts = [
+        "Açık yaralarda toksik etki görülebilir.",          # "aç", "tok" kelime içinde
+        "Günde 2 tablet aç karnına alınır.",
+        "İÇİNDEKİLER: Etkin madde 500 mg parasetamol.",      # İ -> i
+        "Bu ilacı ALKOL ile birlikte kullanmayınız, etkileşim olabilir.",
+        "",
+    ]
+    sections = classify_sections(texts)
+    print(f"\n✓ {sections}")
+
+    assert sections == ["genel", "kullanım", "bileşim", "etkileşimler", "genel"]
+    assert [detect_section(t) for t in texts] == sections
+
+
+def test_child_passages():
+    """Child pasajlar bütçeyi aşmaz, maddeler satır satır korunur, metin kaybolmaz."""
+    print("\n🧪 TEST 3: Small-to-big Child Pasajları")
+    print("=" * 60)
+
+    parent = (
+        "Eğer,\n- Böbrek yetmezliğiniz varsa\n- Hamileyseniz\n\n"
+        + "Baş ağrısı ve mide bulantısı görülebilir. " * 20
+    )
+    passages = split_child_passages(parent, max_chars=200)
+    for passage in passages:
+        print(f"\n✓ ({len(passage)} karakter) {passage[:60]!r}")
+
+    assert len(passages) > 1
+    assert all(len(p) <= 200 for p in passages)
+    assert passages[0].startswith("Eğer,\n- Böbrek")
+    assert " ".join(" ".join(passages).split()) == " ".join(parent.split())
+
+    # Her seviyedeki başlık satırı (chunker'ın bölüm sınırlarıyla aynı) pasaja girmez
+    assert split_child_passages("#### Seyrek\nKaşıntı görülebilir.") == ["Kaşıntı görülebilir."]
+
+
+def test_real_leaflets():
+    """Gerçek prospektüsler: "#### 4." gibi derin numaralı bölümler ve baştaki
+    "... dikkatlice okuyunuz" banner'ı etiketleri bozmaz, son bölüm kaybolmaz."""
+    print("\n🧪 TEST 4: Gerçek Prospektüsler")
+    print("=" * 60)
+
+    data_dir = Path(__file__).parent.parent / "data" / "pdfs"
+    for name in ("Janumet.md", "Augmentin.md"):
+        path = data_dir / name
+        chunks = list(iter_drug_chunks(str(path)))
+        sections = [c['section'] for c in chunks]
+        print(f"\n✓ {name}: {len(chunks)} chunk, {sections.count('yan etkiler')} 'yan etkiler'")
+
+        assert "yan etkiler" in sections
+        side_effects = [c for c in chunks if c['section'] == "yan etkiler"]
+        assert all(c['heading'].startswith("4. ") for c in side_effects)
+
+        # Dosya sonundaki kısa bölüm (ruhsat sahibi / onay) index'e girer
+        tail = " ".join(path.read_text(encoding="utf-8").split()[-4:])
+        assert tail in " ".join(chunks[-1]['text'].split())
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("✂️  Pharma Navigator - Chunker Tests")
+    print("=" * 60)
+
+    try:
+        test_heading_aware_chunks()
+        test_section_classifier()
+        test_child_passages()
+        test_real_leaflets()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""İlaç ismi sözlüğü (DrugLexicon) testi."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.drug_lexicon import DrugLexicon
+
+
+DRUGS = ["Arvales", "Augmentin", "Cipralex", "Coraspin", "Enfluvir", "Janumet", "Augmentin BID"]
+
+
+def test_exact_matches():
+    """Büyük/küçük harf ve ek varyasyonlarında exact eşleşme."""
+    print("\n🧪 TEST 1: Exact Eşleşme")
+    print("=" * 60)
+    
+    lexicon = DrugLexicon(DRUGS)
+    
+    cases = [
+        ("Arvales'in yan etkileri nelerdir?", ["Arvales"]),
+        ("arvales nasıl kullanılır", ["Arvales"]),
+        ("CIPRALEX ile JANUMET birlikte alınır mı?", ["Cipralex", "Janumet"]),
+        ("Cipralexi aç karnına mı almalıyım", ["Cipralex"]),
+        ("Augmentin BID dozu nedir?", ["Augmentin BID"]),
+        ("Hava bugün nasıl?", []),
+    ]
+    
+    for query, expected in cases:
+        found = lexicon.find(query)
+        print(f"\n✓ Query: '{query}'")
+        print(f"  Bulunan: {found}")
+        assert found == expected
+
+
+def test_fuzzy_matches():
+    """Yazım hatalarında fuzzy eşleşme."""
+    print("\n\n🧪 TEST 2: Fuzzy Eşleşme")
+    print("=" * 60)
+    
+    lexicon = DrugLexicon(DRUGS)
+    
+    cases = [
+        ("Arveles'in sık yan etkileri neler?", ["Arvales"]),
+        ("janumte hamilelikte kullanılır mı", ["Janumet"]),
+        ("Coraspn kanama riski", ["Coraspin"]),
+        ("kanama riski", []),
+    ]
+    
+    for query, expected in cases:
+        found = lexicon.find(query)
+        print(f"\n✓ Query: '{query}'")
+        print(f"  Bulunan: {found}")
+        assert found == expected
+    
+    assert lexicon.resolve("arveles") == "Arvales"
+    assert lexicon.resolve("Aspirin") is None
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("💊 Pharma Navigator - Drug Lexicon Tests")
+    print("=" * 60)
+    
+    try:
+        test_exact_matches()
+        test_fuzzy_matches()
+        
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+        
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Metadata pre-filtering testi (drug_name / section).
+
+Embedding modeli indirilmez; retriever HashEmbedder ile çalışır.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.retriever import DrugRetriever
+from tests.hash_embedder import hash_embedder
+
+
+DRUGS = ["Arvales", "Cipralex", "Parol"]
+SECTIONS = ["yan etkiler", "kullanım"]
+WORDS = ["baş", "ağrısı", "bulantı", "kaşıntı", "uykusuzluk", "tablet", "günde", "kez",
+         "doz", "yemek", "sonra", "aç", "karnına", "su", "ile", "alınır", "ateş", "ishal"]
+
+
+def build_corpus(n_per_group: int = 12):
+    rng = np.random.default_rng(0)
+    texts, metadatas = [], []
+    for drug in DRUGS:
+        for section in SECTIONS:
+            for i in range(n_per_group):
+                words = rng.choice(WORDS, size=6).tolist()
+                texts.append(" ".join([drug, section] + words))
+                metadatas.append({
+                    'drug_name': drug, 'section': section,
+                    'source_file': f"{drug}.md", 'chunk_id': str(len(texts) - 1)
+                })
+    return texts, metadatas
+
+
+def test_filtered_results():
+    """Filtreli sonuçlar sadece istenen ilaç/bölümden gelir ve filtre içindeki exact top-k'ya eşittir.
+
+    Sorgu başka bir ilacın metinlerine daha yakındır; post-filtering'de
+    istenen ilacın chunk'ları top_k adayın dışında kalırdı.
+    """
+    print("\n🧪 TEST 1: Pre-filtered Retrieval")
+    print("=" * 60)
+
+    texts, metadatas = build_corpus()
+    cases = [
+        ("flat / selector", {'index_type': "flat"}),
+        ("hnsw / exact fallback", {'index_type': "hnsw"}),
+        ("hnsw / selector", {'index_type': "hnsw", 'filter_exact_max': 0}),
+        ("ivf / selector", {'index_type': "ivf", 'filter_exact_max': 0}),
+        ("sq8 / rerank", {'index_type': "flat", 'quantization': "sq8"}),
+    ]
+
+    for name, index_config in cases:
+        with hash_embedder() as embedder, tempfile.TemporaryDirectory() as tmp:
+            retriever = DrugRetriever(db_path=tmp, index_config=index_config)
+            retriever.add_documents(texts, metadatas)
+            vectors = embedder.embed_array(texts, normalize=True)
+
+            query = "Cipralex yan etkiler uykusuzluk bulantı"
+            query_vector = embedder.embed_queries([query], normalize=True)[0]
+            for drug, section in [("Arvales", None), ("Parol", "kullanım"), ("Arvales", "yan etkiler")]:
+                result = retriever.retrieve(
+                    query, drug_names=[drug], section_filter=section,
+                    top_k=5, similarity_threshold=-1.0, mode="dense"
+                )
+                chunks = result['chunks']
+                eligible = [
+                    i for i, meta in enumerate(metadatas)
+                    if meta['drug_name'] == drug and (section is None or meta['section'] == section)
+                ]
+                expected = sorted(eligible, key=lambda i: -float(vectors[i] @ query_vector))[:5]
+
+                print(f"\n✓ {name}, {drug}/{section}: {[c['id'] for c in chunks]}")
+                assert len(chunks) == 5
+                assert all(c['metadata']['drug_name'] == drug for c in chunks)
+                assert section is None or all(c['metadata']['section'] == section for c in chunks)
+                assert chunks[0]['id'] == str(expected[0])
+
+            # Index'te olmayan ilaç / bölüm boş sonuç döndürür
+            assert retriever.retrieve(query, drug_names=["Yok"], similarity_threshold=-1.0)['chunks'] == []
+            assert retriever.retrieve(
+                query, drug_names=["Arvales"], section_filter="saklama", similarity_threshold=-1.0
+            )['chunks'] == []
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("🧪 Pharma Navigator - Filtering Tests")
+    print("=" * 60)
+
+    try:
+        test_filtered_results()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
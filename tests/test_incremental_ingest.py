@@ -0,0 +1,103 @@
+"""Artımlı ingest (manifest.json dosya hash'leri) testi.
+
+Embedding modeli indirilmez; ingest HashEmbedder ile çalışır.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ingest import ingest_documents
+from src.retrieval.retriever import DrugRetriever
+from src.retrieval.snapshots import current_version
+from tests.hash_embedder import hash_embedder
+
+
+DOCUMENTS = {
+    "Arvales.md": "# Arvales\n\n## Yan Etkiler\n\n" + "Arvales baş ağrısı ve bulantı yapabilir. " * 12
+                  + "\n\n## Kullanım\n\n" + "Arvales günde üç kez tok karnına alınır. " * 12,
+    "Cipralex.md": "# Cipralex\n\n## Yan Etkiler\n\n" + "Cipralex uykusuzluk ve terleme yapabilir. " * 12
+                   + "\n\n## Kullanım\n\n" + "Cipralex günde bir kez sabah alınır. " * 12,
+}
+
+
+def make_config(tmp: Path) -> dict:
+    return {
+        'data': {'source_dir': str(tmp / "docs"), 'supported_formats': [".md"]},
+        'retrieval': {'chunking': "sections", 'chunk_size': 300, 'chunk_overlap': 50, 'chunk_tokens': 0},
+        'database': {'path': str(tmp / "db"), 'collection_name': "drugs"},
+        'embedding': {'model': "hash", 'device': "cpu", 'ingest_checkpoint_interval': 0},
+    }
+
+
+def chunks_by_file(db_path: str) -> dict:
+    """source_file -> o dosyanın chunk metinleri (sıralı)."""
+    retriever = DrugRetriever(db_path=db_path)
+    metadata = retriever.metadata
+    result = {}
+    for i in range(len(metadata)):
+        result.setdefault(metadata.value('source_file', i), []).append(metadata.text(i))
+    return result
+
+
+def test_incremental_ingest():
+    """Değişmeyen manifest'te re-ingest no-op'tur; değişen dosya sadece kendi chunk'larını değiştirir."""
+    print("\n🧪 TEST 1: Incremental Ingest")
+    print("=" * 60)
+
+    with hash_embedder(), tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        config = make_config(tmp)
+        (tmp / "docs").mkdir()
+        for name, content in DOCUMENTS.items():
+            (tmp / "docs" / name).write_text(content, encoding='utf-8')
+
+        ingest_documents(config)
+        first_version = current_version(config['database']['path'])
+        before = chunks_by_file(config['database']['path'])
+        print(f"\n✓ İlk ingest: {first_version}, {({k: len(v) for k, v in before.items()})}")
+        assert set(before) == set(DOCUMENTS) and all(before.values())
+
+        # Hiçbir dosya değişmedi: yeni snapshot yayınlanmaz, chunk'lar aynı kalır
+        ingest_documents(config)
+        assert current_version(config['database']['path']) == first_version
+        assert chunks_by_file(config['database']['path']) == before
+
+        # Sadece Cipralex değişti: Arvales chunk'ları aynen korunur
+        changed = DOCUMENTS["Cipralex.md"].replace("uykusuzluk", "ağız kuruluğu")
+        (tmp / "docs" / "Cipralex.md").write_text(changed, encoding='utf-8')
+        ingest_documents(config)
+        after = chunks_by_file(config['database']['path'])
+        print(f"\n✓ Değişiklik sonrası: {current_version(config['database']['path'])}")
+        assert current_version(config['database']['path']) != first_version
+        assert after["Arvales.md"] == before["Arvales.md"]
+        assert after["Cipralex.md"] != before["Cipralex.md"]
+        assert any("ağız kuruluğu" in text for text in after["Cipralex.md"])
+        assert not any("uykusuzluk" in text for text in after["Cipralex.md"])
+        assert sum(map(len, after.values())) == sum(map(len, before.values()))
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("📥 Pharma Navigator - Incremental Ingest Tests")
+    print("=" * 60)
+
+    try:
+        test_incremental_ingest()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
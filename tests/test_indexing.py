@@ -0,0 +1,95 @@
+"""FAISS index tipi / quantization tespiti testi."""
+
+import sys
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.indexing import (
+    build_index,
+    index_type_of,
+    is_quantized,
+    resolve_index_config,
+    search_parameters,
+    train_index,
+)
+
+
+def test_quantization_detection():
+    """Sadece SQ/PQ index'leri quantized sayılır (IVF-Flat dahil diğerleri exact)."""
+    print("\n🧪 TEST 1: Quantization Tespiti")
+    print("=" * 60)
+
+    dimension = 32
+    cases = [
+        ("flat", "none", False),
+        ("hnsw", "none", False),
+        ("ivf", "none", False),
+        ("flat", "sq8", True),
+        ("flat", "pq", True),
+        ("ivf", "pq", True),
+    ]
+    for index_type, quantization, expected in cases:
+        config = {"index_type": index_type, "quantization": quantization, "pq_m": 8, "ivf_nlist": 4}
+        index = build_index(dimension, config, n_vectors=512)
+
+        # Diskten yüklenen index de aynı sonucu vermeli
+        loaded = faiss.deserialize_index(faiss.serialize_index(index))
+        print(f"\n✓ {index_type}/{quantization}: quantized={is_quantized(loaded)}")
+        assert index_type_of(loaded) == index_type
+        assert is_quantized(index) is expected
+        assert is_quantized(loaded) is expected
+
+
+def test_exact_top1():
+    """Her index tipi küçük bir kümede sorgunun kendisini (exact top-1) bulur."""
+    print("\n🧪 TEST 2: Index Tipi Başına Top-1")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((1000, 32)).astype('float32')
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query_ids = rng.choice(len(vectors), size=50, replace=False)
+    queries = vectors[query_ids] + 0.01 * rng.standard_normal((50, 32)).astype('float32')
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    expected = np.argmax(queries @ vectors.T, axis=1)
+
+    for index_type in ("flat", "hnsw", "ivf"):
+        config = resolve_index_config({"index_type": index_type})
+        index = build_index(vectors.shape[1], config, n_vectors=len(vectors))
+        if not index.is_trained:
+            train_index(index, vectors)
+        index.add(vectors)
+
+        _, ids = index.search(queries, 1, params=search_parameters(index, config))
+        recall = float(np.mean(ids[:, 0] == expected))
+        print(f"\n✓ {index_type}: top-1 = exact {recall:.0%}")
+        assert np.array_equal(ids[:, 0], expected)
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("🗂️  Pharma Navigator - Indexing Tests")
+    print("=" * 60)
+
+    try:
+        test_quantization_detection()
+        test_exact_top1()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
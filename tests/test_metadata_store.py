@@ -0,0 +1,157 @@
+"""Columnar metadata store (MetadataStore) testleri."""
+
+import os
+import stat
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.metadata_store import MetadataStore, atomic_write_bytes
+
+
+RECORDS = [
+    {'text': "Arvales baş ağrısı yapabilir.", 'drug_name': "Arvales", 'section': "yan etkiler",
+     'chunk_id': '0', 'source_file': "Arvales.md"},
+    {'text': "Arvales günde 3 kez alınır.", 'drug_name': "Arvales", 'section': "kullanım",
+     'chunk_id': '1', 'source_file': "Arvales.md"},
+    {'text': "Cipralex uykusuzluk yapabilir.", 'drug_name': "Cipralex", 'section': "yan etkiler",
+     'chunk_id': '0', 'source_file': "Cipralex.md"},
+    {'text': "", 'drug_name': "Cipralex", 'section': "genel",
+     'chunk_id': '1', 'source_file': "Cipralex.md"},
+]
+
+
+def test_save_load_roundtrip():
+    """Kaydedilen kolonlar ve metinler mmap ile aynen geri okunur; yeni eklemeler de korunur."""
+    print("\n🧪 TEST 1: Save / Load")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MetadataStore.from_records(RECORDS[:3])
+        store.save(Path(tmp) / "metadata")
+        store.append(RECORDS[3]['text'], RECORDS[3])  # diskteki + bellekteki kısım birlikte
+
+        assert [store.get(i) for i in range(len(store))] == RECORDS
+        store.save(Path(tmp) / "metadata")
+
+        loaded = MetadataStore.load(Path(tmp) / "metadata")
+        print(f"\n✓ {len(loaded)} chunk, sözlük: {loaded.vocab['drug_name']}")
+        assert [loaded.get(i) for i in range(len(loaded))] == RECORDS
+        assert loaded.text(3) == ""
+        assert loaded.unique_values('section') == ["genel", "kullanım", "yan etkiler"]
+
+        groups = loaded.groups('drug_name')
+        assert set(groups) == {"Arvales", "Cipralex"}
+        assert groups["Arvales"].tolist() == [0, 1] and groups["Cipralex"].tolist() == [2, 3]
+        assert loaded.groups('section')["yan etkiler"].tolist() == [0, 2]
+
+        # Geçici dosya kalmaz; dosyalar normal open() izinleriyle yazılır
+        names = sorted(p.name for p in (Path(tmp) / "metadata").iterdir())
+        assert not [name for name in names if name.endswith('.tmp')]
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = stat.S_IMODE((Path(tmp) / "metadata" / "store.json").stat().st_mode)
+        assert mode == 0o666 & ~umask
+        loaded.clear()
+
+
+def test_remove():
+    """Silinen satırlardan sonra kalanlar sırasını korur ve yeniden numaralanır."""
+    print("\n🧪 TEST 2: Remove")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MetadataStore.from_records(RECORDS[:3])
+        store.save(Path(tmp) / "metadata")
+        store.append(RECORDS[3]['text'], RECORDS[3])
+
+        store.remove(store.groups('source_file')["Arvales.md"])
+        print(f"\n✓ Kalan: {[store.text(i) for i in range(len(store))]}")
+        assert [store.get(i) for i in range(len(store))] == RECORDS[2:]
+        assert {name: ids.tolist() for name, ids in store.groups('drug_name').items()} == {"Cipralex": [0, 1]}
+
+        store.save(Path(tmp) / "metadata")
+        assert [MetadataStore.load(Path(tmp) / "metadata").get(i) for i in range(2)] == RECORDS[2:]
+
+        # Sadece boş metinli satırlar diskte (blob dosyası boş, mmap açılmaz)
+        store.remove(np.array([0]))
+        store.save(Path(tmp) / "metadata")
+        assert store.text(0) == "" and MetadataStore.load(Path(tmp) / "metadata").text(0) == ""
+        store.remove(np.array([0]))
+        assert len(store) == 0
+        store.clear()
+
+
+def test_text_bounds():
+    """Boş veya hiç yüklenmemiş store'da text() açık bir IndexError verir."""
+    print("\n🧪 TEST 3: text() Bounds")
+    print("=" * 60)
+
+    for store in (MetadataStore(), MetadataStore.from_records(RECORDS[:1])):
+        try:
+            store.text(len(store))
+            raise AssertionError("IndexError bekleniyordu")
+        except IndexError as e:
+            print(f"\n✓ {e}")
+            assert "out of range" in str(e)
+
+
+def test_concurrent_atomic_writes():
+    """Aynı dosyaya paralel yazanlar birbirinin geçici dosyasını ezmez."""
+    print("\n🧪 TEST 4: Concurrent Atomic Writes")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "page.txt"
+        payloads = [bytes([65 + i]) * 200_000 for i in range(8)]
+        errors = []
+
+        def write(data):
+            try:
+                for _ in range(20):
+                    atomic_write_bytes(path, data)
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(data,)) for data in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        print(f"\n✓ {len(threads)} yazıcı, hata: {errors}")
+        assert not errors
+        assert path.read_bytes() in payloads  # yarım veya karışık içerik yok
+        assert [p.name for p in Path(tmp).iterdir()] == ["page.txt"]
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("🗂️  Pharma Navigator - Metadata Store Tests")
+    print("=" * 60)
+
+    try:
+        test_save_load_roundtrip()
+        test_remove()
+        test_text_bounds()
+        test_concurrent_atomic_writes()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Satır akışlı metin temizleme testleri."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval import normalizer
+from src.retrieval.normalizer import normalize_markdown, normalize_pdf_text, split_lines, structure_pdf_markdown
+
+
+RAW_PDF_TEXT = (
+    "KULLANMA TALİMATI\n"
+    "ARVELES 25 mg film tablet\n"
+    "Ağızdan alınır.\n"
+    "1. ARVELES nedir ve ne için kul-\n"
+    "lanılır?\n"
+    "Ağrı kesici 1/10 bir ilaçtır.\n"
+    "\n"
+    "\n"
+    "\n"
+    "4.\n"
+    "\n"
+    "Olası yan etkiler nelerdir?\n"
+    "Baş ağrısı"
+)
+
+MARKDOWN = (
+    "# **1. Olası yan etkiler nelerdir**\n"
+    "Seyrek:\n"
+    "# **KULLANMAYINIZ**\n"
+    "3/8\n"
+    "\n"
+    "\n"
+    "\n"
+    "Sayfa sonu 3/8 devam"
+)
+
+
+def _pdf_markdown(lines):
+    return structure_pdf_markdown(normalize_pdf_text(lines))
+
+
+def test_pdf_text_rules():
+    """Sayfa numarası/başlık silme, satır birleştirme ve numaralı başlıklar."""
+    print("\n🧪 TEST 1: PDF Text Rules")
+    print("=" * 60)
+
+    output = '\n'.join(_pdf_markdown(RAW_PDF_TEXT.split('\n')))
+    print(output)
+    assert output.split('\n') == [
+        "ARVELES 25 mg film tablet Ağızdan alınır.",
+        "# 1. ARVELES nedir ve ne için kullanılır?",
+        "Ağrı kesici bir ilaçtır.",
+        "",
+        "# 4. Olası yan etkiler nelerdir?",
+        "Baş ağrısı",
+    ]
+
+    markdown = '\n'.join(normalize_markdown(MARKDOWN.split('\n')))
+    print(markdown)
+    assert markdown.split('\n') == [
+        "## 1. Olası yan etkiler nelerdir",
+        "### Seyrek",
+        "### KULLANMAYINIZ",
+        "",
+        "Sayfa sonu devam",
+    ]
+
+
+def test_streaming_matches_whole_text():
+    """Parça parça okunan akış ve küçük pencereler tam metinle aynı sonucu verir."""
+    print("\n🧪 TEST 2: Streaming")
+    print("=" * 60)
+
+    default_window = normalizer.WINDOW_LINES
+    try:
+        for stages, text in ((_pdf_markdown, RAW_PDF_TEXT * 20), (normalize_markdown, MARKDOWN * 20)):
+            expected = list(stages(text.split('\n')))
+            for window in (1, 2, 5):
+                normalizer.WINDOW_LINES = window
+                for size in (1, 7, 64):
+                    chunks = (text[i:i + size] for i in range(0, len(text), size))
+                    assert list(stages(split_lines(chunks))) == expected
+            print(f"✓ {len(expected)} satır, pencere/parça boyutundan bağımsız")
+    finally:
+        normalizer.WINDOW_LINES = default_window
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("🧹 Pharma Navigator - Normalizer Tests")
+    print("=" * 60)
+
+    try:
+        test_pdf_text_rules()
+        test_streaming_matches_whole_text()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
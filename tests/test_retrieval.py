@@ -194,6 +194,50 @@ def test_threshold_effect():
             print()
 
 
+def test_retrieve_many():
+    """Toplu retrieval, tek tek retrieve ile aynı sonucu vermeli."""
+    print("\n\n🧪 TEST 7: Toplu Retrieval (retrieve_many)")
+    print("=" * 60)
+    
+    retriever = DrugRetriever()
+    
+    queries = [
+        "Arvales yan etkileri",
+        "Cipralex nasıl kullanılır",
+        "Augmentin bileşimi",
+        "yan etki",
+    ]
+    drug_names = [None, None, ["Augmentin"], ["Cipralex"]]
+    
+    import time
+    
+    start = time.perf_counter()
+    batch_results = retriever.retrieve_many(
+        queries,
+        drug_names=drug_names,
+        top_k=5,
+        similarity_threshold=0.5
+    )
+    batch_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    single_results = [
+        retriever.retrieve(query, drug_names=names, top_k=5, similarity_threshold=0.5)
+        for query, names in zip(queries, drug_names)
+    ]
+    single_time = time.perf_counter() - start
+    
+    for query, batch, single in zip(queries, batch_results, single_results):
+        batch_ids = [c['id'] for c in batch['chunks']]
+        single_ids = [c['id'] for c in single['chunks']]
+        print(f"\n✓ Query: '{query}'")
+        print(f"  Batch: {len(batch_ids)} chunk | Tekli: {len(single_ids)} chunk")
+        assert batch_ids == single_ids
+        assert batch['drug_names'] == single['drug_names']
+    
+    print(f"\n  Süre: batch {batch_time*1000:.1f} ms | tekli {single_time*1000:.1f} ms")
+
+
 def main():
     """Tüm testleri çalıştır."""
     print("\n" + "=" * 60)
@@ -207,6 +251,7 @@ def main():
         test_metadata_filtering()
         test_semantic_similarity()
         test_threshold_effect()
+        test_retrieve_many()
         
         print("\n\n" + "=" * 60)
         print("✅ Tüm testler başarılı!")
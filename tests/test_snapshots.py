@@ -0,0 +1,71 @@
+"""Index snapshot (CURRENT pointer) testi."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.retrieval.snapshots import (
+    current_version,
+    list_snapshots,
+    new_version,
+    prune_snapshots,
+    publish_snapshot,
+    resolve_snapshot,
+    snapshot_path,
+)
+
+
+def test_publish_and_prune():
+    """Yayınlama, çözümleme ve eski sürümlerin temizlenmesi."""
+    print("\n🧪 TEST 1: Snapshot Yayınlama")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp)
+
+        # CURRENT yokken eski düz layout okunur
+        assert current_version(db_path) is None
+        assert resolve_snapshot(db_path) == db_path
+
+        versions = []
+        for _ in range(3):
+            version = new_version()
+            snapshot_path(db_path, version).mkdir(parents=True)
+            publish_snapshot(db_path, version)
+            versions.append(version)
+            print(f"\n✓ Yayınlandı: {version}")
+            assert current_version(db_path) == version
+            assert resolve_snapshot(db_path) == snapshot_path(db_path, version)
+
+        assert list_snapshots(db_path) == versions
+
+        removed = prune_snapshots(db_path, keep=2)
+        print(f"  Silinen: {removed}")
+        assert removed == versions[:1]
+        assert list_snapshots(db_path) == versions[1:]
+
+
+def main():
+    """Tüm testleri çalıştır."""
+    print("\n" + "=" * 60)
+    print("💾 Pharma Navigator - Snapshot Tests")
+    print("=" * 60)
+
+    try:
+        test_publish_and_prune()
+
+        print("\n\n" + "=" * 60)
+        print("✅ Tüm testler başarılı!")
+        print("=" * 60 + "\n")
+
+    except Exception as e:
+        print(f"\n\n❌ Hata oluştu: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()